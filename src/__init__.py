@@ -7,6 +7,12 @@ __version__ = "1.0.0"
 __author__ = "CHALLA YOGESWAR"
 __description__ = "Voice dataset creation with speaker diarization and gender classification"
 
-from src.pipeline.pipeline_runner import VoxentPipeline
-
 __all__ = ['VoxentPipeline']
+
+
+def __getattr__(name):
+    # Imported on first use: the pipeline pulls in torch and the model stack
+    if name == 'VoxentPipeline':
+        from src.pipeline.pipeline_runner import VoxentPipeline
+        return VoxentPipeline
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,14 +1,13 @@
 import os
+import time
+import threading
+import importlib.util
 import numpy as np
 import logging
 from typing import Tuple, Optional, Union
 
-# Try to import torch (optional for GPU)
-try:
-    import torch
-    TORCH_AVAILABLE = True
-except (ImportError, AttributeError):
-    TORCH_AVAILABLE = False
+# torch is optional (GPU detection only) and imported on first use
+TORCH_AVAILABLE = importlib.util.find_spec("torch") is not None
 
 # Try to import advanced classifier
 try:
@@ -18,30 +17,61 @@ except ImportError:
     ADVANCED_AVAILABLE = False
     logging.warning("Advanced classifier not available, using fallback")
 
+from preprocessing.segment_analysis import SegmentAnalysis
 from .pitch_gender import PitchGenderClassifier
 from .ml_classifier import MLGenderClassifier, load_ml_classifier
 
 logger = logging.getLogger(__name__)
 
-# Detect GPU (with fallback for CPU-only PyTorch)
-DEVICE = None
-if TORCH_AVAILABLE:
+# Minimum confidence (%) for a tier's answer to be accepted
+ML_CONFIDENCE_THRESHOLD = 70.0
+ADVANCED_CONFIDENCE_THRESHOLD = 60.0
+
+# Seconds between checks of the ML model file for a newer published version
+ML_RELOAD_INTERVAL = 5.0
+
+_device = None
+_device_detected = False
+
+
+def get_device():
+    """Torch device used by the classifiers (detected on first call, None without torch)."""
+    global _device, _device_detected
+    if _device_detected:
+        return _device
+    _device_detected = True
+
+    # Detect GPU (with fallback for CPU-only PyTorch)
+    if not TORCH_AVAILABLE:
+        logger.debug("PyTorch not available, CPU-only mode")
+        return None
+    try:
+        import torch
+    except (ImportError, AttributeError):
+        logger.debug("PyTorch not available, CPU-only mode")
+        return None
     try:
         if torch.cuda.is_available():
-            DEVICE = torch.device('cuda')
+            _device = torch.device('cuda')
             logger.info(f"🚀 GPU detected: {torch.cuda.get_device_name(0)}")
             logger.info(f"   VRAM: {torch.cuda.get_device_properties(0).total_memory / 1e9:.2f} GB")
         else:
-            DEVICE = torch.device('cpu')
+            _device = torch.device('cpu')
             logger.debug("GPU not available, using CPU")
     except (RuntimeError, AttributeError):
         try:
-            DEVICE = torch.device('cpu')
+            _device = torch.device('cpu')
         except AttributeError:
-            DEVICE = None
+            _device = None
             logger.debug("Torch device management not available")
-else:
-    logger.debug("PyTorch not available, CPU-only mode")
+    return _device
+
+
+def __getattr__(name):
+    # DEVICE is resolved lazily so importing the package does not import torch
+    if name == 'DEVICE':
+        return get_device()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 class IntegratedGenderClassifier:
@@ -56,7 +86,7 @@ class IntegratedGenderClassifier:
 
     def __init__(self, use_ml: bool = True, ml_model_path: str = "models/ml_gender_classifier.pkl",
                  pitch_male_threshold: float = 85.0, pitch_female_threshold: float = 165.0,
-                 use_advanced: bool = True):
+                 use_advanced: bool = True, ml_reload_interval: Optional[float] = ML_RELOAD_INTERVAL):
         """
         Initialize integrated classifier.
 
@@ -66,27 +96,26 @@ class IntegratedGenderClassifier:
             pitch_male_threshold: Pitch threshold for male classification
             pitch_female_threshold: Pitch threshold for female classification
             use_advanced: Whether to use advanced multi-feature classifier
+            ml_reload_interval: Seconds between checks for a newly published
+                ML model, which is then swapped in (None = never reload)
         """
         self.use_ml = use_ml
         self.use_advanced = use_advanced
         self.ml_model_path = ml_model_path
-        self.device = DEVICE
+        self.ml_reload_interval = ml_reload_interval
+        self.device = get_device()
         
         # Initialize classifiers
         self.pitch_classifier = PitchGenderClassifier(pitch_male_threshold, pitch_female_threshold)
         self.ml_classifier = None
         self.advanced_classifier = None
+        self._ml_mtime = None
+        self._ml_checked = time.monotonic()
+        self._ml_reload_lock = threading.Lock()
 
         # Try to load ML classifier
         if self.use_ml:
-            try:
-                if os.path.exists(self.ml_model_path):
-                    self.ml_classifier = load_ml_classifier(self.ml_model_path)
-                    logger.info(f"✅ ML classifier loaded from {self.ml_model_path}")
-                else:
-                    logger.info(f"ℹ️  ML model not found at {self.ml_model_path}")
-            except Exception as e:
-                logger.warning(f"Failed to load ML classifier: {e}")
+            self._load_ml_classifier()
 
         # Try to load advanced classifier
         if self.use_advanced and ADVANCED_AVAILABLE:
@@ -96,7 +125,57 @@ class IntegratedGenderClassifier:
             except Exception as e:
                 logger.warning(f"Failed to load advanced classifier: {e}")
 
-    def classify(self, audio: np.ndarray, sr: int) -> Tuple[str, float]:
+    def _load_ml_classifier(self):
+        """Load the ML model file; the previous model stays in use on failure."""
+        try:
+            mtime = os.stat(self.ml_model_path).st_mtime_ns
+        except OSError:
+            logger.info(f"ℹ️  ML model not found at {self.ml_model_path}")
+            return
+        # Remembered even if loading fails, so a broken file is not retried until it changes
+        self._ml_mtime = mtime
+        try:
+            self.ml_classifier = load_ml_classifier(self.ml_model_path)
+            logger.info(f"✅ ML classifier loaded from {self.ml_model_path} "
+                        f"(version {self.ml_classifier.version})")
+        except Exception as e:
+            logger.warning(f"Failed to load ML classifier: {e}")
+
+    def refresh_ml_classifier(self, force: bool = False) -> bool:
+        """
+        Swap in a newly published ML model without restarting.
+
+        Checks the model file's mtime at most every ml_reload_interval
+        seconds (always with force). Models are published with an atomic
+        rename, and in-flight classifications keep the model they started with.
+
+        Returns:
+            True if a new model was loaded
+        """
+        if not self.use_ml or (self.ml_reload_interval is None and not force):
+            return False
+        now = time.monotonic()
+        if not force and now - self._ml_checked < self.ml_reload_interval:
+            return False
+        # Another thread is already checking/reloading
+        if not self._ml_reload_lock.acquire(blocking=False):
+            return False
+        try:
+            self._ml_checked = now
+            try:
+                mtime = os.stat(self.ml_model_path).st_mtime_ns
+            except OSError:
+                return False
+            if mtime == self._ml_mtime:
+                return False
+            previous = self.ml_classifier
+            self._load_ml_classifier()
+            return self.ml_classifier is not previous
+        finally:
+            self._ml_reload_lock.release()
+
+    def classify(self, audio: np.ndarray, sr: int,
+                 analysis: Optional[SegmentAnalysis] = None) -> Tuple[str, float]:
         """
         Classify gender using best available method.
 
@@ -105,24 +184,35 @@ class IntegratedGenderClassifier:
         2. Advanced multi-feature classifier (if available)
         3. Pitch-based classifier (fallback)
 
+        Args:
+            audio: Audio time series
+            sr: Sample rate
+            analysis: Optional SegmentAnalysis of audio; built here if not
+                given and shared by every tier so STFT/piptrack/MFCC run once
+
         Returns:
             Tuple of (gender_label, confidence_score)
         """
+        analysis = SegmentAnalysis.ensure(analysis, audio, sr)
+        self.refresh_ml_classifier()
+        ml_classifier = self.ml_classifier
         
         # Method 1: Try ML classification first (if trained)
-        if self.ml_classifier and self.ml_classifier.is_trained:
+        if ml_classifier and ml_classifier.is_trained:
             try:
                 # Resample audio if necessary
-                if sr != self.ml_classifier.sample_rate:
+                if sr != ml_classifier.sample_rate:
                     import librosa
-                    audio_resampled = librosa.resample(audio, orig_sr=sr, target_sr=self.ml_classifier.sample_rate)
+                    audio_resampled = librosa.resample(audio, orig_sr=sr, target_sr=ml_classifier.sample_rate)
+                    ml_analysis = None
                 else:
                     audio_resampled = audio
+                    ml_analysis = analysis
 
-                ml_label, ml_confidence = self.ml_classifier.predict(audio_resampled)
+                ml_label, ml_confidence = ml_classifier.predict(audio_resampled, ml_analysis)
 
                 # If ML confidence is high, use it
-                if ml_confidence >= 70.0:
+                if ml_confidence >= ML_CONFIDENCE_THRESHOLD:
                     logger.debug(f"ML classification: {ml_label} with confidence {ml_confidence:.1f}%")
                     return ml_label, ml_confidence
                 else:
@@ -131,12 +221,17 @@ class IntegratedGenderClassifier:
             except Exception as e:
                 logger.warning(f"ML classification failed: {e}, falling back")
 
+        return self._classify_fallback(audio, sr, analysis)
+
+    def _classify_fallback(self, audio: np.ndarray, sr: int,
+                           analysis: SegmentAnalysis) -> Tuple[str, float]:
+        """Tiers after ML: advanced multi-feature classifier, then pitch."""
         # Method 2: Try advanced multi-feature classifier
         if self.advanced_classifier:
             try:
-                adv_label, adv_confidence = self.advanced_classifier.classify(audio, sr)
+                adv_label, adv_confidence = self.advanced_classifier.classify(audio, sr, analysis)
                 
-                if adv_confidence >= 60.0:
+                if adv_confidence >= ADVANCED_CONFIDENCE_THRESHOLD:
                     logger.debug(f"Advanced classification: {adv_label} with confidence {adv_confidence:.1f}%")
                     return adv_label, adv_confidence
                 else:
@@ -146,13 +241,18 @@ class IntegratedGenderClassifier:
                 logger.warning(f"Advanced classification failed: {e}, falling back to pitch")
 
         # Method 3: Fall back to pitch-based classification
-        pitch_label, pitch_confidence = self.pitch_classifier.classify(audio, sr)
+        pitch_label, pitch_confidence = self.pitch_classifier.classify(audio, sr, analysis)
         logger.debug(f"Pitch classification: {pitch_label} with confidence {pitch_confidence:.1f}%")
         return pitch_label, pitch_confidence
 
     def classify_batch(self, audio_batch: list, sr: int) -> list:
         """
-        Classify multiple audio samples (GPU-accelerated if available).
+        Classify multiple audio samples in one batched pass.
+        
+        All segments are analyzed with one joint STFT (SegmentAnalysis.batch)
+        and sent to the ML model in a single predict_proba call. Only the
+        segments the ML model is not confident about go through the
+        advanced and pitch tiers, reusing the same analyses.
         
         Args:
             audio_batch: List of audio arrays
@@ -161,25 +261,39 @@ class IntegratedGenderClassifier:
         Returns:
             List of (label, confidence) tuples
         """
-        if self.device and hasattr(self.device, 'type') and self.device.type == 'cuda' and len(audio_batch) > 1:
-            logger.info(f"🚀 GPU batch classification: {len(audio_batch)} samples")
-            
-            # Use ML classifier for batch if available
-            if self.ml_classifier and self.ml_classifier.is_trained:
-                try:
-                    results = []
-                    for audio in audio_batch:
-                        result = self.ml_classifier.predict(audio)
-                        results.append(result)
-                    return results
-                except Exception as e:
-                    logger.warning(f"Batch ML classification failed: {e}")
+        if len(audio_batch) == 0:
+            return []
+        
+        analyses = SegmentAnalysis.batch(audio_batch, sr)
+        results = [None] * len(audio_batch)
+        self.refresh_ml_classifier()
+        ml_classifier = self.ml_classifier
+        
+        # Method 1: batched ML classification
+        if ml_classifier and ml_classifier.is_trained:
+            try:
+                if sr != ml_classifier.sample_rate:
+                    import librosa
+                    ml_audio = [librosa.resample(audio, orig_sr=sr, target_sr=ml_classifier.sample_rate)
+                                for audio in audio_batch]
+                    ml_analyses = None
+                else:
+                    ml_audio = audio_batch
+                    ml_analyses = analyses
+                
+                for i, (label, confidence) in enumerate(ml_classifier.predict_batch(ml_audio, ml_analyses)):
+                    if confidence >= ML_CONFIDENCE_THRESHOLD:
+                        results[i] = (label, confidence)
+                
+                logger.debug(f"Batch ML classification: {sum(r is not None for r in results)}/"
+                             f"{len(audio_batch)} confident")
+            except Exception as e:
+                logger.warning(f"Batch ML classification failed: {e}, falling back")
         
-        # Fallback: Process individually
-        results = []
-        for audio in audio_batch:
-            result = self.classify(audio, sr)
-            results.append(result)
+        # Methods 2-3 only for the low-confidence subset
+        for i, result in enumerate(results):
+            if result is None:
+                results[i] = self._classify_fallback(audio_batch[i], sr, analyses[i])
         
         return results
 
@@ -198,6 +312,7 @@ class IntegratedGenderClassifier:
             "ml_available": self.is_ml_available(),
             "advanced_available": self.is_advanced_available(),
             "ml_model_path": self.ml_model_path if self.is_ml_available() else None,
+            "ml_model_version": self.ml_classifier.version if self.is_ml_available() else None,
             "pitch_thresholds": {
                 "male": self.pitch_classifier.male_threshold,
                 "female": self.pitch_classifier.female_threshold
@@ -223,13 +338,15 @@ def create_classifier(config: dict) -> IntegratedGenderClassifier:
     pitch_male_threshold = config.get('classification', {}).get('pitch_male_threshold', 85.0)
     pitch_female_threshold = config.get('classification', {}).get('pitch_female_threshold', 165.0)
     use_advanced = config.get('classification', {}).get('use_advanced', True)
+    ml_reload_interval = config.get('classification', {}).get('ml_reload_interval', ML_RELOAD_INTERVAL)
 
     return IntegratedGenderClassifier(
         use_ml=use_ml,
         ml_model_path=ml_model_path,
         pitch_male_threshold=pitch_male_threshold,
         pitch_female_threshold=pitch_female_threshold,
-        use_advanced=use_advanced
+        use_advanced=use_advanced,
+        ml_reload_interval=ml_reload_interval
     )
 
 # Global classifier instance
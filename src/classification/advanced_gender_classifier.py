@@ -21,7 +21,7 @@ except ImportError:
     PARSELMOUTH_AVAILABLE = False
     logger.warning("Parselmouth not available. Install with: pip install praat-parselmouth")
 
-from scipy.signal import find_peaks
+from preprocessing.segment_analysis import SegmentAnalysis
 
 
 class MultiFeatureGenderClassifier:
@@ -112,14 +112,14 @@ class MultiFeatureGenderClassifier:
         
         return tuple(formants[:3])
     
-    def calculate_harmonic_to_noise_ratio(self, audio: np.ndarray, sr: int) -> float:
+    def calculate_harmonic_to_noise_ratio(self, audio: np.ndarray, sr: int, analysis=None) -> float:
         """
         Calculate Harmonics-to-Noise Ratio (HNR).
         Higher HNR = clearer, more periodic voice (typically higher in females).
         """
         try:
             if not PARSELMOUTH_AVAILABLE:
-                return self._estimate_hnr_fallback(audio, sr)
+                return self._estimate_hnr_fallback(audio, sr, analysis)
             
             sound = parselmouth.Sound(audio, sampling_frequency=sr)
             harmonicity = call(sound, "To Harmonicity (cc)", 0.01, 75, 0.1, 1.0)
@@ -127,29 +127,19 @@ class MultiFeatureGenderClassifier:
             return hnr if not np.isnan(hnr) else 0
         except Exception as e:
             logger.warning(f"HNR calculation failed: {e}")
-            return self._estimate_hnr_fallback(audio, sr)
+            return self._estimate_hnr_fallback(audio, sr, analysis)
     
-    def _estimate_hnr_fallback(self, audio: np.ndarray, sr: int) -> float:
-        """Fallback: Estimate HNR from autocorrelation."""
-        autocorr = np.correlate(audio, audio, mode='full')
-        autocorr = autocorr[len(autocorr)//2:]
-        
-        # Find peaks
-        peaks, _ = find_peaks(autocorr, height=0)
-        
-        if len(peaks) > 1:
-            harmonic_power = autocorr[peaks[0]]
-            noise_power = np.sum(autocorr) - harmonic_power
-            hnr = 10 * np.log10(harmonic_power / (noise_power + 1e-10))
-            return hnr if not np.isnan(hnr) else 0
-        
-        return 0
+    def _estimate_hnr_fallback(self, audio: np.ndarray, sr: int, analysis=None) -> float:
+        """Fallback: Mean HNR of voiced frames from framewise autocorrelation."""
+        analysis = SegmentAnalysis.ensure(analysis, audio, sr)
+        return analysis.pitch_track(fmin=75, fmax=600).hnr()
     
-    def extract_all_features(self, audio: np.ndarray, sr: int) -> Dict[str, float]:
+    def extract_all_features(self, audio: np.ndarray, sr: int, analysis=None) -> Dict[str, float]:
         """Extract comprehensive voice features."""
+        analysis = SegmentAnalysis.ensure(analysis, audio, sr)
         
         # 1. PITCH FEATURES
-        pitches, magnitudes = librosa.piptrack(y=audio, sr=sr, fmin=75, fmax=400)
+        pitches, magnitudes = analysis.piptrack(fmin=75, fmax=400)
         pitch_values = pitches[magnitudes > np.max(magnitudes) * 0.1]
         pitch_mean = np.mean(pitch_values[pitch_values > 0]) if len(pitch_values) > 0 else 0
         pitch_std = np.std(pitch_values[pitch_values > 0]) if len(pitch_values) > 0 else 0
@@ -158,17 +148,17 @@ class MultiFeatureGenderClassifier:
         f1, f2, f3 = self.extract_formants(audio, sr)
         
         # 3. SPECTRAL FEATURES
-        spectral_centroid = np.mean(librosa.feature.spectral_centroid(y=audio, sr=sr))
-        spectral_rolloff = np.mean(librosa.feature.spectral_rolloff(y=audio, sr=sr))
-        spectral_bandwidth = np.mean(librosa.feature.spectral_bandwidth(y=audio, sr=sr))
+        spectral_centroid = np.mean(analysis.spectral_centroid())
+        spectral_rolloff = np.mean(analysis.spectral_rolloff())
+        spectral_bandwidth = np.mean(analysis.spectral_bandwidth())
         
         # 4. MFCC FEATURES (Voice texture)
-        mfcc = librosa.feature.mfcc(y=audio, sr=sr, n_mfcc=13)
+        mfcc = analysis.mfcc(n_mfcc=13)
         mfcc_mean = np.mean(mfcc, axis=1)
         
         # 5. VOICE QUALITY
-        zcr = np.mean(librosa.feature.zero_crossing_rate(audio))
-        hnr = self.calculate_harmonic_to_noise_ratio(audio, sr)
+        zcr = np.mean(analysis.zero_crossing_rate())
+        hnr = self.calculate_harmonic_to_noise_ratio(audio, sr, analysis)
         
         return {
             'pitch_mean': pitch_mean,
@@ -301,14 +291,14 @@ class MultiFeatureGenderClassifier:
         else:
             return "uncertain", 50.0
     
-    def classify(self, audio: np.ndarray, sr: int) -> Tuple[str, float]:
+    def classify(self, audio: np.ndarray, sr: int, analysis=None) -> Tuple[str, float]:
         """
         Main classification method.
         Uses multiple features for robust classification.
         """
         try:
             # Extract all features
-            features = self.extract_all_features(audio, sr)
+            features = self.extract_all_features(audio, sr, analysis)
             
             # Classify using rules
             label, confidence = self.classify_by_rules(features)
@@ -330,15 +320,16 @@ class SimplifiedMultiFeatureClassifier:
     def __init__(self):
         pass
     
-    def classify(self, audio: np.ndarray, sr: int) -> Tuple[str, float]:
+    def classify(self, audio: np.ndarray, sr: int, analysis=None) -> Tuple[str, float]:
         """Classify using pitch + spectral features only."""
+        analysis = SegmentAnalysis.ensure(analysis, audio, sr)
         
         # Extract basic features
-        pitches, magnitudes = librosa.piptrack(y=audio, sr=sr)
+        pitches, magnitudes = analysis.piptrack()
         pitch_values = pitches[magnitudes > np.max(magnitudes) * 0.1]
         pitch_mean = np.mean(pitch_values[pitch_values > 0]) if len(pitch_values) > 0 else 0
         
-        spectral_centroid = np.mean(librosa.feature.spectral_centroid(y=audio, sr=sr))
+        spectral_centroid = np.mean(analysis.spectral_centroid())
         
         # Simple scoring
         male_score = 0
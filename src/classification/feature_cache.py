@@ -0,0 +1,320 @@
+"""
+Feature Cache
+Parallel feature extraction with a persistent, memory-mapped feature matrix
+
+Training a classifier used to decode every file and extract its features
+one at a time, and retraining re-extracted everything even when only a few
+files had been added. Feature rows are now extracted over a process pool
+and stored in .npy shards keyed by the file's content hash and the feature
+set version, so a retrain only extracts rows for new (or changed) files and
+reads the rest back memory-mapped.
+
+Key Features:
+- Rows keyed by content hash (BLAKE2b); renamed or copied files hit the cache
+- Hashes cached by path, size and mtime, so unchanged files are not re-read
+- Feature set name, version and sample rate are part of the key: bumping an
+  extractor's version invalidates its rows without touching other models
+- New rows land in a new shard per run (atomic write); old shards are
+  memory-mapped, never rewritten
+- Process pool fan-out in chunks (inline for small runs)
+"""
+
+import os
+import json
+import uuid
+import hashlib
+import logging
+import sqlite3
+import tempfile
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+CACHE_DB_FILENAME = "features.sqlite"
+
+# Below this many files the pool start-up costs more than it saves
+MIN_FILES_FOR_POOL = 16
+
+# (columns, rows) for a chunk of paths; rows[i] is None when file i failed.
+# Must be a module-level function so pool workers can unpickle it.
+ExtractFn = Callable[[List[str], int], Tuple[Optional[List[str]], List[Optional[np.ndarray]]]]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS file_hashes (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    hash TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS feature_rows (
+    hash TEXT NOT NULL,
+    feature_set TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    sample_rate INTEGER NOT NULL,
+    shard TEXT NOT NULL,
+    row INTEGER NOT NULL,
+    PRIMARY KEY (hash, feature_set, version, sample_rate)
+);
+CREATE TABLE IF NOT EXISTS feature_columns (
+    feature_set TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    sample_rate INTEGER NOT NULL,
+    names TEXT NOT NULL,
+    PRIMARY KEY (feature_set, version, sample_rate)
+);
+"""
+
+
+def file_hash(path: str, block_size: int = 1 << 20) -> str:
+    """BLAKE2b content hash of a file"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def extract_rows(paths: Sequence[str], extract: ExtractFn, sample_rate: int = 16000,
+                 num_workers: Optional[int] = None,
+                 chunk_size: int = 32) -> Tuple[Optional[List[str]], List[Optional[np.ndarray]]]:
+    """
+    Run extract over paths, in a process pool for larger inputs
+
+    Returns:
+        (columns, rows) with rows in input order
+    """
+    paths = list(paths)
+    num_workers = max(1, int(num_workers or os.cpu_count() or 1))
+    if len(paths) < MIN_FILES_FOR_POOL or num_workers == 1:
+        return extract(paths, sample_rate)
+
+    chunk_size = max(1, chunk_size)
+    chunks = [paths[i:i + chunk_size] for i in range(0, len(paths), chunk_size)]
+    # spawn: the caller may have torch/CUDA state that must not be forked
+    context = multiprocessing.get_context("spawn")
+    columns, rows = None, []
+    with ProcessPoolExecutor(max_workers=min(num_workers, len(chunks)), mp_context=context) as executor:
+        for chunk_columns, chunk_rows in executor.map(extract, chunks, [sample_rate] * len(chunks)):
+            columns = columns or chunk_columns
+            rows.extend(chunk_rows)
+    return columns, rows
+
+
+class FeatureCache:
+    """
+    Feature rows of one feature set/version, cached per file content
+    """
+
+    def __init__(self, cache_dir: str, feature_set: str, version: int, sample_rate: int = 16000):
+        """
+        Initialize cache
+
+        Args:
+            cache_dir: Directory holding features.sqlite and the shards
+            feature_set: Name of the extractor (e.g. 'ml_classifier')
+            version: Extractor version; bump when its features change
+            sample_rate: Rate the features are extracted at
+        """
+        self.cache_dir = cache_dir
+        self.feature_set = feature_set
+        self.version = version
+        self.sample_rate = sample_rate
+        self.shard_dir = os.path.join(cache_dir, f"{feature_set}-v{version}-{sample_rate}")
+
+        os.makedirs(self.shard_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(cache_dir, CACHE_DB_FILENAME), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._shards = {}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+        self._shards.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def _key(self) -> Tuple[str, int, int]:
+        return self.feature_set, self.version, self.sample_rate
+
+    def hashes(self, paths: Sequence[str], max_workers: Optional[int] = None) -> List[Optional[str]]:
+        """
+        Content hash of every path (None if unreadable), re-reading only
+        files whose size or mtime changed since they were last hashed
+        """
+        stats = []
+        for path in paths:
+            try:
+                stat = os.stat(path)
+                stats.append((stat.st_size, stat.st_mtime_ns))
+            except OSError:
+                stats.append(None)
+
+        with self._lock:
+            known = {row[0]: row[1:] for row in self._conn.execute(
+                "SELECT path, size, mtime_ns, hash FROM file_hashes")}
+
+        result = [None] * len(paths)
+        stale = []
+        for i, (path, stat) in enumerate(zip(paths, stats)):
+            if stat is None:
+                continue
+            cached = known.get(path)
+            if cached is not None and tuple(cached[:2]) == stat:
+                result[i] = cached[2]
+            else:
+                stale.append(i)
+
+        if stale:
+            def safe_hash(path):
+                try:
+                    return file_hash(path)
+                except OSError as e:
+                    logger.warning(f"Could not hash {path}: {e}")
+                    return None
+
+            max_workers = max_workers or min(32, (os.cpu_count() or 1) * 4)
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                for i, digest in zip(stale, executor.map(safe_hash, [paths[i] for i in stale])):
+                    result[i] = digest
+            with self._lock, self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO file_hashes (path, size, mtime_ns, hash) VALUES (?, ?, ?, ?)",
+                    [(paths[i], stats[i][0], stats[i][1], result[i]) for i in stale if result[i] is not None]
+                )
+        return result
+
+    def columns(self) -> Optional[List[str]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT names FROM feature_columns WHERE feature_set = ? AND version = ? AND sample_rate = ?",
+                self._key).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _locations(self, hashes: Sequence[str]) -> Dict[str, Tuple[str, int]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT hash, shard, row FROM feature_rows WHERE feature_set = ? AND version = ? AND sample_rate = ?",
+                self._key).fetchall()
+        wanted = set(hashes)
+        return {digest: (shard, row) for digest, shard, row in rows if digest in wanted}
+
+    def _shard(self, name: str) -> np.ndarray:
+        if name not in self._shards:
+            self._shards[name] = np.load(os.path.join(self.shard_dir, name), mmap_mode='r')
+        return self._shards[name]
+
+    def _store(self, digests: List[str], rows: np.ndarray, columns: Optional[List[str]]):
+        """Write new rows as one shard and register them"""
+        name = f"shard_{uuid.uuid4().hex[:12]}.npy"
+        fd, temp_path = tempfile.mkstemp(dir=self.shard_dir, suffix='.npy')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.save(f, rows)
+            os.replace(temp_path, os.path.join(self.shard_dir, name))
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        with self._lock, self._conn:
+            if columns is not None:
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO feature_columns (feature_set, version, sample_rate, names) "
+                    "VALUES (?, ?, ?, ?)", (*self._key, json.dumps(columns)))
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO feature_rows (hash, feature_set, version, sample_rate, shard, row) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(digest, *self._key, name, row) for row, digest in enumerate(digests)]
+            )
+
+    def matrix(self, paths: Sequence[str], extract: ExtractFn, num_workers: Optional[int] = None,
+               chunk_size: int = 32) -> Tuple[np.ndarray, np.ndarray, Optional[List[str]]]:
+        """
+        Feature matrix for paths, extracting only rows not cached yet
+
+        Args:
+            paths: Audio files
+            extract: Module-level (columns, rows) extraction function
+            num_workers: Worker processes for the extraction (default: one per core)
+            chunk_size: Files per pool task
+
+        Returns:
+            (X, valid, columns): X has one row per readable, extractable
+            path; valid holds the positions in paths those rows belong to
+        """
+        paths = list(paths)
+        hashes = self.hashes(paths)
+        locations = self._locations([digest for digest in hashes if digest])
+
+        # One extraction per missing content hash (duplicates share a row)
+        missing = {}
+        for path, digest in zip(paths, hashes):
+            if digest and digest not in locations and digest not in missing:
+                missing[digest] = path
+
+        columns = self.columns()
+        if missing:
+            logger.info(f"Extracting features for {len(missing)} files "
+                        f"({len(paths) - len(missing)} cached) [{self.feature_set} v{self.version}]")
+            new_columns, rows = extract_rows(list(missing.values()), extract, self.sample_rate,
+                                             num_workers, chunk_size)
+            if columns is not None and new_columns is not None and new_columns != columns:
+                raise ValueError(f"Feature columns of {self.feature_set} v{self.version} changed; "
+                                 f"bump its version")
+            columns = columns or new_columns
+            extracted = [(digest, row) for digest, row in zip(missing, rows) if row is not None]
+            if extracted:
+                self._store([digest for digest, _ in extracted],
+                            np.vstack([row for _, row in extracted]).astype(np.float64), columns)
+                locations = self._locations([digest for digest in hashes if digest])
+
+        valid = np.array([i for i, digest in enumerate(hashes) if digest in locations], dtype=int)
+        if not len(valid):
+            return np.empty((0, len(columns or ()))), valid, columns
+
+        # Gather rows shard by shard from the memory-mapped files
+        first = locations[hashes[valid[0]]]
+        X = np.empty((len(valid), self._shard(first[0]).shape[1]), dtype=np.float64)
+        by_shard = {}
+        for out_row, i in enumerate(valid):
+            shard, row = locations[hashes[i]]
+            by_shard.setdefault(shard, ([], []))
+            by_shard[shard][0].append(out_row)
+            by_shard[shard][1].append(row)
+        for shard, (out_rows, rows) in by_shard.items():
+            X[out_rows] = self._shard(shard)[rows]
+        return X, valid, columns
+
+
+def build_feature_matrix(paths: Sequence[str], extract: ExtractFn, feature_set: str, version: int,
+                         sample_rate: int = 16000, cache_dir: Optional[str] = None,
+                         num_workers: Optional[int] = None,
+                         chunk_size: int = 32) -> Tuple[np.ndarray, np.ndarray, Optional[List[str]]]:
+    """
+    Feature matrix for paths: cached in cache_dir if given, extracted over
+    a process pool either way
+
+    Returns:
+        (X, valid, columns) as FeatureCache.matrix
+    """
+    if cache_dir:
+        with FeatureCache(cache_dir, feature_set, version, sample_rate) as cache:
+            return cache.matrix(paths, extract, num_workers, chunk_size)
+
+    columns, rows = extract_rows(paths, extract, sample_rate, num_workers, chunk_size)
+    valid = np.array([i for i, row in enumerate(rows) if row is not None], dtype=int)
+    if not len(valid):
+        return np.empty((0, len(columns or ()))), valid, columns
+    return np.vstack([rows[i] for i in valid]).astype(np.float64), valid, columns
@@ -1,30 +1,62 @@
 import os
+import re
+import shutil
+import tempfile
+import threading
+import importlib.util
+from datetime import datetime
 import numpy as np
-import pandas as pd
-from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.metrics import accuracy_score, classification_report
-from sklearn.preprocessing import StandardScaler
-import joblib
 import librosa
 import soundfile as sf
-import torch
 from typing import List, Tuple, Dict, Optional
 import logging
 
+from preprocessing.segment_analysis import SegmentAnalysis
+from dataset.metadata import read_metadata
+from classification.feature_cache import build_feature_matrix
+
 logger = logging.getLogger(__name__)
 
-# Try to import CUDA acceleration (optional)
-try:
-    from torch.cuda.amp import autocast
-    AUTOCAST_AVAILABLE = True
-except (ImportError, AttributeError):
-    AUTOCAST_AVAILABLE = False
+# sklearn, joblib and torch are imported where they are used, so importing the
+# classification package stays cheap until a model is trained or loaded
+AUTOCAST_AVAILABLE = importlib.util.find_spec("torch") is not None
+
+# Feature cache identity of extract_features; bump FEATURE_VERSION when the
+# features it returns change so cached training rows are recomputed
+FEATURE_SET = "ml_classifier"
+FEATURE_VERSION = 1
+
+# Per-process classifier used by extract_feature_rows (pool workers)
+_extractors = {}
+
+# Published versions are kept as <model_path without .pkl>/v0001.pkl, ...
+_VERSION_FILE = re.compile(r'^v(\d+)\.pkl$')
+_publish_lock = threading.Lock()
+
+def extract_feature_rows(paths: List[str], sample_rate: int = 16000) -> Tuple[List[str], List[Optional[np.ndarray]]]:
+    """Feature rows for a chunk of files (None where a file fails); runs in pool workers."""
+    if sample_rate not in _extractors:
+        _extractors[sample_rate] = MLGenderClassifier(sample_rate)
+    classifier = _extractors[sample_rate]
+
+    rows = []
+    for path in paths:
+        try:
+            audio, sr = sf.read(path)
+            if sr != sample_rate:
+                audio = librosa.resample(audio, orig_sr=sr, target_sr=sample_rate)
+            rows.append(classifier.extract_features(audio))
+        except Exception as e:
+            logger.warning(f"Error processing {os.path.basename(path)}: {e}")
+            rows.append(None)
+    return classifier.feature_names, rows
 
 class MLGenderClassifier:
     """Machine Learning-based gender classification for voice samples with GPU acceleration."""
 
     def __init__(self, sample_rate: int = 16000):
+        import torch
+
         self.sample_rate = sample_rate
         # Try to detect CUDA, fallback to CPU
         try:
@@ -35,6 +67,11 @@ class MLGenderClassifier:
         self.model = None
         self.scaler = None
         self.is_trained = False
+        # Published model version, and the metadata rows ('label/file') it has
+        # consumed; watermark is their number
+        self.version = 0
+        self.watermark = 0
+        self.trained_keys = set()
         self.feature_names = [
             'pitch_mean', 'pitch_std', 'pitch_range',
             'mfcc_mean', 'mfcc_std', 'mfcc_range',
@@ -49,12 +86,22 @@ class MLGenderClassifier:
         except (RuntimeError, AttributeError):
             logger.debug("GPU acceleration not available")
 
-    def extract_features(self, audio: np.ndarray) -> np.ndarray:
-        """Extract acoustic features from audio for classification."""
+    def extract_features(self, audio: np.ndarray, analysis=None) -> np.ndarray:
+        """
+        Extract acoustic features from audio for classification.
+
+        Args:
+            audio: Audio time series at self.sample_rate
+            analysis: Optional SegmentAnalysis of the same audio; when given,
+                the STFT-based features are taken from it instead of recomputed
+        """
+        if analysis is None or analysis.sr != self.sample_rate:
+            analysis = SegmentAnalysis(audio, self.sample_rate)
+
         features = []
 
         # Pitch-based features
-        pitches, magnitudes = librosa.piptrack(y=audio, sr=self.sample_rate)
+        pitches, magnitudes = analysis.piptrack()
         pitch_values = pitches[magnitudes > np.max(magnitudes) * 0.1]
         if len(pitch_values) > 0:
             features.extend([
@@ -66,7 +113,7 @@ class MLGenderClassifier:
             features.extend([0, 0, 0])
 
         # MFCC features
-        mfccs = librosa.feature.mfcc(y=audio, sr=self.sample_rate, n_mfcc=13)
+        mfccs = analysis.mfcc(n_mfcc=13)
         features.extend([
             np.mean(mfccs, axis=1).mean(),  # mfcc_mean
             np.std(mfccs, axis=1).mean(),   # mfcc_std
@@ -74,23 +121,23 @@ class MLGenderClassifier:
         ])
 
         # Chroma features
-        chroma = librosa.feature.chroma_stft(y=audio, sr=self.sample_rate)
+        chroma = analysis.chroma()
         features.extend([
             np.mean(chroma),  # chroma_mean
             np.std(chroma)    # chroma_std
         ])
 
         # Spectral features
-        spectral_centroid = librosa.feature.spectral_centroid(y=audio, sr=self.sample_rate)
-        spectral_bandwidth = librosa.feature.spectral_bandwidth(y=audio, sr=self.sample_rate)
+        spectral_centroid = analysis.spectral_centroid()
+        spectral_bandwidth = analysis.spectral_bandwidth()
         features.extend([
             np.mean(spectral_centroid),    # spectral_centroid
             np.mean(spectral_bandwidth)    # spectral_bandwidth
         ])
 
         # Other features
-        zcr = librosa.feature.zero_crossing_rate(audio)
-        rms = librosa.feature.rms(y=audio)
+        zcr = analysis.zero_crossing_rate()
+        rms = analysis.rms()
         features.extend([
             np.mean(zcr),  # zero_crossing_rate
             np.mean(rms)   # rms_energy
@@ -99,14 +146,25 @@ class MLGenderClassifier:
         return np.array(features)
 
     def load_training_data(self, metadata_file: str, dataset_dir: str,
-                          min_confidence: float = 70.0) -> Tuple[np.ndarray, np.ndarray]:
-        """Load verified training data from metadata and audio files."""
-        if not os.path.exists(metadata_file):
-            raise FileNotFoundError(f"Metadata file not found: {metadata_file}")
-
-        # Load metadata
-        df = pd.read_csv(metadata_file)
-
+                          min_confidence: float = 70.0, cache_dir: Optional[str] = None,
+                          num_workers: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Load verified training data from metadata and audio files.
+
+        Features are extracted over a process pool; with cache_dir, rows of
+        files seen by an earlier run are read from the feature cache instead.
+        Records the metadata rows read in self.trained_keys / self.watermark.
+        """
+        # Load metadata (Parquet parts if present, only the columns used here)
+        df = read_metadata(metadata_file, columns=['file', 'label', 'confidence'])
+        self.trained_keys = set(metadata_keys(df))
+        self.watermark = len(self.trained_keys)
+        return self.training_matrix(df, dataset_dir, min_confidence, cache_dir, num_workers)
+
+    def training_matrix(self, df, dataset_dir: str, min_confidence: float = 70.0,
+                        cache_dir: Optional[str] = None,
+                        num_workers: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Features and labels of the verified samples among the metadata rows in df."""
         # Filter high-confidence samples
         verified_df = df[df['confidence'] >= min_confidence].copy()
 
@@ -115,44 +173,32 @@ class MLGenderClassifier:
 
         logger.info(f"Loading {len(verified_df)} verified samples for training")
 
-        features_list = []
+        file_paths = []
         labels_list = []
+        for label, file in zip(verified_df['label'], verified_df['file']):
+            file_path = os.path.join(dataset_dir, label, file)
+            if os.path.exists(file_path):
+                file_paths.append(file_path)
+                labels_list.append(1 if label == 'male' else 0)  # 1=male, 0=female
 
-        for _, row in verified_df.iterrows():
-            try:
-                # Construct file path
-                file_path = os.path.join(dataset_dir, row['label'], row['file'])
-
-                if not os.path.exists(file_path):
-                    continue
-
-                # Load audio
-                audio, sr = sf.read(file_path)
-
-                # Resample if necessary
-                if sr != self.sample_rate:
-                    audio = librosa.resample(audio, orig_sr=sr, target_sr=self.sample_rate)
-
-                # Extract features
-                features = self.extract_features(audio)
-                features_list.append(features)
-                labels_list.append(1 if row['label'] == 'male' else 0)  # 1=male, 0=female
+        X, valid, _ = build_feature_matrix(file_paths, extract_feature_rows, FEATURE_SET, FEATURE_VERSION,
+                                           self.sample_rate, cache_dir=cache_dir, num_workers=num_workers)
 
-            except Exception as e:
-                logger.warning(f"Error processing {row['file']}: {e}")
-                continue
-
-        if len(features_list) == 0:
+        if len(X) == 0:
             raise ValueError("No valid training samples found")
 
-        X = np.array(features_list)
-        y = np.array(labels_list)
+        y = np.array(labels_list)[valid]
 
         logger.info(f"Successfully loaded {len(X)} training samples")
         return X, y
 
     def train(self, X: np.ndarray, y: np.ndarray, test_size: float = 0.2) -> Dict[str, float]:
         """Train the ML classifier with GPU acceleration."""
+        from sklearn.model_selection import train_test_split
+        from sklearn.ensemble import RandomForestClassifier
+        from sklearn.metrics import accuracy_score, classification_report
+        from sklearn.preprocessing import StandardScaler
+
         logger.info(f"Training ML gender classifier on {str(self.device)}...")
 
         # Split data
@@ -196,13 +242,63 @@ class MLGenderClassifier:
         logger.info(f"Model training completed with accuracy: {accuracy:.2%}")
         return results
 
-    def predict(self, audio: np.ndarray) -> Tuple[str, float]:
+    @property
+    def is_incremental(self) -> bool:
+        """Whether the trained model can be updated with partial_train()."""
+        return self.is_trained and hasattr(self.model, 'partial_fit')
+
+    def partial_train(self, X: np.ndarray, y: np.ndarray, epochs: int = 5) -> Dict[str, float]:
+        """
+        Update the model with new samples only (online learning).
+
+        The incremental model is a logistic-regression SGDClassifier; the
+        scaler statistics are updated with partial_fit as well. A model from
+        train() (RandomForest) cannot be updated in place and is replaced by
+        a new incremental model fitted on X.
+
+        Args:
+            X: Feature rows of the new samples
+            y: Labels (1=male, 0=female)
+            epochs: Passes over the new samples
+
+        Returns:
+            Dictionary with new_samples and accuracy (of the previous version
+            on the new samples when there is one, else of the fitted model)
+        """
+        from sklearn.linear_model import SGDClassifier
+        from sklearn.metrics import accuracy_score
+        from sklearn.preprocessing import StandardScaler
+
+        results = {'new_samples': len(X)}
+        if self.is_incremental:
+            # Prequential check: the current version on samples it has not seen yet
+            results['accuracy'] = accuracy_score(y, self.model.predict(self.scaler.transform(X)))
+        else:
+            logger.info("Starting a new incremental (SGD) model")
+            self.scaler = StandardScaler()
+            self.model = SGDClassifier(loss='log_loss', alpha=1e-4, random_state=42)
+
+        self.scaler.partial_fit(X)
+        X_scaled = self.scaler.transform(X)
+        rng = np.random.default_rng(self.version)
+        for _ in range(max(1, epochs)):
+            order = rng.permutation(len(X_scaled))
+            self.model.partial_fit(X_scaled[order], y[order], classes=np.array([0, 1]))
+
+        if 'accuracy' not in results:
+            results['accuracy'] = accuracy_score(y, self.model.predict(X_scaled))
+        self.is_trained = True
+
+        logger.info(f"Incremental update on {len(X)} samples (accuracy on them: {results['accuracy']:.2%})")
+        return results
+
+    def predict(self, audio: np.ndarray, analysis=None) -> Tuple[str, float]:
         """Predict gender from audio features."""
         if not self.is_trained:
             raise ValueError("Model not trained. Call train() first.")
 
         # Extract features
-        features = self.extract_features(audio)
+        features = self.extract_features(audio, analysis)
 
         # Scale features
         features_scaled = self.scaler.transform(features.reshape(1, -1))
@@ -216,38 +312,51 @@ class MLGenderClassifier:
 
         return label, confidence
 
-    def predict_batch(self, audio_batch: List[np.ndarray]) -> List[Tuple[str, float]]:
-        """GPU-accelerated batch prediction."""
+    def extract_features_batch(self, audio_batch: List[np.ndarray],
+                               analyses: Optional[List[SegmentAnalysis]] = None) -> np.ndarray:
+        """
+        Extract features for many segments in one vectorized pass.
+
+        Args:
+            audio_batch: Audio segments at self.sample_rate
+            analyses: Optional matching SegmentAnalysis objects (e.g. from
+                SegmentAnalysis.batch); built with one joint STFT if None
+
+        Returns:
+            Feature matrix of shape (len(audio_batch), n_features)
+        """
+        if analyses is None:
+            analyses = SegmentAnalysis.batch(audio_batch, self.sample_rate)
+        return np.vstack([self.extract_features(audio, analysis)
+                          for audio, analysis in zip(audio_batch, analyses)])
+
+    def predict_batch(self, audio_batch: List[np.ndarray],
+                      analyses: Optional[List[SegmentAnalysis]] = None) -> List[Tuple[str, float]]:
+        """
+        Batch prediction: one feature pass, one scaler call, one predict_proba call.
+
+        Args:
+            audio_batch: Audio segments at self.sample_rate
+            analyses: Optional matching SegmentAnalysis objects
+
+        Returns:
+            List of (label, confidence) tuples
+        """
         if not self.is_trained:
             raise ValueError("Model not trained. Cannot predict.")
-        
-        features_batch = []
-        
-        for audio in audio_batch:
-            features = self.extract_features(audio)
-            features_batch.append(features)
-        
-        # Convert to array and scale
-        features_array = np.array(features_batch)
-        features_scaled = self.scaler.transform(features_array)
-        
-        # Batch prediction
-        if torch.cuda.is_available():
-            logger.debug(f"GPU batch prediction: {len(audio_batch)} samples")
-            # Move to tensor for GPU acceleration
-            features_tensor = torch.tensor(features_scaled, dtype=torch.float32)
-            features_tensor = features_tensor.to(self.device)
-            
-        # Use model for predictions
-        predictions = self.model.predict(features_scaled)
+        if len(audio_batch) == 0:
+            return []
+
+        features_scaled = self.scaler.transform(self.extract_features_batch(audio_batch, analyses))
         probabilities = self.model.predict_proba(features_scaled)
-        
+        predictions = self.model.classes_[np.argmax(probabilities, axis=1)]
+
         results = []
         for pred, probs in zip(predictions, probabilities):
             label = 'male' if pred == 1 else 'female'
-            confidence = probs[pred] * 100
+            confidence = probs.max() * 100
             results.append((label, confidence))
-        
+
         return results
 
     def save_model(self, filepath: str):
@@ -260,9 +369,14 @@ class MLGenderClassifier:
             'scaler': self.scaler,
             'feature_names': self.feature_names,
             'sample_rate': self.sample_rate,
-            'is_trained': self.is_trained
+            'is_trained': self.is_trained,
+            'version': self.version,
+            'watermark': self.watermark,
+            'trained_keys': self.trained_keys,
+            'trained_at': datetime.now().isoformat()
         }
 
+        import joblib
         joblib.dump(model_data, filepath)
         logger.info(f"Model saved to {filepath}")
 
@@ -271,6 +385,7 @@ class MLGenderClassifier:
         if not os.path.exists(filepath):
             raise FileNotFoundError(f"Model file not found: {filepath}")
 
+        import joblib
         model_data = joblib.load(filepath)
 
         self.model = model_data['model']
@@ -278,14 +393,70 @@ class MLGenderClassifier:
         self.feature_names = model_data['feature_names']
         self.sample_rate = model_data['sample_rate']
         self.is_trained = model_data['is_trained']
+        self.version = model_data.get('version', 0)
+        self.watermark = model_data.get('watermark', 0)
+        self.trained_keys = set(model_data.get('trained_keys', ()))
+
+        logger.info(f"Model loaded from {filepath} (version {self.version})")
+
+def metadata_keys(df):
+    """Identity of each metadata row ('label/file'), independent of row order."""
+    return df['label'].astype(str) + '/' + df['file'].astype(str)
+
+def model_versions_dir(model_path: str) -> str:
+    """Directory holding the published versions of the model at model_path."""
+    return os.path.splitext(model_path)[0]
+
+def list_model_versions(model_path: str) -> List[int]:
+    """Published version numbers of the model at model_path, oldest first."""
+    versions_dir = model_versions_dir(model_path)
+    if not os.path.isdir(versions_dir):
+        return []
+    return sorted(int(match.group(1)) for match in map(_VERSION_FILE.match, os.listdir(versions_dir)) if match)
+
+def publish_model(classifier: MLGenderClassifier, model_path: str) -> str:
+    """
+    Save classifier as the next model version and make it the live model.
+
+    The version is kept under model_versions_dir(model_path); model_path is
+    replaced atomically, so classifiers watching it (IntegratedGenderClassifier
+    hot swap) never read a partial file.
+
+    Returns:
+        Path of the saved version
+    """
+    with _publish_lock:
+        versions_dir = model_versions_dir(model_path)
+        os.makedirs(versions_dir, exist_ok=True)
+        classifier.version = max(list_model_versions(model_path), default=0) + 1
+        version_path = os.path.join(versions_dir, f"v{classifier.version:04d}.pkl")
+        classifier.save_model(version_path)
+
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(model_path) or '.', suffix='.pkl')
+        os.close(fd)
+        try:
+            shutil.copyfile(version_path, temp_path)
+            os.replace(temp_path, model_path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
 
-        logger.info(f"Model loaded from {filepath}")
+    logger.info(f"Published model version {classifier.version} to {model_path}")
+    return version_path
 
 def train_ml_classifier(metadata_file: str = "data/voice_dataset/metadata.csv",
                        dataset_dir: str = "data/voice_dataset",
                        model_path: str = "models/ml_gender_classifier.pkl",
-                       min_confidence: float = 70.0) -> Dict[str, float]:
-    """Convenience function to train and save ML classifier."""
+                       min_confidence: float = 70.0,
+                       feature_cache_dir: Optional[str] = None,
+                       num_workers: Optional[int] = None) -> Dict[str, float]:
+    """
+    Convenience function to train and save ML classifier.
+
+    Feature rows are cached in feature_cache_dir (default: feature_cache/
+    next to the model), so retraining only extracts newly added files.
+    """
     # Create models directory
     os.makedirs(os.path.dirname(model_path), exist_ok=True)
 
@@ -293,14 +464,77 @@ def train_ml_classifier(metadata_file: str = "data/voice_dataset/metadata.csv",
     classifier = MLGenderClassifier()
 
     # Load training data
-    X, y = classifier.load_training_data(metadata_file, dataset_dir, min_confidence)
+    if feature_cache_dir is None:
+        feature_cache_dir = os.path.join(os.path.dirname(model_path), "feature_cache")
+    X, y = classifier.load_training_data(metadata_file, dataset_dir, min_confidence,
+                                         cache_dir=feature_cache_dir, num_workers=num_workers)
 
     # Train model
     results = classifier.train(X, y)
 
-    # Save model
-    classifier.save_model(model_path)
+    # Save as a new version and make it the live model
+    publish_model(classifier, model_path)
+    results['version'] = classifier.version
+
+    return results
+
+def update_ml_classifier(metadata_file: str = "data/voice_dataset/metadata.csv",
+                         dataset_dir: str = "data/voice_dataset",
+                         model_path: str = "models/ml_gender_classifier.pkl",
+                         min_confidence: float = 70.0,
+                         feature_cache_dir: Optional[str] = None,
+                         num_workers: Optional[int] = None,
+                         epochs: int = 5) -> Dict:
+    """
+    Incrementally update the ML classifier without a full retrain.
+
+    Only metadata rows the live model has not consumed yet (tracked by
+    label/file, so the order in which Parquet parts or concurrent writers
+    deliver rows does not matter) are fed to partial_train(); the result
+    is published as a new version.
+    If the live model is not incremental (e.g. the RandomForest from
+    train_ml_classifier) or there is none, an incremental model is first
+    fitted on all rows (their features usually come from the feature cache).
+
+    Returns:
+        Dictionary with status ('success' or 'up_to_date'), version,
+        new_samples, mode ('incremental' or 'bootstrap') and accuracy
+    """
+    os.makedirs(os.path.dirname(model_path) or '.', exist_ok=True)
+    if feature_cache_dir is None:
+        feature_cache_dir = os.path.join(os.path.dirname(model_path), "feature_cache")
 
+    classifier = MLGenderClassifier()
+    if os.path.exists(model_path):
+        classifier.load_model(model_path)
+
+    df = read_metadata(metadata_file, columns=['file', 'label', 'confidence'])
+    keys = metadata_keys(df)
+    new_rows = df
+    if classifier.is_incremental:
+        new_rows = df[~keys.isin(classifier.trained_keys)]
+
+    up_to_date = {'status': 'up_to_date', 'version': classifier.version, 'new_samples': 0,
+                  'accuracy': None}
+    if len(new_rows) == 0:
+        logger.info(f"Model version {classifier.version} is up to date")
+        return up_to_date
+
+    try:
+        X, y = classifier.training_matrix(new_rows, dataset_dir, min_confidence,
+                                          cache_dir=feature_cache_dir, num_workers=num_workers)
+    except ValueError as e:
+        logger.info(f"No usable new samples since version {classifier.version}: {e}")
+        return up_to_date
+
+    mode = 'incremental' if classifier.is_incremental else 'bootstrap'
+    results = classifier.partial_train(X, y, epochs=epochs)
+    # A bootstrap fit consumed every row; an update adds the new ones
+    classifier.trained_keys = set(keys) if mode == 'bootstrap' else classifier.trained_keys | set(keys)
+    classifier.watermark = len(classifier.trained_keys)
+    publish_model(classifier, model_path)
+
+    results.update({'status': 'success', 'version': classifier.version, 'mode': mode})
     return results
 
 def load_ml_classifier(model_path: str = "models/ml_gender_classifier.pkl") -> MLGenderClassifier:
@@ -29,6 +29,8 @@ import pickle
 import json
 from datetime import datetime
 
+from classification.feature_cache import build_feature_matrix
+
 try:
     from sklearn.ensemble import RandomForestClassifier
     from sklearn.preprocessing import StandardScaler
@@ -45,6 +47,11 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Feature cache identity of FeatureExtractor.extract_all_features; bump
+# FEATURE_VERSION when its features change so cached rows are recomputed
+FEATURE_SET = "gender_v3"
+FEATURE_VERSION = 1
+
 
 class FeatureExtractor:
     """Extract multi-dimensional audio features for gender classification"""
@@ -252,6 +259,28 @@ class FeatureExtractor:
         return np.array([features[name] for name in feature_names])
 
 
+def extract_feature_rows(audio_files: List[str], sr: int = 16000) -> Tuple[Optional[List[str]], List[Optional[np.ndarray]]]:
+    """
+    Load files and extract their feature vectors (runs in pool workers)
+    
+    Returns:
+        (feature_names, rows) where rows[i] is None if file i failed
+    """
+    extractor = FeatureExtractor(sr=sr)
+    feature_names, rows = None, []
+    for audio_file in audio_files:
+        try:
+            audio, _ = librosa.load(audio_file, sr=sr, mono=True)
+            features = extractor.extract_all_features(audio)
+            feature_names = feature_names or sorted(features.keys())
+            rows.append(np.array([features[name] for name in feature_names], dtype=np.float64))
+            logger.debug(f"Extracted features from {audio_file}")
+        except Exception as e:
+            logger.warning(f"Failed to extract features from {audio_file}: {e}")
+            rows.append(None)
+    return feature_names, rows
+
+
 class MLGenderClassifier:
     """
     Machine Learning-based gender classifier for audio segments
@@ -307,7 +336,8 @@ class MLGenderClassifier:
             logger.info("Using RandomForest classifier")
     
     def train(self, audio_files: List[str], labels: List[str], 
-              test_split: float = 0.2) -> Dict:
+              test_split: float = 0.2, cache_dir: Optional[str] = None,
+              num_workers: Optional[int] = None) -> Dict:
         """
         Train ML gender classifier
         
@@ -315,6 +345,9 @@ class MLGenderClassifier:
             audio_files: List of audio file paths
             labels: List of gender labels ('male', 'female', 'ambiguous')
             test_split: Proportion of data for testing
+            cache_dir: Optional feature cache directory; only files not seen
+                by an earlier run are decoded and extracted
+            num_workers: Feature extraction processes (default: one per core)
             
         Returns:
             Training results dictionary
@@ -322,27 +355,17 @@ class MLGenderClassifier:
         logger.info(f"Training ML classifier on {len(audio_files)} audio files...")
         
         try:
-            # Extract features from all audio files
-            features_list = []
-            valid_labels = []
-            
-            for audio_file, label in zip(audio_files, labels):
-                try:
-                    audio, _ = librosa.load(audio_file, sr=self.sr, mono=True)
-                    features = self.feature_extractor.extract_all_features(audio)
-                    features_list.append(features)
-                    valid_labels.append(label)
-                    logger.debug(f"Extracted features from {audio_file}")
-                except Exception as e:
-                    logger.warning(f"Failed to extract features from {audio_file}: {e}")
-                    continue
-            
-            if not features_list:
+            # Extract features from all audio files (process pool + cache)
+            X, valid, feature_names = build_feature_matrix(
+                audio_files, extract_feature_rows, FEATURE_SET, FEATURE_VERSION, self.sr,
+                cache_dir=cache_dir, num_workers=num_workers
+            )
+            
+            if len(X) == 0:
                 raise ValueError("No valid audio files for training")
             
-            # Convert to numpy array
-            self.feature_names = sorted(features_list[0].keys())
-            X = np.array([[f[name] for name in self.feature_names] for f in features_list])
+            self.feature_names = feature_names
+            valid_labels = [labels[i] for i in valid]
             
             # Encode labels
             unique_labels = sorted(set(valid_labels))
@@ -370,7 +393,7 @@ class MLGenderClassifier:
             return {
                 'status': 'success',
                 'accuracy': accuracy,
-                'num_samples': len(features_list),
+                'num_samples': len(X),
                 'num_features': len(self.feature_names),
                 'classes': unique_labels,
                 'model_type': self.model_type,
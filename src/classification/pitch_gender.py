@@ -19,9 +19,12 @@ class PitchGenderClassifier:
         self.male_threshold = male_threshold
         self.female_threshold = female_threshold
 
-    def estimate_pitch(self, audio: np.ndarray, sr: int) -> float:
+    def estimate_pitch(self, audio: np.ndarray, sr: int, analysis=None) -> float:
         """Estimate the fundamental frequency (pitch) of audio."""
-        pitches, mags = librosa.piptrack(y=audio, sr=sr)
+        if analysis is not None and analysis.sr == sr:
+            pitches, mags = analysis.piptrack()
+        else:
+            pitches, mags = librosa.piptrack(y=audio, sr=sr)
 
         # Get pitches above median magnitude
         pitch_values = pitches[mags > np.median(mags)]
@@ -33,14 +36,19 @@ class PitchGenderClassifier:
         non_zero_pitches = pitch_values[pitch_values > 0]
         return np.mean(non_zero_pitches) if len(non_zero_pitches) > 0 else 0.0
 
-    def classify(self, audio: np.ndarray, sr: int) -> Tuple[str, float]:
+    def classify(self, audio: np.ndarray, sr: int, analysis=None) -> Tuple[str, float]:
         """
         Classify gender based on pitch.
 
+        Args:
+            audio: Audio time series
+            sr: Sample rate
+            analysis: Optional SegmentAnalysis shared with other stages
+
         Returns:
             Tuple of (gender_label, confidence_score)
         """
-        pitch = self.estimate_pitch(audio, sr)
+        pitch = self.estimate_pitch(audio, sr, analysis)
 
         if pitch == 0.0:
             # Cannot determine pitch
@@ -0,0 +1,154 @@
+"""
+Sample ID Allocator
+Process- and thread-safe sequential IDs for voice_sample_NNNN.wav names
+
+The counter file used to be read, incremented and rewritten for every
+sample, which raced between threads and processes. The allocator instead
+reserves IDs in blocks: the counter file is only touched (under an
+exclusive file lock) once per block, and IDs inside a block are handed out
+from memory under a thread lock.
+
+Key Features:
+- Blocks of IDs reserved atomically from the counter file
+- fcntl lock on POSIX, msvcrt on Windows
+- Inherited blocks are discarded after fork so parent and child never share IDs
+- Same {"counter": N} file format as before (N = highest reserved ID)
+
+Unused IDs are handed back at exit when no other process has reserved a
+block since; otherwise they are skipped, so numbering may have gaps but
+never repeats.
+"""
+
+import os
+import json
+import atexit
+import logging
+import threading
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+try:
+    import msvcrt
+    MSVCRT_AVAILABLE = True
+except ImportError:
+    MSVCRT_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BLOCK_SIZE = 1000
+
+
+class _FileLock:
+    """Exclusive advisory lock on a sidecar .lock file."""
+
+    def __init__(self, path):
+        self.path = path
+        self._fd = None
+
+    def __enter__(self):
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        if FCNTL_AVAILABLE:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+        elif MSVCRT_AVAILABLE:
+            msvcrt.locking(self._fd, msvcrt.LK_LOCK, 1)
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            if FCNTL_AVAILABLE:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            elif MSVCRT_AVAILABLE:
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+
+
+class BlockIdAllocator:
+    """Hand out sequential IDs from blocks reserved in a shared counter file."""
+
+    def __init__(self, counter_file, block_size=DEFAULT_BLOCK_SIZE):
+        """
+        Initialize allocator
+
+        Args:
+            counter_file: JSON file holding the highest reserved ID
+            block_size: Number of IDs reserved per file access
+        """
+        self.counter_file = counter_file
+        self.block_size = max(1, int(block_size))
+        self._lock = threading.Lock()
+        self._next = 1
+        self._end = 0  # Exclusive end of the current block; empty until first reserve
+
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._discard_block)
+        atexit.register(self.release)
+
+    def _discard_block(self):
+        # Runs in a forked child: the parent keeps using the block it holds
+        self._lock = threading.Lock()
+        self._next, self._end = 1, 0
+
+    def _read_counter(self):
+        try:
+            with open(self.counter_file, "r") as f:
+                return int(json.load(f).get("counter", 0))
+        except FileNotFoundError:
+            return 0
+        except (ValueError, OSError) as e:
+            logger.warning(f"Unreadable counter file {self.counter_file}: {e}")
+            return 0
+
+    def _write_counter(self, value):
+        tmp_path = f"{self.counter_file}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"counter": value}, f)
+        os.replace(tmp_path, self.counter_file)
+
+    def _reserve_block(self, size):
+        """Atomically reserve the next size IDs; returns (first, end_exclusive)."""
+        os.makedirs(os.path.dirname(self.counter_file) or ".", exist_ok=True)
+        with _FileLock(f"{self.counter_file}.lock"):
+            start = self._read_counter() + 1
+            self._write_counter(start + size - 1)
+        return start, start + size
+
+    def next_id(self):
+        """Return the next unused ID."""
+        with self._lock:
+            if self._next >= self._end:
+                self._next, self._end = self._reserve_block(self.block_size)
+            value = self._next
+            self._next += 1
+            return value
+
+    def current(self):
+        """Highest ID reserved by any process (without reserving)."""
+        return self._read_counter()
+
+    def release(self):
+        """Return the unused tail of the current block if it is still the last one reserved."""
+        with self._lock:
+            if self._next >= self._end:
+                return
+            try:
+                with _FileLock(f"{self.counter_file}.lock"):
+                    if self._read_counter() == self._end - 1:
+                        self._write_counter(self._next - 1)
+            except OSError as e:
+                logger.debug(f"Could not release ID block: {e}")
+            self._next, self._end = 1, 0
+
+    def reset(self):
+        """Remove the counter file and drop the in-memory block."""
+        with self._lock:
+            with _FileLock(f"{self.counter_file}.lock"):
+                if os.path.exists(self.counter_file):
+                    os.remove(self.counter_file)
+            self._next, self._end = 1, 0
@@ -0,0 +1,355 @@
+"""
+Dataset Index
+SQLite index of the samples in data/voice_dataset for browsing
+
+The dataset API used to list a label directory, stat every file and parse
+the confidence out of the file name on every request (which always gave 0,
+since samples are saved as voice_sample_NNNN.wav). Samples are now indexed
+as they are written, from the same row that goes into the metadata table,
+and browsing is an indexed query.
+
+Key Features:
+- One row per sample: label, file, source, confidence, quality, duration...
+- Filters on label and confidence/quality/duration ranges
+- Sorting on the numeric columns or the file name, cursor (keyset)
+  pagination: every page costs the same, however deep
+- sync(): (re)builds the index from the metadata table and the label
+  directories, for datasets written before the index existed
+"""
+
+import os
+import json
+import base64
+import logging
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILENAME = "index.sqlite"
+
+# Columns taken from metadata rows
+_NUMERIC_COLUMNS = ("confidence", "quality_score", "duration", "snr", "pitch",
+                    "clipping_ratio", "silence_ratio")
+_TEXT_COLUMNS = ("source", "speaker", "separation_type")
+
+SORT_COLUMNS = ("confidence", "quality_score", "duration", "snr", "pitch", "file", "id")
+
+# Range filters: query name -> (column, operator)
+RANGE_FILTERS = {
+    "min_confidence": ("confidence", ">="),
+    "max_confidence": ("confidence", "<="),
+    "min_quality": ("quality_score", ">="),
+    "max_quality": ("quality_score", "<="),
+    "min_duration": ("duration", ">="),
+    "max_duration": ("duration", "<="),
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS samples (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    label TEXT NOT NULL,
+    file TEXT NOT NULL,
+    size INTEGER,
+    source TEXT,
+    speaker TEXT,
+    separation_type TEXT,
+    confidence REAL,
+    quality_score REAL,
+    duration REAL,
+    snr REAL,
+    pitch REAL,
+    clipping_ratio REAL,
+    silence_ratio REAL,
+    UNIQUE (label, file)
+);
+CREATE TABLE IF NOT EXISTS index_state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def _sort_key(column: str) -> str:
+    """SQL sort expression; NULLs map below every real value so keys are total"""
+    if column in ("id", "file"):
+        return column
+    return f"COALESCE({column}, -1e308)"
+
+
+def _index_schema() -> str:
+    # Expression indexes matching _sort_key, so ordering and cursor seeks
+    # are index range scans
+    statements = []
+    for column in SORT_COLUMNS:
+        if column == "id":
+            continue
+        key = _sort_key(column)
+        statements.append(f"CREATE INDEX IF NOT EXISTS idx_samples_label_{column} "
+                          f"ON samples(label, {key}, id);")
+        if column in ("confidence", "quality_score", "duration"):
+            statements.append(f"CREATE INDEX IF NOT EXISTS idx_samples_{column} ON samples({key}, id);")
+    return "\n".join(statements)
+
+
+def _number(value) -> Optional[float]:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if number != number else number  # NaN -> NULL
+
+
+def _text(value) -> Optional[str]:
+    if value is None or (isinstance(value, float) and value != value):
+        return None
+    return str(value)
+
+
+def encode_cursor(sort_value, row_id: int) -> str:
+    """Opaque cursor pointing after (sort_value, row_id)"""
+    return base64.urlsafe_b64encode(json.dumps([sort_value, row_id]).encode()).decode()
+
+
+def decode_cursor(cursor: str):
+    try:
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return sort_value, int(row_id)
+    except Exception:
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+
+
+class DatasetIndex:
+    """
+    Browsable SQLite index of dataset samples
+    """
+
+    def __init__(self, db_path: str):
+        """
+        Initialize index
+
+        Args:
+            db_path: SQLite database file (usually <dataset_dir>/index.sqlite)
+        """
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.executescript(_index_schema())
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def _row_values(label: str, file: str, entry: Dict, size: Optional[int]) -> tuple:
+        return (label, file, size,
+                *(_text(entry.get(column)) for column in _TEXT_COLUMNS),
+                *(_number(entry.get(column)) for column in _NUMERIC_COLUMNS))
+
+    def add_many(self, rows: Iterable[tuple]):
+        """
+        Index samples
+
+        Args:
+            rows: (label, file, metadata entry, size in bytes) tuples; an
+                existing (label, file) is replaced
+        """
+        values = [self._row_values(*row) for row in rows]
+        if not values:
+            return
+        columns = ("label", "file", "size") + _TEXT_COLUMNS + _NUMERIC_COLUMNS
+        with self._lock, self._conn:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO samples ({', '.join(columns)}) "
+                f"VALUES ({', '.join('?' * len(columns))})", values
+            )
+
+    def add(self, label: str, file: str, entry: Dict, size: Optional[int] = None):
+        """Index one sample"""
+        self.add_many([(label, file, entry, size)])
+
+    def remove(self, label: str, file: str):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM samples WHERE label = ? AND file = ?", (label, file))
+
+    def count(self, label: Optional[str] = None, **filters) -> int:
+        """Number of samples matching the filters"""
+        where, params = self._where(label, filters)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM samples {where}", params).fetchone()[0]
+
+    def labels(self) -> Dict[str, int]:
+        """Sample count per label"""
+        with self._lock:
+            rows = self._conn.execute("SELECT label, COUNT(*) FROM samples GROUP BY label").fetchall()
+        return {row[0]: row[1] for row in rows}
+
+    @staticmethod
+    def _where(label: Optional[str], filters: Dict):
+        clauses, params = [], []
+        if label is not None:
+            clauses.append("label = ?")
+            params.append(label)
+        for name, value in filters.items():
+            if value is None:
+                continue
+            if name not in RANGE_FILTERS:
+                raise ValueError(f"Unknown filter '{name}', expected one of {sorted(RANGE_FILTERS)}")
+            column, operator = RANGE_FILTERS[name]
+            clauses.append(f"{column} {operator} ?")
+            params.append(float(value))
+        return ("WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def query(self, label: Optional[str] = None, sort: str = "confidence", order: str = "desc",
+              limit: int = 100, cursor: Optional[str] = None, **filters) -> Dict:
+        """
+        One page of samples
+
+        Args:
+            label: Restrict to one label (all labels if None)
+            sort: One of SORT_COLUMNS
+            order: 'asc' or 'desc'
+            limit: Page size
+            cursor: next_cursor of the previous page
+            **filters: Range filters (min_confidence, max_quality, ...)
+
+        Returns:
+            Dictionary with 'items' (sample dictionaries) and 'next_cursor'
+            (None on the last page)
+        """
+        if sort not in SORT_COLUMNS:
+            raise ValueError(f"Unknown sort column '{sort}', expected one of {SORT_COLUMNS}")
+        if order not in ("asc", "desc"):
+            raise ValueError(f"Unknown order '{order}', expected 'asc' or 'desc'")
+        limit = max(1, int(limit))
+
+        where, params = self._where(label, filters)
+        direction = "DESC" if order == "desc" else "ASC"
+        comparison = "<" if order == "desc" else ">"
+
+        key = _sort_key(sort)
+
+        if cursor is not None:
+            sort_value, row_id = decode_cursor(cursor)
+            if sort == "id":
+                clause = f"id {comparison} ?"
+                cursor_params = [row_id]
+            else:
+                clause = f"({key} {comparison} ? OR ({key} = ? AND id {comparison} ?))"
+                cursor_params = [sort_value, sort_value, row_id]
+            where = f"{where} AND {clause}" if where else f"WHERE {clause}"
+            params = params + cursor_params
+
+        sql = (f"SELECT *, {key} AS sort_key FROM samples {where} "
+               f"ORDER BY {key} {direction}, id {direction} LIMIT ?")
+        with self._lock:
+            rows = self._conn.execute(sql, params + [limit + 1]).fetchall()
+
+        items = [dict(row) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = items[-1]
+            next_cursor = encode_cursor(last["sort_key"], last["id"])
+        for item in items:
+            item.pop("sort_key")
+        return {"items": items, "next_cursor": next_cursor}
+
+    def _get_state(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM index_state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_state(self, key: str, value: str):
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO index_state (key, value) VALUES (?, ?)", (key, value))
+
+    def sync(self, dataset_dir: str, metadata_path: Optional[str] = None, force: bool = False) -> int:
+        """
+        Bring the index up to date with a dataset directory
+
+        Metadata rows whose file exists are indexed with their values;
+        audio files without a metadata row are indexed with size only, and
+        index rows whose file is gone are removed. Skipped when neither the
+        metadata table nor a label directory changed since the last sync.
+
+        Args:
+            dataset_dir: Dataset root with one directory per label
+            metadata_path: metadata.csv (default: <dataset_dir>/metadata.csv)
+            force: Sync even if nothing seems to have changed
+
+        Returns:
+            Number of indexed samples after the sync (-1 if skipped)
+        """
+        from dataset.metadata import parquet_path_for, read_metadata
+
+        metadata_path = metadata_path or os.path.join(dataset_dir, "metadata.csv")
+        label_dirs = sorted(d for d in os.listdir(dataset_dir)
+                            if os.path.isdir(os.path.join(dataset_dir, d)) and not d.startswith('.')) \
+            if os.path.isdir(dataset_dir) else []
+
+        watched = [metadata_path, parquet_path_for(metadata_path)] + \
+                  [os.path.join(dataset_dir, d) for d in label_dirs]
+        signature = json.dumps([os.path.getmtime(p) if os.path.exists(p) else None for p in watched])
+        if not force and self._get_state("signature") == signature:
+            return -1
+
+        on_disk = {}
+        for label in label_dirs:
+            with os.scandir(os.path.join(dataset_dir, label)) as entries:
+                for entry in entries:
+                    if entry.is_file() and entry.name.endswith(".wav"):
+                        on_disk[(label, entry.name)] = entry.stat().st_size
+
+        rows = {}
+        try:
+            metadata = read_metadata(metadata_path)
+            for record in metadata.to_dict("records"):
+                key = (_text(record.get("label")), _text(record.get("file")))
+                if key in on_disk:
+                    rows[key] = record
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Could not read metadata for the dataset index: {e}")
+
+        with self._lock:
+            indexed = {(row[0], row[1]) for row in
+                       self._conn.execute("SELECT label, file FROM samples").fetchall()}
+        stale = indexed - set(on_disk)
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM samples WHERE label = ? AND file = ?", list(stale))
+
+        # Metadata rows replace whatever is indexed; bare files only fill gaps
+        self.add_many((label, file, rows[(label, file)], size)
+                      for (label, file), size in on_disk.items() if (label, file) in rows)
+        self.add_many((label, file, {}, size) for (label, file), size in on_disk.items()
+                      if (label, file) not in rows and (label, file) not in indexed)
+
+        self._set_state("signature", signature)
+        total = self.count()
+        logger.info(f"Dataset index synced: {total} samples ({len(rows)} with metadata, {len(stale)} removed)")
+        return total
+
+
+def index_path_for(dataset_dir: str) -> str:
+    """Default index location for a dataset directory"""
+    return os.path.join(dataset_dir, INDEX_FILENAME)
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_dataset_index(db_path: str) -> DatasetIndex:
+    """Shared index for db_path; every user in the process gets the same connection"""
+    key = os.path.abspath(db_path)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = DatasetIndex(db_path)
+        return index
@@ -1,10 +1,344 @@
+"""
+Dataset Metadata
+Writing and reading the per-sample metadata table
+
+Rows are buffered in memory and written in batches by a single writer
+thread per metadata file, so producers (worker threads, the process-pool
+parent) never touch the file themselves. The CSV always has exactly one
+header and a fixed column order. Optionally every flushed batch is also
+written as a Parquet part file, which readers can scan column-wise. When
+a dataset switches to Parquet, the existing CSV becomes its first part.
+
+Key Features:
+- MetadataWriter: buffered, single-writer, fixed column order
+- CSV, Parquet or both ('dataset.metadata_format' in config)
+- read_metadata: union of the Parquet parts and the CSV, one row per label/file
+"""
+
 import csv
 import os
+import numbers
+import time
+import queue
+import atexit
+import tempfile
+import logging
+import threading
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+METADATA_FORMATS = ("csv", "parquet", "both")
+
+_append_lock = threading.Lock()
+
 
 def append_metadata(csv_path, row):
-    exists = os.path.isfile(csv_path)
-    with open(csv_path, "a", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=row.keys())
-        if not exists:
-            writer.writeheader()
-        writer.writerow(row)
+    """Append one row synchronously (for one-off writes; pipelines use MetadataWriter)."""
+    with _append_lock:
+        exists = os.path.isfile(csv_path)
+        with open(csv_path, "a", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=row.keys())
+            if not exists:
+                writer.writeheader()
+            writer.writerow(row)
+
+
+def parquet_path_for(csv_path):
+    """Directory holding the Parquet parts that mirror a metadata CSV."""
+    return os.path.splitext(csv_path)[0] + ".parquet"
+
+
+def _column_type(values):
+    """
+    Parquet type of a metadata column, or None while it has no values.
+
+    Numbers are always float64 (pitch is an np.float32 on one code path and
+    a Python 0.0 on another), so every part of a dataset agrees on a type.
+    """
+    present = [value for value in values if value is not None]
+    if not present:
+        return None
+    if all(isinstance(value, (bool, np.bool_)) for value in present):
+        return pa.bool_()
+    if all(isinstance(value, numbers.Number) for value in present):
+        return pa.float64()
+    return pa.string()
+
+
+def _coerce(value, arrow_type):
+    if value is None or pa.types.is_null(arrow_type):
+        return None
+    if pa.types.is_string(arrow_type):
+        return str(value)
+    if pa.types.is_boolean(arrow_type):
+        return bool(value)
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _read_csv_header(csv_path):
+    try:
+        with open(csv_path, "r", newline="") as f:
+            return next(csv.reader(f), None)
+    except FileNotFoundError:
+        return None
+
+
+class MetadataWriter:
+    """Buffered metadata sink flushed by a single background thread."""
+
+    def __init__(self, csv_path, fmt="csv", columns=None,
+                 flush_rows=500, flush_interval=2.0):
+        """
+        Initialize writer
+
+        Args:
+            csv_path: Path of metadata.csv (Parquet parts go next to it)
+            fmt: 'csv', 'parquet' or 'both'
+            columns: Fixed column order; taken from the existing CSV header
+                or the first row if None
+            flush_rows: Write once this many rows are buffered
+            flush_interval: Maximum seconds a row stays buffered
+        """
+        if fmt not in METADATA_FORMATS:
+            raise ValueError(f"Unknown metadata format '{fmt}', expected one of {METADATA_FORMATS}")
+        if fmt != "csv" and not PYARROW_AVAILABLE:
+            logger.warning("pyarrow not installed - writing metadata as CSV only. Install with: pip install pyarrow")
+            fmt = "csv"
+
+        self.csv_path = csv_path
+        self.parquet_dir = parquet_path_for(csv_path)
+        self.fmt = fmt
+        self.columns = list(columns) if columns else _read_csv_header(csv_path)
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self._part_index = 0
+        self._types = None
+        self._parquet_started = False
+
+        self._queue = queue.Queue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="metadata-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, row):
+        """Queue one row (returns immediately)."""
+        if self._closed:
+            raise RuntimeError("MetadataWriter is closed")
+        self._queue.put(dict(row))
+
+    def flush(self):
+        """Block until every row queued so far has been written."""
+        if self._closed:
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait()
+
+    def close(self):
+        """Flush remaining rows and stop the writer thread."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _run(self):
+        buffer = []
+        while True:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                item = None if self._closed else False
+
+            if isinstance(item, dict):
+                buffer.append(item)
+                if len(buffer) < self.flush_rows:
+                    continue
+
+            if buffer:
+                self._write_batch(buffer)
+                buffer = []
+
+            if isinstance(item, threading.Event):
+                item.set()
+            elif item is None:
+                return
+
+    def _write_batch(self, rows):
+        if self.columns is None:
+            self.columns = list(rows[0].keys())
+
+        extra = {key for row in rows for key in row} - set(self.columns)
+        if extra:
+            logger.warning(f"Dropping metadata columns not in header: {sorted(extra)}")
+
+        try:
+            if self.fmt in ("parquet", "both") and not self._parquet_started:
+                # Before this batch reaches the CSV, so it is not migrated twice
+                self._migrate_csv()
+                self._parquet_started = True
+            if self.fmt in ("csv", "both"):
+                self._write_csv(rows)
+            if self.fmt in ("parquet", "both"):
+                self._write_parquet(rows)
+        except Exception as e:
+            logger.error(f"Failed to write {len(rows)} metadata rows: {e}")
+
+    def _write_csv(self, rows):
+        exists = os.path.isfile(self.csv_path)
+        with open(self.csv_path, "a", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=self.columns, extrasaction="ignore", restval="")
+            if not exists:
+                writer.writeheader()
+            writer.writerows(rows)
+
+    def _migrate_csv(self):
+        """Copy an existing CSV into the first Parquet part, keeping its history readable."""
+        os.makedirs(self.parquet_dir, exist_ok=True)
+        if not os.path.isfile(self.csv_path) or \
+                any(f.endswith(".parquet") for f in os.listdir(self.parquet_dir)):
+            return
+        import pandas as pd
+        df = pd.read_csv(self.csv_path)
+        if df.empty:
+            return
+        rows = df.astype(object).where(df.notna(), None).to_dict("records")
+        # Timestamp 0: sorts before every part written from now on
+        self._write_parquet(rows, part_name=f"part-{0:020d}-{os.getpid()}-csv.parquet")
+        logger.info(f"Migrated {len(rows)} rows of {self.csv_path} to {self.parquet_dir}")
+
+    def _write_parquet(self, rows, part_name=None):
+        os.makedirs(self.parquet_dir, exist_ok=True)
+        schema = self._schema(rows)
+        table = pa.Table.from_pylist(
+            [{f.name: _coerce(row.get(f.name), f.type) for f in schema} for row in rows], schema=schema
+        )
+        # One part file per flushed batch, written under a temporary name and
+        # renamed when complete: readers never see a partial part, and the
+        # time-ordered name keeps parts of concurrent writers in write order
+        fd, tmp_path = tempfile.mkstemp(dir=self.parquet_dir, prefix=".part-", suffix=".tmp")
+        os.close(fd)
+        try:
+            pq.write_table(table, tmp_path)
+            part_name = part_name or f"part-{time.time_ns():020d}-{os.getpid()}-{self._part_index:06d}.parquet"
+            part_path = os.path.join(self.parquet_dir, part_name)
+            os.replace(tmp_path, part_path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        self._part_index += 1
+
+    def _schema(self, rows):
+        """Schema of the next part: column types are fixed once a column has values."""
+        if self._types is None:
+            # Continue with the types of the parts already on disk
+            self._types = {}
+            parts = sorted(f for f in os.listdir(self.parquet_dir) if f.endswith(".parquet"))
+            if parts:
+                for field in pq.read_schema(os.path.join(self.parquet_dir, parts[-1])):
+                    if pa.types.is_integer(field.type) or pa.types.is_floating(field.type):
+                        self._types[field.name] = pa.float64()
+                    elif pa.types.is_boolean(field.type):
+                        self._types[field.name] = pa.bool_()
+                    elif not pa.types.is_null(field.type):
+                        self._types[field.name] = pa.string()
+
+        for column in self.columns:
+            if self._types.get(column) is None:
+                self._types[column] = _column_type([row.get(column) for row in rows])
+        return pa.schema([(c, self._types[c] or pa.null()) for c in self.columns])
+
+
+_writers = {}
+_writers_lock = threading.Lock()
+
+
+def get_metadata_writer(csv_path, fmt="csv"):
+    """Shared writer for csv_path; every producer in the process uses the same one."""
+    key = os.path.abspath(csv_path)
+    with _writers_lock:
+        writer = _writers.get(key)
+        if writer is None or writer._closed:
+            writer = _writers[key] = MetadataWriter(csv_path, fmt)
+        return writer
+
+
+@atexit.register
+def close_metadata_writers():
+    """Flush and close all shared writers."""
+    with _writers_lock:
+        writers = list(_writers.values())
+        _writers.clear()
+    for writer in writers:
+        writer.close()
+
+
+def read_metadata(csv_path, columns=None):
+    """
+    Load the metadata table.
+
+    Reads the Parquet parts next to csv_path (only the requested columns
+    are decoded) and the CSV. When both exist, e.g. after the format was
+    switched either way or with 'both', their rows are combined with one
+    row per label/file (the CSV's, if they differ).
+
+    Args:
+        csv_path: Path of metadata.csv
+        columns: Optional list of columns to load
+
+    Returns:
+        pandas DataFrame
+    """
+    parquet_dir = parquet_path_for(csv_path)
+    parts = []
+    if PYARROW_AVAILABLE and os.path.isdir(parquet_dir):
+        parts = sorted(f for f in os.listdir(parquet_dir) if f.endswith(".parquet"))
+    has_csv = os.path.exists(csv_path)
+    if not parts and not has_csv:
+        raise FileNotFoundError(f"Metadata file not found: {csv_path}")
+
+    keys = []
+    read_columns = columns
+    if parts and has_csv:
+        # Both sources: also read the key columns to drop rows held twice
+        available = set(_read_csv_header(csv_path) or ()) & set(pq.read_schema(os.path.join(parquet_dir, parts[-1])).names)
+        keys = [key for key in ("label", "file") if key in available]
+        if columns is not None:
+            read_columns = list(columns) + [key for key in keys if key not in columns]
+
+    frames = []
+    if parts:
+        # Parts are read one by one so that a column that was all-null in
+        # one batch (null type) still merges with typed batches, and int or
+        # float32 columns of older parts widen to the float64 of newer ones
+        tables = [pq.read_table(os.path.join(parquet_dir, part), columns=read_columns) for part in parts]
+        frames.append(pa.concat_tables(tables, promote_options="permissive").to_pandas())
+    import pandas as pd
+    if has_csv:
+        frames.append(pd.read_csv(csv_path, usecols=read_columns))
+    if len(frames) == 1:
+        return frames[0]
+
+    df = pd.concat(frames, ignore_index=True)
+    df = df.drop_duplicates(subset=keys or None, keep="last")
+    if columns is not None:
+        df = df[list(columns)]
+    return df.reset_index(drop=True)
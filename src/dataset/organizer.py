@@ -1,32 +1,29 @@
 import os
 import soundfile as sf
-import json
 import logging
+import threading
+
+from dataset.id_allocator import BlockIdAllocator
 
 logger = logging.getLogger(__name__)
 
 COUNTER_FILE = "data/voice_dataset/.counter.json"
+COPY_BLOCK_FRAMES = 1 << 18
+
+_allocators = {}
+_allocators_lock = threading.Lock()
+
+def _get_allocator():
+    """Allocator for the current COUNTER_FILE (one per process)."""
+    with _allocators_lock:
+        allocator = _allocators.get(COUNTER_FILE)
+        if allocator is None:
+            allocator = _allocators[COUNTER_FILE] = BlockIdAllocator(COUNTER_FILE)
+        return allocator
 
 def get_next_counter():
-    """Get next sequential file number."""
-    try:
-        if os.path.exists(COUNTER_FILE):
-            with open(COUNTER_FILE, 'r') as f:
-                data = json.load(f)
-                counter = data.get('counter', 0) + 1
-        else:
-            counter = 1
-        
-        # Create directory if needed
-        os.makedirs(os.path.dirname(COUNTER_FILE), exist_ok=True)
-        
-        with open(COUNTER_FILE, 'w') as f:
-            json.dump({'counter': counter}, f)
-        
-        return counter
-    except Exception as e:
-        logger.warning(f"Error managing counter: {e}")
-        return 1
+    """Get next sequential file number (unique across threads and processes)."""
+    return _get_allocator().next_id()
 
 def save_sample(audio, sr, label, filename, base_path):
     """Save sample with sequential naming convention."""
@@ -43,6 +40,26 @@ def save_sample(audio, sr, label, filename, base_path):
     # Return both new filename and original for metadata tracking
     return new_filename, filename
 
+def copy_audio(src_path, dst_path):
+    """Rewrite an audio file as a default-subtype WAV block by block (never loaded whole)."""
+    with sf.SoundFile(src_path) as src, \
+         sf.SoundFile(dst_path, "w", samplerate=src.samplerate, channels=src.channels) as dst:
+        for block in src.blocks(blocksize=COPY_BLOCK_FRAMES, dtype="float32"):
+            dst.write(block)
+
+def save_sample_from_file(src_path, label, filename, base_path):
+    """save_sample for audio that is on disk, e.g. a long separated stem."""
+    counter = get_next_counter()
+    new_filename = f"voice_sample_{counter:04d}.wav"
+
+    path = os.path.join(base_path, label)
+    os.makedirs(path, exist_ok=True)
+    copy_audio(src_path, os.path.join(path, new_filename))
+
+    logger.debug(f"Saved: {label}/{new_filename} (source: {filename})")
+
+    return new_filename, filename
+
 def save_sample_with_counter(audio, sr, label, base_path, original_filename=""):
     """Save sample with sequential naming and metadata tracking."""
     counter = get_next_counter()
@@ -63,23 +80,35 @@ def save_sample_with_counter(audio, sr, label, base_path, original_filename=""):
         "file_path": file_path
     }
 
+def commit_staged_sample(staged_path, label, base_path, original_filename=""):
+    """Move a sample written by a worker process into the dataset.
+
+    The counter is allocated here, in the process that owns the dataset,
+    and the file is renamed into place (same filesystem, no copy).
+    """
+    counter = get_next_counter()
+    new_filename = f"voice_sample_{counter:04d}.wav"
+
+    path = os.path.join(base_path, label)
+    os.makedirs(path, exist_ok=True)
+    os.replace(staged_path, os.path.join(path, new_filename))
+
+    logger.debug(f"Committed: {label}/{new_filename} (source: {original_filename})")
+
+    return new_filename, original_filename
+
 def reset_counter():
     """Reset the counter (use with caution!)."""
     try:
-        if os.path.exists(COUNTER_FILE):
-            os.remove(COUNTER_FILE)
+        _get_allocator().reset()
         logger.info("Counter reset to 0")
     except Exception as e:
         logger.error(f"Failed to reset counter: {e}")
 
 def get_current_counter():
-    """Get current counter value without incrementing."""
+    """Get the highest allocated counter value without incrementing."""
     try:
-        if os.path.exists(COUNTER_FILE):
-            with open(COUNTER_FILE, 'r') as f:
-                data = json.load(f)
-                return data.get('counter', 0)
-        return 0
+        return _get_allocator().current()
     except Exception as e:
         logger.warning(f"Error reading counter: {e}")
         return 0
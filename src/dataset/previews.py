@@ -0,0 +1,218 @@
+"""
+Dataset Previews
+Compressed preview clips and waveform peaks for dataset samples
+
+Previewing a sample in the browser used to download the full PCM WAV.
+A preview is a short compressed rendition (Opus or MP3) of the start of the
+sample, plus a JSON file with min/max peaks over the whole sample for
+drawing its waveform. Both are rendered once per sample, stored under
+<dataset_dir>/.previews, and re-rendered only when the sample changes.
+
+Key Features:
+- Opus (Ogg) or MP3 through libsndfile: no external encoder needed
+- Peaks computed block by block, so long samples are never loaded whole
+- Rendered lazily on first request, or eagerly by the dataset sink from
+  the in-memory audio (dataset.previews.enabled in config)
+- Atomic writes; concurrent requests for the same preview render it once
+"""
+
+import os
+import json
+import logging
+import tempfile
+import threading
+from typing import Dict, Optional
+
+import numpy as np
+import soundfile as sf
+
+logger = logging.getLogger(__name__)
+
+PREVIEW_DIRNAME = ".previews"
+
+# format name -> (extension, libsndfile format, subtype, mimetype)
+PREVIEW_FORMATS = {
+    'opus': ('ogg', 'OGG', 'OPUS', 'audio/ogg'),
+    'mp3': ('mp3', 'MP3', 'MPEG_LAYER_III', 'audio/mpeg'),
+}
+
+# Sample rates the Opus encoder accepts
+_OPUS_RATES = (8000, 12000, 16000, 24000, 48000)
+
+
+def _mono(audio: np.ndarray) -> np.ndarray:
+    audio = np.asarray(audio, dtype=np.float32)
+    return audio.mean(axis=1) if audio.ndim > 1 else audio
+
+
+class PreviewCache:
+    """
+    Renders and caches preview clips and peaks next to the dataset
+    """
+
+    def __init__(self, dataset_dir: str, cache_dir: Optional[str] = None, fmt: str = 'opus',
+                 max_seconds: float = 15.0, peak_bins: int = 800):
+        """
+        Initialize cache
+
+        Args:
+            dataset_dir: Dataset root with one directory per label
+            cache_dir: Where renditions go (default: <dataset_dir>/.previews)
+            fmt: Default clip format ('opus' or 'mp3')
+            max_seconds: Length of the preview clip
+            peak_bins: Number of (min, max) pairs in the peaks JSON
+        """
+        if fmt not in PREVIEW_FORMATS:
+            raise ValueError(f"Unknown preview format '{fmt}', expected one of {sorted(PREVIEW_FORMATS)}")
+        self.dataset_dir = dataset_dir
+        self.cache_dir = cache_dir or os.path.join(dataset_dir, PREVIEW_DIRNAME)
+        self.fmt = fmt
+        self.max_seconds = max_seconds
+        self.peak_bins = peak_bins
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+
+    def source_path(self, label: str, filename: str) -> str:
+        return os.path.join(self.dataset_dir, label, filename)
+
+    def clip_path(self, label: str, filename: str, fmt: Optional[str] = None) -> str:
+        extension = PREVIEW_FORMATS[fmt or self.fmt][0]
+        return os.path.join(self.cache_dir, label, f"{os.path.splitext(filename)[0]}.{extension}")
+
+    def peaks_path(self, label: str, filename: str) -> str:
+        return os.path.join(self.cache_dir, label, f"{os.path.splitext(filename)[0]}.peaks.json")
+
+    @staticmethod
+    def mimetype(fmt: str) -> str:
+        return PREVIEW_FORMATS[fmt][3]
+
+    def _lock(self, path: str) -> threading.Lock:
+        with self._locks_lock:
+            return self._locks.setdefault(path, threading.Lock())
+
+    @staticmethod
+    def _fresh(path: str, source: str) -> bool:
+        return os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(source)
+
+    @staticmethod
+    def _atomic_write(path: str, write):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=os.path.splitext(path)[1])
+        os.close(fd)
+        try:
+            write(temp_path)
+            os.replace(temp_path, path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def get_clip(self, label: str, filename: str, fmt: Optional[str] = None) -> str:
+        """
+        Path of the preview clip, rendering it if missing or stale
+
+        Raises:
+            FileNotFoundError: If the sample does not exist
+        """
+        fmt = fmt or self.fmt
+        if fmt not in PREVIEW_FORMATS:
+            raise ValueError(f"Unknown preview format '{fmt}', expected one of {sorted(PREVIEW_FORMATS)}")
+        source = self.source_path(label, filename)
+        if not os.path.isfile(source):
+            raise FileNotFoundError(source)
+
+        path = self.clip_path(label, filename, fmt)
+        if self._fresh(path, source):
+            return path
+        with self._lock(path):
+            if not self._fresh(path, source):
+                info = sf.info(source)
+                frames = int(self.max_seconds * info.samplerate)
+                audio, sr = sf.read(source, frames=frames, dtype='float32', always_2d=False)
+                self._write_clip(path, _mono(audio), sr, fmt)
+        return path
+
+    def get_peaks(self, label: str, filename: str) -> Dict:
+        """
+        Waveform peaks of a sample, computing them if missing or stale
+
+        Returns:
+            Dictionary with duration, sample_rate, bins and peaks
+            ([[min, max], ...] over the whole sample)
+        """
+        source = self.source_path(label, filename)
+        if not os.path.isfile(source):
+            raise FileNotFoundError(source)
+
+        path = self.peaks_path(label, filename)
+        with self._lock(path):
+            if not self._fresh(path, source):
+                peaks = self._peaks_from_file(source)
+                self._atomic_write(path, lambda temp: self._dump(temp, peaks))
+                return peaks
+        with open(path) as f:
+            return json.load(f)
+
+    def render(self, label: str, filename: str, audio: np.ndarray, sr: int):
+        """
+        Render clip and peaks from audio already in memory (dataset sink)
+        """
+        audio = _mono(audio)
+        clip = audio[:int(self.max_seconds * sr)]
+        self._write_clip(self.clip_path(label, filename), clip, sr, self.fmt)
+        peaks = self._peaks(iter([audio]), len(audio), sr)
+        self._atomic_write(self.peaks_path(label, filename), lambda temp: self._dump(temp, peaks))
+
+    def _write_clip(self, path: str, audio: np.ndarray, sr: int, fmt: str):
+        _, sf_format, subtype, _ = PREVIEW_FORMATS[fmt]
+        if fmt == 'opus' and sr not in _OPUS_RATES:
+            import librosa
+            target = min((rate for rate in _OPUS_RATES if rate >= sr), default=48000)
+            audio = librosa.resample(audio, orig_sr=sr, target_sr=target)
+            sr = target
+        self._atomic_write(path, lambda temp: sf.write(temp, audio, sr, format=sf_format, subtype=subtype))
+
+    def _peaks_from_file(self, source: str) -> Dict:
+        info = sf.info(source)
+        blocks = (_mono(block) for block in sf.blocks(source, blocksize=65536, dtype='float32', always_2d=True))
+        return self._peaks(blocks, info.frames, info.samplerate)
+
+    def _peaks(self, blocks, total_frames: int, sr: int) -> Dict:
+        bins = max(1, min(self.peak_bins, total_frames))
+        minimum = np.full(bins, np.inf, dtype=np.float32)
+        maximum = np.full(bins, -np.inf, dtype=np.float32)
+        position = 0
+        for block in blocks:
+            if not len(block):
+                continue
+            # Bin of every frame in this block; reduce each bin's run at once
+            bin_index = (np.arange(position, position + len(block)) * bins) // max(total_frames, 1)
+            bin_index = np.minimum(bin_index, bins - 1)
+            starts = np.flatnonzero(np.r_[True, bin_index[1:] != bin_index[:-1]])
+            used = bin_index[starts]
+            np.minimum.at(minimum, used, np.minimum.reduceat(block, starts))
+            np.maximum.at(maximum, used, np.maximum.reduceat(block, starts))
+            position += len(block)
+
+        minimum[~np.isfinite(minimum)] = 0.0
+        maximum[~np.isfinite(maximum)] = 0.0
+        return {
+            'duration': total_frames / sr if sr else 0.0,
+            'sample_rate': sr,
+            'bins': bins,
+            'peaks': [[round(float(lo), 4), round(float(hi), 4)] for lo, hi in zip(minimum, maximum)]
+        }
+
+    @staticmethod
+    def _dump(path: str, peaks: Dict):
+        with open(path, 'w') as f:
+            json.dump(peaks, f, separators=(',', ':'))
+
+
+def create_preview_cache(cfg: Dict, dataset_dir: str) -> PreviewCache:
+    """PreviewCache configured from the dataset.previews config section"""
+    preview_cfg = cfg.get('dataset', {}).get('previews', {}) or {}
+    return PreviewCache(dataset_dir,
+                        fmt=preview_cfg.get('format', 'opus'),
+                        max_seconds=preview_cfg.get('max_seconds', 15.0),
+                        peak_bins=preview_cfg.get('peak_bins', 800))
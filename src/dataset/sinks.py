@@ -0,0 +1,121 @@
+"""
+Dataset Sinks
+Where process_file sends finished samples
+
+DatasetSink writes samples and metadata straight into the dataset and is
+used when files are processed in the owning process (sequential or thread
+pool). StagingSink is used inside worker processes: it only writes the audio
+to a staging directory and records the metadata, so that counter allocation
+and metadata appends stay in the parent process.
+
+Committed samples are recorded under their saved name (voice_sample_NNNN.wav)
+in both the metadata table and the dataset index.
+"""
+
+import os
+import uuid
+import logging
+
+import soundfile as sf
+
+from dataset.organizer import save_sample, save_sample_from_file, commit_staged_sample, copy_audio
+from dataset.metadata import get_metadata_writer
+from dataset.index import get_dataset_index, index_path_for
+
+logger = logging.getLogger(__name__)
+
+STAGING_DIRNAME = ".staging"
+
+
+class DatasetSink:
+    """Write samples and metadata directly into the dataset."""
+
+    def __init__(self, dataset_dir="data/voice_dataset", metadata_path=None, metadata_format="csv",
+                 index_path=None, previews=None):
+        self.dataset_dir = dataset_dir
+        self.metadata_path = metadata_path or os.path.join(dataset_dir, "metadata.csv")
+        self.metadata = get_metadata_writer(self.metadata_path, metadata_format)
+        self.index = get_dataset_index(index_path or index_path_for(dataset_dir))
+        # Optional PreviewCache rendering previews while the audio is in memory
+        self.previews = previews
+
+    def _record(self, label, saved_name, metadata_entry):
+        # The row points at the file as saved, not the proposed name
+        entry = dict(metadata_entry, file=saved_name)
+        self.metadata.write(entry)
+        return (label, saved_name, entry, os.path.getsize(os.path.join(self.dataset_dir, label, saved_name)))
+
+    def add(self, audio, sr, label, name, metadata_entry):
+        """Save one sample, queue its metadata row and index it."""
+        saved = save_sample(audio, sr, label, name, self.dataset_dir)
+        self.index.add(*self._record(label, saved[0], metadata_entry))
+        if self.previews is not None:
+            try:
+                self.previews.render(label, saved[0], audio, sr)
+            except Exception as e:
+                # Previews are rendered on request instead
+                logger.warning(f"Failed to render preview for {label}/{saved[0]}: {e}")
+        return saved
+
+    def add_file(self, path, label, name, metadata_entry):
+        """Save one sample from an audio file (copied block by block), queue its metadata row and index it."""
+        saved = save_sample_from_file(path, label, name, self.dataset_dir)
+        # No preview here: it would need the whole track; it is rendered on request
+        self.index.add(*self._record(label, saved[0], metadata_entry))
+        return saved
+
+    def flush(self):
+        """Block until all queued metadata rows are on disk."""
+        self.metadata.flush()
+
+    def commit_staged(self, staged):
+        """Commit samples produced by a StagingSink in a worker process."""
+        committed, indexed = [], []
+        for entry in staged:
+            try:
+                saved = commit_staged_sample(entry["staged_path"], entry["label"],
+                                             self.dataset_dir, entry["name"])
+                indexed.append(self._record(entry["label"], saved[0], entry["metadata"]))
+                committed.append(saved)
+            except Exception as e:
+                logger.error(f"Failed to commit staged sample {entry.get('staged_path')}: {e}")
+        self.index.add_many(indexed)
+        return committed
+
+
+class StagingSink:
+    """Write audio to a staging directory and defer naming/metadata to the parent."""
+
+    def __init__(self, dataset_dir="data/voice_dataset"):
+        self.staging_dir = os.path.join(dataset_dir, STAGING_DIRNAME)
+        os.makedirs(self.staging_dir, exist_ok=True)
+        self.pending = []
+
+    def add(self, audio, sr, label, name, metadata_entry):
+        """Stage one sample; it is committed later by DatasetSink.commit_staged."""
+        staged_path = os.path.join(self.staging_dir, f"{uuid.uuid4().hex}.wav")
+        sf.write(staged_path, audio, sr)
+        self.pending.append({
+            "staged_path": staged_path,
+            "label": label,
+            "name": name,
+            "metadata": metadata_entry
+        })
+        return staged_path
+
+    def add_file(self, path, label, name, metadata_entry):
+        """Stage one sample from an audio file (copied block by block)."""
+        staged_path = os.path.join(self.staging_dir, f"{uuid.uuid4().hex}.wav")
+        copy_audio(path, staged_path)
+        self.pending.append({
+            "staged_path": staged_path,
+            "label": label,
+            "name": name,
+            "metadata": metadata_entry
+        })
+        return staged_path
+
+    def drain(self):
+        """Return and clear the samples staged since the last drain."""
+        staged, self.pending = self.pending, []
+        return staged
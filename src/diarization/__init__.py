@@ -1,10 +1,28 @@
 """
 Diarization Module
 Speaker diarization and audio segmentation
+
+Diarizers are imported on first attribute access (they need torch and
+pyannote); segment helpers are plain imports.
 """
 
-from .enhanced_diarizer import EnhancedSpeakerDiarizer
-from .diarizer import *
+import importlib
+
 from .segments import *
 
+_LAZY = {
+    'EnhancedSpeakerDiarizer': '.enhanced_diarizer',
+    'get_pipeline': '.diarizer',
+    'diarize': '.diarizer',
+    'load_pyannote_pipeline': '.diarizer',
+}
+
 __all__ = ['EnhancedSpeakerDiarizer']
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
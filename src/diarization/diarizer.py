@@ -4,38 +4,46 @@ import warnings
 import torch
 import logging
 
+from utils.model_registry import get_model
+
 logger = logging.getLogger(__name__)
 
-_pipeline = None
+DIARIZATION_MODEL = "pyannote/speaker-diarization-community-1"
+
+
+def load_pyannote_pipeline(model, token, device=None):
+    """Load a pyannote pipeline (registry factory; use get_model('pyannote', ...))."""
+    # Suppress torchcodec warnings
+    warnings.filterwarnings("ignore", message=".*torchcodec.*")
+    from pyannote.audio import Pipeline
+    pipeline = Pipeline.from_pretrained(model, use_auth_token=token)
+    if pipeline is None:
+        raise RuntimeError(f"Could not load {model} (check the token and the model card terms)")
+    if device is not None:
+        pipeline = pipeline.to(torch.device(device))
+    return pipeline
+
 
 def get_pipeline():
     """Get or create the diarization pipeline with GPU support."""
-    global _pipeline
-    if _pipeline is None:
-        token = os.getenv("HF_TOKEN")
-        if not token:
-            raise ValueError("HF_TOKEN environment variable is required for pyannote/speaker-diarization. Please set it with your Hugging Face token.")
-        try:
-            # Suppress torchcodec warnings
-            warnings.filterwarnings("ignore", message=".*torchcodec.*")
-            from pyannote.audio import Pipeline
-            _pipeline = Pipeline.from_pretrained("pyannote/speaker-diarization-community-1", use_auth_token=token)
-            
-            # Move to GPU if available
-            if torch.cuda.is_available():
-                _pipeline = _pipeline.to(torch.device('cuda'))
-                logger.info(f"✅ Diarization pipeline moved to GPU: {torch.cuda.get_device_name(0)}")
-            else:
-                logger.info("ℹ️  Using CPU for diarization (GPU not available)")
-                
-        except ImportError as e:
-            logger.warning(f"pyannote.audio not available: {e}")
-            _pipeline = None
-        except Exception as e:
-            logger.warning(f"Failed to load diarization pipeline: {e}")
-            logger.warning("Diarization will be skipped. Files will be processed as single segments.")
-            _pipeline = None
-    return _pipeline
+    token = os.getenv("HF_TOKEN")
+    if not token:
+        raise ValueError("HF_TOKEN environment variable is required for pyannote/speaker-diarization. Please set it with your Hugging Face token.")
+    try:
+        # Move to GPU if available
+        if torch.cuda.is_available():
+            pipeline = get_model('pyannote', model=DIARIZATION_MODEL, token=token, device='cuda')
+            logger.info(f"✅ Diarization pipeline on GPU: {torch.cuda.get_device_name(0)}")
+        else:
+            pipeline = get_model('pyannote', model=DIARIZATION_MODEL, token=token, device=None)
+            logger.info("ℹ️  Using CPU for diarization (GPU not available)")
+        return pipeline
+    except ImportError as e:
+        logger.warning(f"pyannote.audio not available: {e}")
+    except Exception as e:
+        logger.warning(f"Failed to load diarization pipeline: {e}")
+        logger.warning("Diarization will be skipped. Files will be processed as single segments.")
+    return None
 
 def diarize(audio_path):
     """Perform speaker diarization on audio file with GPU acceleration."""
@@ -8,17 +8,25 @@ Key Features:
 - Classifies speakers by gender
 - Organizes outputs into gender folders (male/, female/)
 - Preserves speaker metadata
+- In-memory segment mode: turns are slices of one loaded waveform and
+  each output file is written exactly once, straight to its gender folder
+- Speaker-level gender: one decision per speaker from pooled voiced frames
 """
 
 import os
+import shutil
 import torch
 import torchaudio
 import numpy as np
+import soundfile as sf
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional, Union
 import json
 from datetime import datetime
 
+from preprocessing.pitch_tracker import track_pitch
+from utils.model_registry import get_model
+
 # Check if pyannote is available
 try:
     from pyannote.audio import Pipeline
@@ -48,6 +56,12 @@ class EnhancedSpeakerDiarizer:
         self.min_speakers = config.get('min_speakers', 2)
         self.max_speakers = config.get('max_speakers', 2)
         self.use_auth_token = config.get('hf_token', None)
+        # Slice segments out of the loaded waveform instead of writing,
+        # re-reading and copying one WAV per turn
+        self.in_memory_segments = config.get('in_memory_segments', True)
+        # Decide gender once per speaker (pooled over its turns) instead of per turn
+        self.speaker_level_gender = config.get('speaker_level_gender', True)
+        self.speaker_gender_max_seconds = config.get('speaker_gender_max_seconds', 60.0)
         
         print(f"Initializing Enhanced Diarizer on device: {self.device}")
         
@@ -65,19 +79,54 @@ class EnhancedSpeakerDiarizer:
             )
         
         print("Loading pyannote speaker-diarization-3.1 pipeline...")
-        self.pipeline = Pipeline.from_pretrained(
-            "pyannote/speaker-diarization-3.1",
-            use_auth_token=self.use_auth_token
+        # Shared per process: every diarizer (and batch) reuses one loaded pipeline
+        self.pipeline = get_model(
+            'pyannote',
+            model="pyannote/speaker-diarization-3.1",
+            token=self.use_auth_token,
+            device=str(self.device)
         )
-        self.pipeline.to(self.device)
         print("Pipeline loaded successfully!")
         
-    def diarize_audio(self, audio_path: str) -> Dict:
+    def load_audio(self, audio_path: str) -> Tuple[np.ndarray, int]:
+        """
+        Load an audio file once as a mono float32 array
+        
+        Args:
+            audio_path: Path to audio file
+            
+        Returns:
+            Tuple of (audio, sample_rate)
+        """
+        try:
+            audio, sample_rate = sf.read(audio_path, dtype='float32', always_2d=True)
+            audio = audio.T
+        except RuntimeError:
+            # Containers libsndfile cannot read (m4a, ...)
+            waveform, sample_rate = torchaudio.load(audio_path)
+            audio = waveform.numpy()
+        
+        # Ensure mono audio
+        if audio.shape[0] > 1:
+            audio = audio.mean(axis=0, dtype=np.float32)
+        else:
+            audio = audio[0]
+        
+        return np.ascontiguousarray(audio, dtype=np.float32), int(sample_rate)
+    
+    def diarize_audio(
+        self, 
+        audio_path: str,
+        audio: Optional[np.ndarray] = None,
+        sample_rate: Optional[int] = None
+    ) -> Dict:
         """
         Perform speaker diarization on audio file
         
         Args:
             audio_path: Path to audio file
+            audio: Already loaded mono waveform (skips decoding the file again)
+            sample_rate: Sample rate of audio
             
         Returns:
             Dictionary with speaker segments and timestamps
@@ -87,9 +136,18 @@ class EnhancedSpeakerDiarizer:
         
         print(f"Diarizing: {audio_path}")
         
+        # pyannote accepts an in-memory (channel, time) waveform
+        if audio is not None:
+            pipeline_input = {
+                'waveform': torch.from_numpy(audio).unsqueeze(0),
+                'sample_rate': sample_rate
+            }
+        else:
+            pipeline_input = audio_path
+        
         # Run diarization
         diarization = self.pipeline(
-            audio_path,
+            pipeline_input,
             min_speakers=self.min_speakers,
             max_speakers=self.max_speakers
         )
@@ -111,90 +169,136 @@ class EnhancedSpeakerDiarizer:
             'total_duration': max([s['end'] for s in segments]) if segments else 0
         }
     
-    def extract_speaker_segments(
-        self, 
-        audio_path: str, 
+    def slice_speaker_segments(
+        self,
+        audio: np.ndarray,
+        sample_rate: int,
         diarization_result: Dict,
-        output_dir: str
+        base_filename: str
     ) -> List[Dict]:
         """
-        Extract individual speaker segments from audio
+        Cut speaker segments out of a loaded waveform without touching disk
+        
+        Each segment's 'audio' is a view into audio (no copy); it is written
+        once by write_segment() / organize_by_gender().
         
         Args:
-            audio_path: Path to original audio file
+            audio: Mono waveform of the whole file
+            sample_rate: Sample rate in Hz
             diarization_result: Diarization output from diarize_audio()
-            output_dir: Directory to save speaker segments
+            base_filename: Stem used for segment filenames
             
         Returns:
-            List of extracted segment info
+            List of segment info with 'audio' views
         """
-        # Load audio
-        waveform, sample_rate = torchaudio.load(audio_path)
-        
-        # Ensure mono audio
-        if waveform.shape[0] > 1:
-            waveform = torch.mean(waveform, dim=0, keepdim=True)
-        
-        # Create output directory
-        Path(output_dir).mkdir(parents=True, exist_ok=True)
-        
-        # Extract each segment
-        extracted_segments = []
-        base_filename = Path(audio_path).stem
+        segments = []
         
         for idx, segment in enumerate(diarization_result['segments']):
             # Calculate sample indices
             start_sample = int(segment['start'] * sample_rate)
             end_sample = int(segment['end'] * sample_rate)
             
-            # Extract segment
-            segment_waveform = waveform[:, start_sample:end_sample]
-            
             # Create filename
             speaker_label = segment['speaker'].replace('SPEAKER_', 'speaker_')
             segment_filename = f"{base_filename}_{speaker_label}_seg{idx:03d}.wav"
-            segment_path = os.path.join(output_dir, segment_filename)
-            
-            # Save segment
-            torchaudio.save(segment_path, segment_waveform, sample_rate)
             
-            # Store segment info
-            extracted_segments.append({
-                'segment_path': segment_path,
+            segments.append({
+                'segment_path': None,
                 'speaker': segment['speaker'],
                 'start_time': segment['start'],
                 'end_time': segment['end'],
                 'duration': segment['duration'],
                 'sample_rate': sample_rate,
-                'filename': segment_filename
+                'filename': segment_filename,
+                'audio': audio[start_sample:end_sample]
             })
+        
+        return segments
+    
+    def write_segment(self, segment: Dict, output_dir: str) -> str:
+        """
+        Write an in-memory segment to output_dir and drop its audio view
+        
+        Args:
+            segment: Segment from slice_speaker_segments()
+            output_dir: Destination directory
+            
+        Returns:
+            Path of the written file
+        """
+        segment_path = os.path.join(output_dir, segment['filename'])
+        sf.write(segment_path, segment.pop('audio'), segment['sample_rate'], subtype='FLOAT')
+        segment['segment_path'] = segment_path
+        return segment_path
+    
+    def extract_speaker_segments(
+        self, 
+        audio_path: str, 
+        diarization_result: Dict,
+        output_dir: str
+    ) -> List[Dict]:
+        """
+        Extract individual speaker segments from audio
+        
+        Args:
+            audio_path: Path to original audio file
+            diarization_result: Diarization output from diarize_audio()
+            output_dir: Directory to save speaker segments
+            
+        Returns:
+            List of extracted segment info
+        """
+        # Load audio
+        audio, sample_rate = self.load_audio(audio_path)
+        
+        # Create output directory
+        Path(output_dir).mkdir(parents=True, exist_ok=True)
+        
+        # Extract and save each segment
+        extracted_segments = self.slice_speaker_segments(
+            audio, sample_rate, diarization_result, Path(audio_path).stem
+        )
+        for segment in extracted_segments:
+            self.write_segment(segment, output_dir)
             
         print(f"Extracted {len(extracted_segments)} speaker segments")
         return extracted_segments
     
-    def classify_speaker_gender(self, segment_path: str) -> Tuple[str, float]:
+    def classify_speaker_gender(
+        self, 
+        segment: Union[str, np.ndarray],
+        sample_rate: Optional[int] = None
+    ) -> Tuple[str, float]:
         """
         Classify speaker gender using pitch analysis
         
         Args:
-            segment_path: Path to speaker segment audio
+            segment: Path to speaker segment audio, or the segment waveform
+            sample_rate: Sample rate when segment is a waveform
             
         Returns:
             Tuple of (gender, confidence)
         """
-        # Load audio
-        waveform, sample_rate = torchaudio.load(segment_path)
-        
-        # Ensure mono
-        if waveform.shape[0] > 1:
-            waveform = torch.mean(waveform, dim=0, keepdim=True)
-        
-        # Convert to numpy
-        audio_np = waveform.squeeze().numpy()
+        if isinstance(segment, np.ndarray):
+            audio_np = segment
+        else:
+            audio_np, sample_rate = self.load_audio(segment)
         
         # Calculate fundamental frequency (F0) using autocorrelation
         f0 = self._estimate_pitch(audio_np, sample_rate)
         
+        return self._gender_from_pitch(f0)
+    
+    def _gender_from_pitch(self, f0: float) -> Tuple[str, float]:
+        """
+        Map a fundamental frequency to (gender, confidence)
+        
+        Args:
+            f0: Fundamental frequency in Hz
+            
+        Returns:
+            Tuple of (gender, confidence)
+        """
         # Gender classification based on pitch
         # Male: 85-180 Hz, Female: 165-255 Hz
         if f0 < 150:
@@ -214,9 +318,62 @@ class EnhancedSpeakerDiarizer:
         
         return gender, float(confidence)
     
+    def classify_speakers(self, segments: List[Dict]) -> Dict[str, Dict]:
+        """
+        One gender decision per speaker from pooled voiced frames
+        
+        Voiced F0 values of each speaker's turns are pooled (longest turns
+        first, up to speaker_gender_max_seconds of audio) and the median
+        decides the speaker's gender, so all turns of a speaker share one
+        label and the classifier runs once per speaker instead of per turn.
+        
+        Args:
+            segments: Segments from slice_speaker_segments() or
+                extract_speaker_segments()
+            
+        Returns:
+            Dictionary mapping speaker label to gender, confidence,
+            pooled seconds and number of voiced frames
+        """
+        by_speaker = {}
+        for segment in segments:
+            by_speaker.setdefault(segment['speaker'], []).append(segment)
+        
+        results = {}
+        for speaker, turns in by_speaker.items():
+            voiced_f0 = []
+            pooled_seconds = 0.0
+            for segment in sorted(turns, key=lambda s: s['duration'], reverse=True):
+                remaining = self.speaker_gender_max_seconds - pooled_seconds
+                if remaining <= 0:
+                    break
+                if 'audio' in segment:
+                    audio, sample_rate = segment['audio'], segment['sample_rate']
+                else:
+                    audio, sample_rate = self.load_audio(segment['segment_path'])
+                audio = audio[:int(remaining * sample_rate)]
+                pooled_seconds += len(audio) / sample_rate
+                
+                track = track_pitch(audio, sample_rate, fmin=50, fmax=400)
+                voiced_f0.append(track.voiced_f0)
+            
+            voiced_f0 = np.concatenate(voiced_f0) if voiced_f0 else np.zeros(0)
+            # Ambiguous pitch when nothing is voiced
+            f0 = float(np.median(voiced_f0)) if len(voiced_f0) else 150.0
+            gender, confidence = self._gender_from_pitch(f0)
+            results[speaker] = {
+                'gender': gender,
+                'confidence': confidence,
+                'median_f0': f0,
+                'pooled_seconds': pooled_seconds,
+                'voiced_frames': int(len(voiced_f0))
+            }
+        
+        return results
+    
     def _estimate_pitch(self, audio: np.ndarray, sample_rate: int) -> float:
         """
-        Estimate pitch using autocorrelation method
+        Estimate pitch as the median F0 of voiced frames
         
         Args:
             audio: Audio waveform as numpy array
@@ -225,33 +382,10 @@ class EnhancedSpeakerDiarizer:
         Returns:
             Estimated fundamental frequency (F0) in Hz
         """
-        # Normalize audio
-        audio = audio / (np.max(np.abs(audio)) + 1e-8)
-        
-        # Define pitch range to search (50-400 Hz for human voice)
-        min_pitch = 50
-        max_pitch = 400
-        
-        # Calculate lag range
-        min_lag = int(sample_rate / max_pitch)
-        max_lag = int(sample_rate / min_pitch)
-        
-        # Compute autocorrelation
-        autocorr = np.correlate(audio, audio, mode='full')
-        autocorr = autocorr[len(autocorr)//2:]  # Keep positive lags only
-        
-        # Find peak in valid lag range
-        autocorr_range = autocorr[min_lag:max_lag]
-        
-        if len(autocorr_range) == 0:
-            return 150.0  # Default to ambiguous pitch
-        
-        peak_lag = np.argmax(autocorr_range) + min_lag
-        
-        # Convert lag to frequency
-        f0 = sample_rate / peak_lag
-        
-        return f0
+        # 50-400 Hz search range for human voice; ambiguous pitch when
+        # nothing is voiced
+        track = track_pitch(audio, sample_rate, fmin=50, fmax=400)
+        return track.median_f0(default=150.0)
     
     def organize_by_gender(
         self, 
@@ -261,6 +395,9 @@ class EnhancedSpeakerDiarizer:
         """
         Organize speaker segments into gender-based folders
         
+        In-memory segments (with an 'audio' view) are written straight
+        into their gender folder; segments already on disk are copied.
+        
         Args:
             segments: List of segment dictionaries with gender classification
             base_output_dir: Base directory for organized output
@@ -279,21 +416,21 @@ class EnhancedSpeakerDiarizer:
         os.makedirs(female_dir, exist_ok=True)
         os.makedirs(unknown_dir, exist_ok=True)
         
-        # Copy segments to appropriate folders
+        gender_dirs = {'male': male_dir, 'female': female_dir, 'unknown': unknown_dir}
+        
+        # Write or copy segments to appropriate folders
         for segment in segments:
             gender = segment.get('gender', 'unknown')
-            source_path = segment['segment_path']
+            if gender not in gender_dirs:
+                gender = 'unknown'
             
-            if gender == 'male':
-                dest_path = os.path.join(male_dir, os.path.basename(source_path))
-            elif gender == 'female':
-                dest_path = os.path.join(female_dir, os.path.basename(source_path))
+            if 'audio' in segment:
+                dest_path = self.write_segment(segment, gender_dirs[gender])
             else:
-                dest_path = os.path.join(unknown_dir, os.path.basename(source_path))
-            
-            # Copy file (or move if preferred)
-            import shutil
-            shutil.copy2(source_path, dest_path)
+                source_path = segment['segment_path']
+                dest_path = os.path.join(gender_dirs[gender], os.path.basename(source_path))
+                # Copy file (or move if preferred)
+                shutil.copy2(source_path, dest_path)
             organized[gender].append(dest_path)
         
         print(f"Organized segments: {len(organized['male'])} male, "
@@ -322,35 +459,63 @@ class EnhancedSpeakerDiarizer:
         print(f"Processing: {audio_path}")
         print(f"{'='*60}")
         
+        # Load once; in-memory segments are views into this waveform
+        audio, sample_rate = None, None
+        if self.in_memory_segments:
+            audio, sample_rate = self.load_audio(audio_path)
+        
         # Step 1: Diarization
         print("\n[1/4] Running speaker diarization...")
-        diarization_result = self.diarize_audio(audio_path)
+        diarization_result = self.diarize_audio(audio_path, audio, sample_rate)
         print(f"  ✓ Found {diarization_result['num_speakers']} speakers")
         print(f"  ✓ Total segments: {len(diarization_result['segments'])}")
         
         # Step 2: Extract segments
         print("\n[2/4] Extracting speaker segments...")
         segments_dir = os.path.join(output_base_dir, 'segments')
-        extracted_segments = self.extract_speaker_segments(
-            audio_path, 
-            diarization_result,
-            segments_dir
-        )
+        if self.in_memory_segments:
+            extracted_segments = self.slice_speaker_segments(
+                audio, sample_rate, diarization_result, Path(audio_path).stem
+            )
+        else:
+            extracted_segments = self.extract_speaker_segments(
+                audio_path, 
+                diarization_result,
+                segments_dir
+            )
         print(f"  ✓ Extracted {len(extracted_segments)} segments")
         
         # Step 3: Gender classification
         print("\n[3/4] Classifying speaker gender...")
-        for segment in extracted_segments:
-            gender, confidence = self.classify_speaker_gender(segment['segment_path'])
-            segment['gender'] = gender
-            segment['gender_confidence'] = confidence
-            print(f"  ✓ {segment['speaker']}: {gender} ({confidence:.2%} confidence)")
+        speaker_genders = None
+        if self.speaker_level_gender:
+            speaker_genders = self.classify_speakers(extracted_segments)
+            for speaker, decision in speaker_genders.items():
+                print(f"  ✓ {speaker}: {decision['gender']} ({decision['confidence']:.2%} confidence, "
+                      f"{decision['pooled_seconds']:.1f}s pooled)")
+            for segment in extracted_segments:
+                decision = speaker_genders[segment['speaker']]
+                segment['gender'] = decision['gender']
+                segment['gender_confidence'] = decision['confidence']
+        else:
+            for segment in extracted_segments:
+                if 'audio' in segment:
+                    gender, confidence = self.classify_speaker_gender(segment['audio'], segment['sample_rate'])
+                else:
+                    gender, confidence = self.classify_speaker_gender(segment['segment_path'])
+                segment['gender'] = gender
+                segment['gender_confidence'] = confidence
+                print(f"  ✓ {segment['speaker']}: {gender} ({confidence:.2%} confidence)")
         
         # Step 4: Organize by gender
         organized_paths = None
         if organize_by_gender:
             print("\n[4/4] Organizing by gender...")
             organized_paths = self.organize_by_gender(extracted_segments, output_base_dir)
+        elif self.in_memory_segments:
+            Path(segments_dir).mkdir(parents=True, exist_ok=True)
+            for segment in extracted_segments:
+                self.write_segment(segment, segments_dir)
         
         # Save metadata
         metadata = {
@@ -358,6 +523,7 @@ class EnhancedSpeakerDiarizer:
             'processing_timestamp': datetime.now().isoformat(),
             'num_speakers': diarization_result['num_speakers'],
             'total_segments': len(extracted_segments),
+            'speaker_genders': speaker_genders,
             'segments': extracted_segments,
             'organized_paths': organized_paths
         }
@@ -5,24 +5,29 @@ import yaml
 import logging
 import psutil
 import time
+import shutil
+import tempfile
 import numpy as np
-import torch
+import soundfile as sf
 import librosa
 from tqdm import tqdm
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+# Heavy backends (torch, demucs, sklearn via classification) are imported on
+# first use, so importing this module (web app, CLI --help) stays fast
+
 from preprocessing.audio_loader import load_audio
 from preprocessing.normalize import normalize
 from preprocessing.vad import remove_silence
-from preprocessing.source_separator import VocalSeparator
-from classification import get_classifier
-from dataset.organizer import save_sample
-from dataset.metadata import append_metadata
-from quality.metrics import QualityMetrics
-from data_augmentation.augment import balance_dataset
+from preprocessing.segment_analysis import SegmentAnalysis
+from dataset.sinks import DatasetSink, StagingSink
+from dataset.metadata import METADATA_FORMATS
+from utils.model_registry import get_model, preload_models, model_stats
+from engine.progress import stage
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -149,8 +154,215 @@ def get_config_value(cfg, key, default=None):
     else:
         return cfg.get(key, default)
 
-def process_file(file_path, cfg, separator=None):
-    """Process a single audio file using source separation."""
+class StemFile:
+    """
+    A separated stem left on disk by streaming separation.
+
+    Long recordings are classified and assessed on an excerpt of evenly
+    spaced windows (separation.analysis_seconds in total) and copied into
+    the dataset block by block, so no stage holds the whole track in memory.
+    """
+
+    def __init__(self, path, power):
+        self.path = path
+        self.power = power  # mean square over the whole stem
+        info = sf.info(path)
+        self.sample_rate = info.samplerate
+        self.frames = info.frames
+
+    def __len__(self):
+        return self.frames
+
+    def excerpt(self, seconds, windows=8):
+        """Up to seconds of audio, taken from windows spread evenly over the stem."""
+        length = int(seconds * self.sample_rate)
+        with sf.SoundFile(self.path) as f:
+            if self.frames <= length:
+                return f.read(dtype="float32")
+            window = max(1, length // windows)
+            parts = []
+            for start in np.linspace(0, self.frames - window, windows).astype(int):
+                f.seek(int(start))
+                parts.append(f.read(window, dtype="float32"))
+        return np.concatenate(parts)
+
+def separate_file(file_path, cfg, separator):
+    """
+    Separate a file into (vocals, accompaniment, confidence) at the target rate.
+
+    Files longer than separation.streaming_min_duration are separated chunk
+    by chunk through a temporary directory, so the full-rate stereo mix and
+    the Demucs sources are never held in memory for the whole file. Their
+    stems are returned as StemFile objects (remove their directory when
+    done); shorter files return in-memory arrays.
+    """
+    sample_rate = get_config_value(cfg, "sample_rate", 16000)
+    sep_cfg = cfg.get("separation", {})
+
+    try:
+        duration = sf.info(file_path).duration
+    except Exception:
+        duration = 0.0  # Not readable by soundfile (e.g. MP3): in-memory path
+
+    if duration >= sep_cfg.get("streaming_min_duration", 600):
+        logger.info(f"Separating vocals from accompaniment (streaming, {duration / 60:.1f} min)...")
+        temp_root = cfg.get("paths", {}).get("temp_dir", "data/temp")
+        os.makedirs(temp_root, exist_ok=True)
+        temp_dir = tempfile.mkdtemp(prefix="separation_", dir=temp_root)
+        try:
+            # Streaming separation decodes as it goes: reported as one stage
+            with stage("separate", streaming=True):
+                result = separator.separate_file_streaming(
+                    file_path,
+                    os.path.join(temp_dir, "vocals.wav"),
+                    os.path.join(temp_dir, "accompaniment.wav"),
+                    output_sr=sample_rate,
+                    chunk_seconds=sep_cfg.get("chunk_seconds", 30),
+                    overlap_seconds=sep_cfg.get("overlap_seconds", 2)
+                )
+            return (StemFile(result["vocals_path"], result.get("vocals_power", 0.0)),
+                    StemFile(result["accompaniment_path"], result.get("accompaniment_power", 0.0)),
+                    result["confidence"])
+        except Exception as e:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            logger.warning(f"Streaming separation failed, falling back to in-memory separation: {e}")
+
+    # Load and preprocess audio
+    with stage("decode"):
+        audio = load_audio(file_path, sample_rate)
+        audio = normalize(audio)
+
+    logger.info(f"Separating vocals from accompaniment...")
+    try:
+        with stage("separate"):
+            separation_result = separator.separate_vocals(audio, sample_rate)
+        return separation_result["vocals"], separation_result["accompaniment"], separation_result["confidence"]
+    except Exception as e:
+        logger.warning(f"Vocal separation failed, using original audio: {e}")
+        return audio, np.zeros_like(audio), 0.0
+
+def create_dataset_sink(cfg):
+    """DatasetSink for data/voice_dataset using the configured metadata format."""
+    metadata_format = cfg.get("dataset", {}).get("metadata_format", "csv")
+    if metadata_format not in METADATA_FORMATS:
+        logger.warning(f"Unsupported metadata_format '{metadata_format}', writing CSV")
+        metadata_format = "csv"
+    previews = None
+    if cfg.get("dataset", {}).get("previews", {}).get("enabled", False):
+        from dataset.previews import create_preview_cache
+        previews = create_preview_cache(cfg, "data/voice_dataset")
+    return DatasetSink("data/voice_dataset", metadata_format=metadata_format, previews=previews)
+
+def model_specs(cfg):
+    """Registry specs (name + constructor arguments) of the models process_file uses."""
+    return {
+        "demucs": {"name": "demucs", "model_name": "htdemucs", "device": "cpu"},
+        "quality_metrics": {"name": "quality_metrics", "sample_rate": cfg.get("sample_rate", 16000)},
+        "pitch_classifier": {"name": "pitch_classifier"},
+    }
+
+def get_shared_model(cfg, key):
+    """Process-wide instance of one of the models in model_specs."""
+    return get_model(**model_specs(cfg)[key])
+
+def preload_worker_models(cfg):
+    """Warm the model registry so the first file does not pay the cold start."""
+    names = cfg.get("performance", {}).get("preload_models", list(model_specs(cfg)))
+    if not names:
+        return []
+    specs = model_specs(cfg)
+    loaded = preload_models([specs[name] for name in names if name in specs])
+    for stats in loaded:
+        logger.info(f"Preloaded {stats['name']}: {stats['load_seconds']:.2f}s, +{stats['rss_mb']:.0f} MB")
+    return loaded
+
+def track_power(audio):
+    """Mean square of a separated track (array or StemFile)."""
+    if isinstance(audio, StemFile):
+        return audio.power
+    return float(np.mean(audio ** 2))
+
+def process_track(track, audio, file_path, cfg, classifier, sink, separation_confidence):
+    """
+    Classify, assess and save one separated track.
+
+    Args:
+        track: 'vocals' or 'accompaniment'
+        audio: In-memory array, or a StemFile (analysed on an excerpt of
+            separation.analysis_seconds and saved from disk)
+        separation_confidence: Vocal confidence of the separation
+
+    Returns:
+        Label the track was saved under, or None if it is too short
+    """
+    sample_rate = get_config_value(cfg, "sample_rate", 16000)
+    if isinstance(audio, StemFile):
+        samples = audio.excerpt(cfg.get("separation", {}).get("analysis_seconds", 120))
+    else:
+        samples = audio
+    duration = len(audio) / sample_rate
+
+    # Shared feature cache: STFT/piptrack/MFCC computed once for all stages
+    analysis = SegmentAnalysis(samples, sample_rate)
+    with stage("classify", track=track):
+        label, confidence = classifier.classify(samples, sample_rate, analysis)
+
+    # Skip if too short
+    if duration < get_config_value(cfg, "min_segment_duration", 1.0):
+        return None
+
+    # Estimate pitch for metadata
+    pitch_estimator = get_shared_model(cfg, "pitch_classifier")
+    try:
+        with stage("pitch", track=track):
+            pitch = pitch_estimator.estimate_pitch(samples, sample_rate, analysis)
+    except Exception:
+        pitch = 0.0
+
+    base_name = os.path.basename(file_path).replace('.wav', '').replace('.mp3', '')
+    name = f"{base_name}_{track}_gender{label[0].upper()}_conf{int(confidence)}.wav"
+
+    # Assess audio quality on the in-memory samples (no re-read from disk)
+    with stage("quality", track=track):
+        quality_metrics = get_shared_model(cfg, "quality_metrics").assess_audio(samples, analysis=analysis)
+
+    # Metadata with quality metrics and separation info
+    metadata_entry = {
+        "file": name,
+        "source": os.path.basename(file_path),
+        "speaker": f"{track}_{label}",
+        "pitch": pitch,
+        "label": label,
+        "confidence": confidence,
+        "duration": duration,
+        "quality_score": quality_metrics["quality_score"],
+        "snr": quality_metrics["snr"],
+        "clipping_ratio": quality_metrics["clipping_ratio"],
+        "silence_ratio": quality_metrics["silence_ratio"],
+        "separation_type": track,
+        "separation_confidence": separation_confidence
+    }
+
+    with stage("write", track=track):
+        if isinstance(audio, StemFile):
+            sink.add_file(audio.path, label, name, metadata_entry)
+        else:
+            sink.add(audio, sample_rate, label, name, metadata_entry)
+    logger.info(f"Saved separated {track} as {label}: {name}")
+    return label
+
+def process_file(file_path, cfg, separator=None, classifier=None, sink=None):
+    """
+    Process a single audio file using source separation.
+
+    Args:
+        file_path: Path to the audio file
+        cfg: Configuration dictionary
+        separator: Preloaded VocalSeparator (shared registry instance if None)
+        classifier: Preloaded classifier (global instance if None)
+        sink: Destination for finished samples; defaults to writing straight
+            into data/voice_dataset (see dataset.sinks)
+    """
     start_time = time.time()
 
     try:
@@ -159,135 +371,48 @@ def process_file(file_path, cfg, separator=None):
         # Load and validate configuration
         validate_config(cfg)
 
-        # Initialize classifier and separator if needed
-        classifier = get_classifier(cfg)
+        # Initialize classifier, separator and sink if needed
+        if classifier is None:
+            from classification import get_classifier
+            classifier = get_classifier(cfg)
+        own_sink = sink is None
+        if own_sink:
+            sink = create_dataset_sink(cfg)
         if separator is None:
-            separator = VocalSeparator(model_name="htdemucs", device="cpu")
-
-        # Load and preprocess audio
-        audio = load_audio(file_path, get_config_value(cfg, "sample_rate", 16000))
-        audio = normalize(audio)
+            separator = get_shared_model(cfg, "demucs")
 
         # Monitor memory before separation
         mem_before = monitor_performance()
 
         # Separate vocals from accompaniment
-        logger.info(f"Separating vocals from accompaniment...")
-        try:
-            separation_result = separator.separate_vocals(audio, get_config_value(cfg, "sample_rate", 16000))
-            vocals = separation_result["vocals"]
-            accompaniment = separation_result["accompaniment"]
-            vocal_confidence = separation_result["confidence"]
-        except Exception as e:
-            logger.warning(f"Vocal separation failed, using original audio: {e}")
-            vocals = audio
-            accompaniment = np.zeros_like(audio)
-            vocal_confidence = 0.0
+        vocals, accompaniment, vocal_confidence = separate_file(file_path, cfg, separator)
 
         # Track results for male and female samples
         processed_segments = 0
         gender_distribution = {"male": 0, "female": 0, "uncertain": 0}
 
-        # Process vocals track
-        logger.info(f"Classifying separated vocal track...")
         try:
-            # Classify the vocal track
-            vocal_label, vocal_conf = classifier.classify(vocals, get_config_value(cfg, "sample_rate", 16000))
-            
-            # Skip if too short
-            if len(vocals) / get_config_value(cfg, "sample_rate", 16000) >= get_config_value(cfg, "min_segment_duration", 1.0):
-                # Estimate pitch for metadata
-                from classification.pitch_gender import PitchGenderClassifier
-                pitch_estimator = PitchGenderClassifier()
+            for track, audio in (("vocals", vocals), ("accompaniment", accompaniment)):
+                # Process the accompaniment only if it contains meaningful audio
+                if track == "accompaniment" and track_power(audio) <= 0.001:
+                    continue
+                logger.info(f"Classifying separated {track} track...")
                 try:
-                    pitch = pitch_estimator.estimate_pitch(vocals, get_config_value(cfg, "sample_rate", 16000))
-                except:
-                    pitch = 0.0
-
-                # Create filename for separated vocals
-                base_name = os.path.basename(file_path).replace('.wav', '').replace('.mp3', '')
-                name = f"{base_name}_vocals_gender{vocal_label[0].upper()}_conf{int(vocal_conf)}.wav"
-                
-                saved_path = save_sample(vocals, get_config_value(cfg, "sample_rate", 16000), vocal_label, name, "data/voice_dataset")
-
-                # Assess audio quality
-                quality_metrics = QualityMetrics(cfg["sample_rate"]).assess_audio_quality(saved_path)
-
-                # Append metadata with quality metrics and separation info
-                metadata_entry = {
-                    "file": name,
-                    "source": os.path.basename(file_path),
-                    "speaker": f"vocals_{vocal_label}",
-                    "pitch": pitch,
-                    "label": vocal_label,
-                    "confidence": vocal_conf,
-                    "duration": len(vocals) / cfg["sample_rate"],
-                    "quality_score": quality_metrics["quality_score"],
-                    "snr": quality_metrics["snr"],
-                    "clipping_ratio": quality_metrics["clipping_ratio"],
-                    "silence_ratio": quality_metrics["silence_ratio"],
-                    "separation_type": "vocals",
-                    "separation_confidence": vocal_confidence
-                }
-
-                append_metadata("data/voice_dataset/metadata.csv", metadata_entry)
-                gender_distribution[vocal_label] += 1
-                processed_segments += 1
-                logger.info(f"Saved separated vocals as {vocal_label}: {name}")
-
-        except Exception as e:
-            logger.error(f"Error classifying vocal track: {e}")
-
-        # Process accompaniment track if it contains meaningful audio
-        if np.mean(accompaniment ** 2) > 0.001:  # Check if accompaniment has energy
-            logger.info(f"Classifying separated accompaniment track...")
-            try:
-                # Classify the accompaniment
-                accomp_label, accomp_conf = classifier.classify(accompaniment, get_config_value(cfg, "sample_rate", 16000))
-                
-                # Skip if too short
-                if len(accompaniment) / get_config_value(cfg, "sample_rate", 16000) >= get_config_value(cfg, "min_segment_duration", 1.0):
-                    # Estimate pitch for metadata
-                    from classification.pitch_gender import PitchGenderClassifier
-                    pitch_estimator = PitchGenderClassifier()
-                    try:
-                        pitch = pitch_estimator.estimate_pitch(accompaniment, get_config_value(cfg, "sample_rate", 16000))
-                    except:
-                        pitch = 0.0
-
-                    # Create filename for separated accompaniment
-                    base_name = os.path.basename(file_path).replace('.wav', '').replace('.mp3', '')
-                    name = f"{base_name}_accompaniment_gender{accomp_label[0].upper()}_conf{int(accomp_conf)}.wav"
-                    
-                    saved_path = save_sample(accompaniment, cfg["sample_rate"], accomp_label, name, "data/voice_dataset")
-
-                    # Assess audio quality
-                    quality_metrics = QualityMetrics(cfg["sample_rate"]).assess_audio_quality(saved_path)
-
-                    # Append metadata
-                    metadata_entry = {
-                        "file": name,
-                        "source": os.path.basename(file_path),
-                        "speaker": f"accompaniment_{accomp_label}",
-                        "pitch": pitch,
-                        "label": accomp_label,
-                        "confidence": accomp_conf,
-                        "duration": len(accompaniment) / cfg["sample_rate"],
-                        "quality_score": quality_metrics["quality_score"],
-                        "snr": quality_metrics["snr"],
-                        "clipping_ratio": quality_metrics["clipping_ratio"],
-                        "silence_ratio": quality_metrics["silence_ratio"],
-                        "separation_type": "accompaniment",
-                        "separation_confidence": vocal_confidence
-                    }
-
-                    append_metadata("data/voice_dataset/metadata.csv", metadata_entry)
-                    gender_distribution[accomp_label] += 1
+                    label = process_track(track, audio, file_path, cfg, classifier, sink, vocal_confidence)
+                except Exception as e:
+                    logger.error(f"Error classifying {track} track: {e}")
+                    continue
+                if label is not None:
+                    gender_distribution[label] += 1
                     processed_segments += 1
-                    logger.info(f"Saved separated accompaniment as {accomp_label}: {name}")
+        finally:
+            # Streamed stems live in their own temporary directory
+            if isinstance(vocals, StemFile):
+                shutil.rmtree(os.path.dirname(vocals.path), ignore_errors=True)
 
-            except Exception as e:
-                logger.error(f"Error classifying accompaniment track: {e}")
+        if own_sink:
+            with stage("write", track="flush"):
+                sink.flush()
 
         processing_time = time.time() - start_time
         mem_after = monitor_performance()
@@ -311,15 +436,16 @@ def process_file(file_path, cfg, separator=None):
             "processing_time": time.time() - start_time
         }
 
-def run_parallel(files, cfg, max_workers=2):
-    """Run processing in parallel with shared separator."""
+def run_parallel(files, cfg, max_workers=2, separator=None):
+    """Run processing in parallel threads with a shared separator."""
     results = []
     # Create separator once and share across threads
-    try:
-        separator = VocalSeparator(model_name="htdemucs", device="cpu")
-    except Exception as e:
-        logger.error(f"Failed to initialize separator: {e}")
-        separator = None
+    if separator is None:
+        try:
+            separator = get_shared_model(cfg, "demucs")
+        except Exception as e:
+            logger.error(f"Failed to initialize separator: {e}")
+            separator = None
     
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
         future_to_file = {executor.submit(process_file, file_path, cfg, separator): file_path for file_path in files}
@@ -334,6 +460,95 @@ def run_parallel(files, cfg, max_workers=2):
 
     return results
 
+# Per-process state for process-pool workers (populated by _init_worker)
+_worker_state = {}
+
+def _init_worker(cfg, num_workers):
+    """Load the models once when a worker process starts."""
+    import torch
+    from classification import get_classifier
+
+    # Split the cores between workers instead of every worker using all of them
+    torch.set_num_threads(max(1, (os.cpu_count() or 1) // num_workers))
+
+    _worker_state["cfg"] = cfg
+    _worker_state["classifier"] = get_classifier(cfg)
+    _worker_state["sink"] = StagingSink("data/voice_dataset")
+    preload_worker_models(cfg)
+    try:
+        _worker_state["separator"] = get_shared_model(cfg, "demucs")
+    except Exception as e:
+        logger.error(f"Worker {os.getpid()} failed to initialize separator: {e}")
+        _worker_state["separator"] = None
+
+def _process_file_in_worker(file_path):
+    """Process one file in a worker; samples are staged for the parent to commit."""
+    state = _worker_state
+    result = process_file(file_path, state["cfg"], state["separator"],
+                          state["classifier"], state["sink"])
+    result["staged"] = state["sink"].drain()
+    return result
+
+def run_process_pool(files, cfg, num_workers=None):
+    """
+    Run processing in a pool of worker processes.
+
+    Each worker loads the separator and classifier once at startup and then
+    receives file paths. Workers only stage their output; counter allocation
+    and metadata appends happen here in the parent, one file at a time.
+    """
+    num_workers = num_workers or get_num_workers(cfg)
+    sink = create_dataset_sink(cfg)
+    results = []
+
+    # spawn: torch/CUDA state must not be inherited through fork
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=num_workers, mp_context=context,
+                             initializer=_init_worker, initargs=(cfg, num_workers)) as executor:
+        future_to_file = {executor.submit(_process_file_in_worker, file_path): file_path for file_path in files}
+
+        for future in tqdm(as_completed(future_to_file), total=len(files), desc="Processing files"):
+            try:
+                result = future.result()
+                sink.commit_staged(result.pop("staged", []))
+                results.append(result)
+            except Exception as e:
+                logger.error(f"Worker execution error for {future_to_file[future]}: {e}")
+                results.append({"file": os.path.basename(future_to_file[future]), "error": str(e)})
+
+    sink.flush()
+    return results
+
+def get_num_workers(cfg):
+    """Resolve the worker count from performance.num_workers ('auto'/0 = one per core)."""
+    num_workers = cfg.get("performance", {}).get("num_workers",
+                                                 cfg.get("max_workers", cfg.get("parallel_workers", 2)))
+    if num_workers in (None, 0, "auto"):
+        num_workers = os.cpu_count() or 1
+    return max(1, int(num_workers))
+
+def get_executor_type(cfg):
+    """Executor used for batches: 'process' (default) or 'thread'."""
+    return cfg.get("performance", {}).get("executor", "process")
+
+def run_files(files, cfg, separator=None):
+    """Process a list of files with the configured executor."""
+    num_workers = min(get_num_workers(cfg), len(files))
+
+    if len(files) <= 2 or num_workers <= 1:
+        # Sequential processing for small batches
+        if separator is None:
+            try:
+                separator = get_shared_model(cfg, "demucs")
+            except Exception as e:
+                logger.error(f"Failed to initialize separator: {e}")
+                separator = None
+        return [process_file(file_path, cfg, separator) for file_path in tqdm(files, desc="Processing files")]
+
+    if get_executor_type(cfg) == "process":
+        return run_process_pool(files, cfg, num_workers)
+    return run_parallel(files, cfg, max_workers=num_workers, separator=separator)
+
 def run(config_path):
     """Main processing function with duration-based batching and GPU support."""
     try:
@@ -341,6 +556,8 @@ def run(config_path):
         cfg = yaml.safe_load(open(config_path))
         validate_config(cfg)
 
+        import torch
+
         # Log GPU status
         if torch.cuda.is_available():
             logger.info(f"🚀 GPU detected: {torch.cuda.get_device_name(0)}")
@@ -378,8 +595,10 @@ def run(config_path):
         batches = create_duration_batches(files, batch_size_minutes=cfg.get('batch_size_minutes', 2))
         logger.info(f"Created {len(batches)} batches based on audio duration")
         
+        logger.info(f"Executor: {get_executor_type(cfg)} pool, {get_num_workers(cfg)} workers")
+
         # Process batches in order (smallest first)
-        all_results = []
+        results = []
         for batch_name in sorted(batches.keys()):
             batch_files = batches[batch_name]
             logger.info(f"Processing {batch_name}: {len(batch_files)} files")
@@ -389,38 +608,17 @@ def run(config_path):
                 logger.info(f"  🚀 Using GPU acceleration for batch")
                 torch.cuda.empty_cache()
             
-            results = run_parallel(batch_files, cfg, max_workers=cfg.get('max_workers', 2))
-            all_results.extend(results)
+            results.extend(run_files(batch_files, cfg))
             
             # Clear GPU cache between batches
             if device.type == 'cuda':
                 torch.cuda.empty_cache()
 
-        # Generate summary
-
-        # Initialize separator once for better performance
-        try:
-            separator = VocalSeparator(model_name="htdemucs", device="cpu")
-        except Exception as e:
-            logger.error(f"Failed to initialize separator: {e}")
-            separator = None
-
-        # Choose processing method based on file count
-        if len(files) <= 2:
-            # Sequential processing for small batches
-            results = []
-            for file_path in tqdm(files, desc="Processing files"):
-                result = process_file(file_path, cfg, separator)
-                results.append(result)
-        else:
-            # Parallel processing for larger batches
-            max_workers = min(cfg.get("parallel_workers", 2), len(files))
-            results = run_parallel(files, cfg, max_workers)
-
         # Data augmentation if enabled
         if cfg.get("enable_augmentation", False):
             logger.info("Running data augmentation...")
             try:
+                from data_augmentation.augment import balance_dataset
                 balance_dataset(dataset_dir, cfg)
                 logger.info("Data augmentation completed")
             except Exception as e:
@@ -431,6 +629,9 @@ def run(config_path):
         failed = len([r for r in results if "error" in r])
 
         logger.info(f"Batch processing completed: {successful} successful, {failed} failed")
+        for stats in model_stats():
+            logger.info(f"Model {stats['name']}: loaded in {stats['load_seconds']:.2f}s, "
+                        f"+{stats['rss_mb']:.0f} MB RSS, +{stats['cuda_mb']:.0f} MB CUDA")
 
         return {
             "status": "completed",
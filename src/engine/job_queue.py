@@ -0,0 +1,369 @@
+"""
+Job Queue Module
+Bounded, persistent processing queue for the web app
+
+Every upload used to start its own thread running batch_runner.run over
+the whole data/input directory: concurrent uploads reprocessed each other's
+files and competed for the CPU, and job status lived in a dict that was
+lost on restart. Jobs now go into a SQLite-backed queue served by a fixed
+number of worker threads. A job covers exactly the files uploaded with it.
+
+Key Features:
+- Fixed worker pool (jobs wait in the queue instead of oversubscribing)
+- Per-job file list with per-file status and results
+- State in SQLite: queued/running jobs resume after a restart, finished
+  files are not processed again
+- Cancellation: queued jobs are dropped, running jobs stop before their
+  next file
+- Optional ProgressBus: job, file and per-stage events pushed as they happen
+"""
+
+import os
+import json
+import time
+import uuid
+import queue
+import logging
+import sqlite3
+import threading
+from typing import Callable, Dict, List, Optional
+
+from engine.progress import ProgressBus, report_to, stage
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = 'queued'
+JOB_PROCESSING = 'processing'
+JOB_COMPLETED = 'completed'
+JOB_ERROR = 'error'
+JOB_CANCELLED = 'cancelled'
+
+_FINISHED = (JOB_COMPLETED, JOB_ERROR, JOB_CANCELLED)
+
+FILE_PENDING = 'pending'
+FILE_PROCESSING = 'processing'
+FILE_DONE = 'done'
+FILE_FAILED = 'failed'
+FILE_SKIPPED = 'skipped'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    input_dir TEXT NOT NULL,
+    message TEXT,
+    error TEXT,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE TABLE IF NOT EXISTS job_files (
+    job_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    file TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    result TEXT,
+    started_at REAL,
+    finished_at REAL,
+    PRIMARY KEY (job_id, position)
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status);
+"""
+
+
+class BatchRunnerProcessor:
+    """
+    Default per-file processor: engine.batch_runner.process_file
+
+    The classifier and dataset sink are created once and shared by all
+    queue workers; the separator comes from the model registry.
+    """
+
+    def __init__(self, config_path: str):
+        self.config_path = config_path
+        self._lock = threading.Lock()
+        self._state = None
+
+    def _load(self):
+        with self._lock:
+            if self._state is None:
+                import yaml
+                from engine.batch_runner import validate_config, create_dataset_sink
+                from classification import get_classifier
+
+                with open(self.config_path) as f:
+                    cfg = yaml.safe_load(f)
+                validate_config(cfg)
+                self._state = (cfg, get_classifier(cfg), create_dataset_sink(cfg))
+        return self._state
+
+    def __call__(self, file_path: str) -> Dict:
+        from engine.batch_runner import process_file
+
+        cfg, classifier, sink = self._load()
+        result = process_file(file_path, cfg, classifier=classifier, sink=sink)
+        with stage("write", track="flush"):
+            sink.flush()
+        return result
+
+
+class JobQueue:
+    """
+    SQLite-backed job queue with a fixed pool of worker threads
+    """
+
+    def __init__(self, db_path: str, process: Callable[[str], Dict],
+                 num_workers: int = 1, autostart: bool = True,
+                 bus: Optional[ProgressBus] = None):
+        """
+        Initialize queue
+
+        Args:
+            db_path: SQLite database file
+            process: Function processing one file path and returning a
+                result dictionary (an 'error' key marks a failed file)
+            num_workers: Number of jobs processed concurrently
+            autostart: Start the workers now (otherwise call start())
+            bus: Progress bus receiving job, file and stage events
+                (a private one is created if None)
+        """
+        self.db_path = db_path
+        self.process = process
+        self.num_workers = max(1, int(num_workers))
+        self.bus = bus or ProgressBus()
+
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+        self._queue = queue.Queue()
+        self._workers = []
+        self._started = False
+        self._start_lock = threading.Lock()
+
+        if autostart:
+            self.start()
+
+    def start(self):
+        """Start the workers and requeue jobs left unfinished by a previous run"""
+        with self._start_lock:
+            if self._started:
+                return
+            self._started = True
+
+            with self._lock, self._conn:
+                # Files interrupted mid-processing run again
+                self._conn.execute("UPDATE job_files SET status = ? WHERE status = ?",
+                                   (FILE_PENDING, FILE_PROCESSING))
+                rows = self._conn.execute(
+                    "SELECT id FROM jobs WHERE status IN (?, ?) ORDER BY created_at",
+                    (JOB_QUEUED, JOB_PROCESSING)
+                ).fetchall()
+            for row in rows:
+                self._queue.put(row['id'])
+            if rows:
+                logger.info(f"Resuming {len(rows)} unfinished jobs")
+
+            for index in range(self.num_workers):
+                worker = threading.Thread(target=self._worker, name=f"job-worker-{index}", daemon=True)
+                worker.start()
+                self._workers.append(worker)
+
+    def close(self, timeout: Optional[float] = None):
+        """Stop the workers after their current file and close the database"""
+        if self._started:
+            for _ in self._workers:
+                self._queue.put(None)
+            for worker in self._workers:
+                worker.join(timeout)
+        with self._lock:
+            self._conn.close()
+
+    def submit(self, input_dir: str, files: List[str], job_id: Optional[str] = None) -> str:
+        """
+        Queue a job
+
+        Args:
+            input_dir: Directory holding the job's files
+            files: File names (relative to input_dir) to process
+            job_id: Optional id (default: new UUID)
+
+        Returns:
+            Job id
+        """
+        job_id = job_id or str(uuid.uuid4())
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO jobs (id, status, input_dir, message, created_at) VALUES (?, ?, ?, ?, ?)",
+                (job_id, JOB_QUEUED, input_dir, f"Queued {len(files)} files", now)
+            )
+            self._conn.executemany(
+                "INSERT INTO job_files (job_id, position, file) VALUES (?, ?, ?)",
+                [(job_id, position, name) for position, name in enumerate(files)]
+            )
+        self.bus.publish(job_id, {'type': 'job', 'status': JOB_QUEUED, 'total': len(files),
+                                  'message': f"Queued {len(files)} files"})
+        self._queue.put(job_id)
+        return job_id
+
+    def cancel(self, job_id: str) -> Optional[Dict]:
+        """
+        Cancel a job
+
+        Queued jobs are cancelled at once; a running job finishes its
+        current file and then stops.
+
+        Returns:
+            Updated job dictionary, or None if the job does not exist
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE jobs SET cancel_requested = 1 WHERE id = ?", (job_id,))
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, message = ?, finished_at = ? WHERE id = ? AND status = ?",
+                (JOB_CANCELLED, "Cancelled before processing started", now, job_id, JOB_QUEUED)
+            )
+            self._conn.execute(
+                "UPDATE job_files SET status = ? WHERE job_id = ? AND status = ? AND "
+                "(SELECT status FROM jobs WHERE id = ?) = ?",
+                (FILE_SKIPPED, job_id, FILE_PENDING, job_id, JOB_CANCELLED)
+            )
+        job = self.get(job_id)
+        if job is not None:
+            self.bus.publish(job_id, {'type': 'job', 'status': job['status'], 'message': job['message'],
+                                      'cancel_requested': True})
+            if job['status'] in _FINISHED:
+                self.bus.retire(job_id)
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """
+        Job state with per-file progress
+
+        Returns:
+            Dictionary with status, message, progress (0-100), counts and
+            files, or None if the job does not exist
+        """
+        with self._lock:
+            job = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if job is None:
+                return None
+            files = self._conn.execute(
+                "SELECT file, status, result, started_at, finished_at FROM job_files "
+                "WHERE job_id = ? ORDER BY position", (job_id,)
+            ).fetchall()
+
+        job = dict(job)
+        job['cancel_requested'] = bool(job['cancel_requested'])
+        job['files'] = []
+        counts = {}
+        for row in files:
+            entry = dict(row)
+            entry['result'] = json.loads(entry['result']) if entry['result'] else None
+            job['files'].append(entry)
+            counts[entry['status']] = counts.get(entry['status'], 0) + 1
+
+        finished = counts.get(FILE_DONE, 0) + counts.get(FILE_FAILED, 0)
+        job['counts'] = counts
+        job['total'] = len(files)
+        job['progress'] = round(100.0 * finished / len(files), 1) if files else 100.0
+        return job
+
+    def list_jobs(self, limit: int = 50) -> List[Dict]:
+        """Most recent jobs (without file lists)"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, status, message, created_at, finished_at FROM jobs "
+                "ORDER BY created_at DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def _update_job(self, job_id: str, **fields):
+        assignments = ", ".join(f"{key} = ?" for key in fields)
+        with self._lock, self._conn:
+            self._conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+        self.bus.publish(job_id, dict(fields, type='job'))
+        if fields.get('status') in _FINISHED:
+            self.bus.retire(job_id)
+
+    def _update_file(self, job_id: str, position: int, **fields):
+        assignments = ", ".join(f"{key} = ?" for key in fields)
+        with self._lock, self._conn:
+            self._conn.execute(f"UPDATE job_files SET {assignments} WHERE job_id = ? AND position = ?",
+                               (*fields.values(), job_id, position))
+
+    def _cancel_requested(self, job_id: str) -> bool:
+        with self._lock:
+            row = self._conn.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return bool(row and row['cancel_requested'])
+
+    def _worker(self):
+        while True:
+            job_id = self._queue.get()
+            if job_id is None:
+                return
+            try:
+                self._run_job(job_id)
+            except Exception as e:
+                logger.error(f"Job {job_id} failed: {e}")
+                self._update_job(job_id, status=JOB_ERROR, error=str(e), finished_at=time.time())
+
+    def _run_job(self, job_id: str):
+        with self._lock:
+            job = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if job is None or job['status'] not in (JOB_QUEUED, JOB_PROCESSING):
+                return
+            pending = self._conn.execute(
+                "SELECT position, file FROM job_files WHERE job_id = ? AND status = ? ORDER BY position",
+                (job_id, FILE_PENDING)
+            ).fetchall()
+            total = self._conn.execute("SELECT COUNT(*) FROM job_files WHERE job_id = ?",
+                                       (job_id,)).fetchone()[0]
+
+        self._update_job(job_id, status=JOB_PROCESSING, started_at=job['started_at'] or time.time(),
+                         message="Starting processing...")
+
+        for row in pending:
+            if self._cancel_requested(job_id):
+                with self._lock, self._conn:
+                    self._conn.execute("UPDATE job_files SET status = ? WHERE job_id = ? AND status = ?",
+                                       (FILE_SKIPPED, job_id, FILE_PENDING))
+                self._update_job(job_id, status=JOB_CANCELLED, message="Cancelled", finished_at=time.time())
+                return
+
+            position, name = row['position'], row['file']
+            started_at = time.time()
+            self._update_file(job_id, position, status=FILE_PROCESSING, started_at=started_at)
+            self._update_job(job_id, message=f"Processing {name} ({position + 1}/{total})")
+            self.bus.publish(job_id, {'type': 'file', 'file': name, 'position': position,
+                                      'total': total, 'status': FILE_PROCESSING})
+
+            def report(event, name=name, position=position):
+                self.bus.publish(job_id, dict(event, file=name, position=position))
+
+            try:
+                with report_to(report):
+                    result = self.process(os.path.join(job['input_dir'], name))
+            except Exception as e:
+                result = {"file": name, "error": str(e)}
+            status = FILE_FAILED if result.get("error") else FILE_DONE
+            self._update_file(job_id, position, status=status, finished_at=time.time(),
+                              result=json.dumps(result, default=str))
+            self.bus.publish(job_id, {'type': 'file', 'file': name, 'position': position, 'total': total,
+                                      'status': status, 'seconds': time.time() - started_at,
+                                      'error': result.get("error")})
+
+        state = self.get(job_id)
+        successful = state['counts'].get(FILE_DONE, 0)
+        failed = state['counts'].get(FILE_FAILED, 0)
+        self._update_job(
+            job_id,
+            status=JOB_COMPLETED,
+            message=f"Processing completed: {successful} successful, {failed} failed",
+            finished_at=time.time()
+        )
@@ -0,0 +1,223 @@
+"""
+Progress Module
+Push-based job and stage progress events
+
+The web frontend used to poll /status every couple of seconds for a
+snapshot of the job. Processing code now reports what it is doing to a
+ProgressBus, and the web app streams those events to the browser
+(Server-Sent Events) as they happen, including how long each stage took.
+
+Key Features:
+- ProgressBus: thread-safe publish/subscribe keyed by job id, with a short
+  per-job history so late subscribers see what they missed; histories of
+  finished jobs are dropped after a grace period, and only the most
+  recently active jobs are kept
+- stage('separate'): context manager timing one processing stage of the
+  current file (decode, separate, classify, pitch, quality, write)
+- report_to(callback): binds a reporter for the current thread/context, so
+  process_file needs no extra arguments and stays silent outside the queue
+"""
+
+import time
+import queue
+import logging
+import threading
+import contextvars
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+STAGES = ('decode', 'separate', 'classify', 'pitch', 'quality', 'write')
+
+# Reporter of the file being processed in this context (None: not reporting)
+_reporter = contextvars.ContextVar('progress_reporter', default=None)
+
+
+class ProgressBus:
+    """
+    In-process event bus for job progress
+    """
+
+    def __init__(self, history: int = 200, max_jobs: int = 100, retain_seconds: float = 60.0):
+        """
+        Initialize bus
+
+        Args:
+            history: Number of recent events kept per job for late subscribers
+            max_jobs: Number of jobs whose history is kept; the least recently
+                active job without subscribers is dropped first
+            retain_seconds: How long the history of a retired (finished) job
+                is kept for late subscribers
+        """
+        self.history = history
+        self.max_jobs = max_jobs
+        self.retain_seconds = retain_seconds
+        self._lock = threading.Lock()
+        self._subscribers = {}
+        self._history = OrderedDict()
+        self._retired = {}
+        self._seq = 0
+
+    def publish(self, job_id: str, event: Dict) -> Dict:
+        """
+        Send an event to every subscriber of a job
+
+        Returns:
+            The event with job_id, seq and timestamp filled in
+        """
+        with self._lock:
+            self._seq += 1
+            event = dict(event, job_id=job_id, seq=self._seq, timestamp=time.time())
+            self._history.setdefault(job_id, deque(maxlen=self.history)).append(event)
+            self._history.move_to_end(job_id)
+            self._prune()
+            subscribers = list(self._subscribers.get(job_id, ()))
+        for subscriber in subscribers:
+            subscriber.put(event)
+        return event
+
+    def subscribe(self, job_id: str, replay: bool = True) -> 'Subscription':
+        """
+        Receive the events of a job
+
+        Args:
+            job_id: Job to follow
+            replay: Deliver the job's recent history first
+
+        Returns:
+            Subscription (iterate or call get(); close() when done)
+        """
+        subscription = Subscription(self, job_id)
+        with self._lock:
+            if replay:
+                for event in self._history.get(job_id, ()):
+                    subscription.put(event)
+            self._subscribers.setdefault(job_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: 'Subscription'):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.job_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.job_id]
+                    self._prune()
+
+    def recent(self, job_id: str) -> List[Dict]:
+        """Recent events of a job"""
+        with self._lock:
+            return list(self._history.get(job_id, ()))
+
+    def retire(self, job_id: str):
+        """
+        Mark a job as finished
+
+        Its history is dropped retain_seconds from now, or later if a
+        subscriber is still reading it.
+        """
+        with self._lock:
+            self._retired[job_id] = time.monotonic() + self.retain_seconds
+            self._prune()
+
+    def forget(self, job_id: str):
+        """Drop a job's history"""
+        with self._lock:
+            self._history.pop(job_id, None)
+            self._retired.pop(job_id, None)
+
+    def _prune(self):
+        # Called with the lock held
+        now = time.monotonic()
+        for job_id, deadline in list(self._retired.items()):
+            if deadline <= now and job_id not in self._subscribers:
+                self._history.pop(job_id, None)
+                del self._retired[job_id]
+
+        excess = len(self._history) - self.max_jobs
+        if excess > 0:
+            idle = [job_id for job_id in self._history if job_id not in self._subscribers]
+            for job_id in idle[:excess]:
+                del self._history[job_id]
+                self._retired.pop(job_id, None)
+
+
+class Subscription:
+    """Queue of events for one subscriber"""
+
+    def __init__(self, bus: ProgressBus, job_id: str):
+        self.bus = bus
+        self.job_id = job_id
+        self._queue = queue.Queue()
+
+    def put(self, event: Dict):
+        self._queue.put(event)
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Dict]:
+        """Next event, or None after timeout seconds without one"""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.bus.unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+@contextmanager
+def report_to(callback: Callable[[Dict], None]):
+    """
+    Send stage events of the code run inside this block to callback
+
+    Usage:
+        with report_to(lambda event: bus.publish(job_id, dict(event, file=name))):
+            process_file(path, cfg)
+    """
+    token = _reporter.set(callback)
+    try:
+        yield
+    finally:
+        _reporter.reset(token)
+
+
+def emit(event: Dict):
+    """Report an event to the current reporter (no-op when none is bound)"""
+    callback = _reporter.get()
+    if callback is None:
+        return
+    try:
+        callback(event)
+    except Exception as e:
+        # Progress reporting must never break processing
+        logger.warning(f"Progress reporter failed: {e}")
+
+
+@contextmanager
+def stage(name: str, **details):
+    """
+    Time a processing stage and report its start and end
+
+    The end event carries 'seconds' and, if the block raised, 'error'.
+    """
+    if _reporter.get() is None:
+        yield
+        return
+
+    emit(dict(details, type='stage', stage=name, status='start'))
+    start_time = time.perf_counter()
+    try:
+        yield
+    except BaseException as e:
+        emit(dict(details, type='stage', stage=name, status='error', error=str(e),
+                  seconds=time.perf_counter() - start_time))
+        raise
+    emit(dict(details, type='stage', stage=name, status='end',
+              seconds=time.perf_counter() - start_time))
@@ -11,8 +11,6 @@ from pathlib import Path
 # Add src to path for imports
 sys.path.insert(0, str(Path(__file__).parent))
 
-from src.pipeline import VoxentPipeline
-
 
 def main():
     """Main entry point for VOXENT"""
@@ -53,6 +51,9 @@ Examples:
         print(f"Please provide a valid config file path")
         sys.exit(1)
     
+    # Imported after argument parsing so --help/--version do not load torch
+    from src.pipeline import VoxentPipeline
+    
     try:
         # Initialize and run pipeline
         print("\n" + "="*70)
@@ -1,10 +1,26 @@
 """
 VOXENT Pipeline Module
 Core pipeline components for voice dataset creation
+
+Components are imported on first attribute access, so importing a light
+submodule (e.g. pipeline.batch_scheduler) does not load torch or pyannote.
 """
 
-from .batch_organizer import BatchOrganizer
-from .batch_processor import IntegratedBatchProcessor, GPUMonitor
-from .pipeline_runner import VoxentPipeline
+import importlib
+
+_LAZY = {
+    'BatchOrganizer': '.batch_organizer',
+    'IntegratedBatchProcessor': '.batch_processor',
+    'GPUMonitor': '.batch_processor',
+    'VoxentPipeline': '.pipeline_runner',
+}
 
 __all__ = ['BatchOrganizer', 'IntegratedBatchProcessor', 'GPUMonitor', 'VoxentPipeline']
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -32,6 +32,7 @@ import librosa
 import yaml
 
 from classification.ml_gender_classifier_v3 import MLGenderClassifier
+from preprocessing.audio_loader import prefetch_audio
 from preprocessing.vad_enhanced import VADProcessor
 from quality.quality_assessor import QualityAssessor
 
@@ -381,9 +382,11 @@ class AIEnhancementEngine:
         """
         results = []
         
-        for audio_file in audio_files:
+        # Decode the next files in background threads while this one is processed
+        for _, audio_file, audio, error in prefetch_audio(audio_files, sr=16000):
             try:
-                audio, _ = librosa.load(audio_file, sr=16000, mono=True)
+                if error is not None:
+                    raise RuntimeError(error)
                 
                 result = self.process_segment(audio, include_quality)
                 result['file'] = audio_file
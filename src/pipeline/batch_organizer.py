@@ -9,6 +9,10 @@ Key Features:
 - Creates physical batch folders (batch_001, batch_002, etc.)
 - Monitors and reports batch statistics
 - Duration-based batching (e.g., 0-2 min, 2-4 min, etc.)
+- Parallel header-only duration scanning (see preprocessing.audio_probe)
+- Incremental re-runs through an optional ScanIndex (see pipeline.scan_index)
+- Link modes (hardlink/reflink/symlink/manifest) instead of copying every file
+- Bin-packed batches by total duration/memory (see pipeline.batch_scheduler)
 """
 
 import os
@@ -16,13 +20,80 @@ import shutil
 from pathlib import Path
 from typing import List, Dict, Tuple
 import json
-import librosa
+import time
 import logging
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
 from datetime import datetime
 from preprocessing.audio_converter import AudioConverter
+from preprocessing.audio_probe import probe_audio, probe_files
+from .batch_scheduler import schedule_batches, DEFAULT_MEMORY_MB_PER_SECOND
 
 logger = logging.getLogger(__name__)
 
+LINK_MODES = ('copy', 'move', 'hardlink', 'reflink', 'symlink', 'manifest')
+
+# Linux ioctl for copy-on-write clones (btrfs, XFS with reflink=1, ...)
+FICLONE = 0x40049409
+
+
+def _reflink(src_path: str, dst_path: str):
+    if not FCNTL_AVAILABLE:
+        raise OSError("reflink not supported on this platform")
+    with open(src_path, 'rb') as src, open(dst_path, 'wb') as dst:
+        try:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        except OSError:
+            dst.close()
+            os.remove(dst_path)
+            raise
+
+
+def place_file(src_path: str, dst_path: str, link_mode: str = 'copy') -> str:
+    """
+    Put src_path at dst_path using link_mode
+
+    hardlink, reflink and symlink fall back to a copy when the filesystem
+    cannot do them (e.g. across devices). 'manifest' does nothing; the batch
+    manifest points at the source instead.
+
+    Args:
+        src_path: Source file
+        dst_path: Destination inside the batch folder
+        link_mode: One of LINK_MODES
+
+    Returns:
+        The mode actually used
+    """
+    if link_mode == 'manifest' or src_path == dst_path:
+        return link_mode
+    if link_mode == 'move':
+        shutil.move(src_path, dst_path)
+        return 'move'
+
+    if os.path.lexists(dst_path):
+        os.remove(dst_path)
+
+    try:
+        if link_mode == 'hardlink':
+            os.link(src_path, dst_path)
+            return 'hardlink'
+        if link_mode == 'reflink':
+            _reflink(src_path, dst_path)
+            return 'reflink'
+        if link_mode == 'symlink':
+            os.symlink(os.path.abspath(src_path), dst_path)
+            return 'symlink'
+    except (OSError, NotImplementedError) as e:
+        logger.debug(f"{link_mode} failed for {src_path}, copying instead: {e}")
+
+    shutil.copy2(src_path, dst_path)
+    return 'copy'
+
 
 class BatchOrganizer:
     """
@@ -43,6 +114,15 @@ class BatchOrganizer:
         self.files_per_batch = config.get('files_per_batch', 10)
         self.batch_size_minutes = config.get('batch_size_minutes', 2.0)
         self.batch_size_seconds = self.batch_size_minutes * 60
+        self.scan_workers = config.get('scan_workers')  # None = auto
+        self.link_mode = config.get('link_mode')  # None = from copy_files
+        if self.link_mode is not None and self.link_mode not in LINK_MODES:
+            raise ValueError(f"Unknown link_mode '{self.link_mode}', expected one of {LINK_MODES}")
+        
+        # Batching strategy: 'binpack' (balanced) or legacy 'duration_ranges'
+        self.strategy = config.get('strategy', 'binpack')
+        self.max_batch_memory_mb = config.get('max_batch_memory_mb')
+        self.memory_mb_per_second = config.get('memory_mb_per_second', DEFAULT_MEMORY_MB_PER_SECOND)
         
         # Audio converter
         self.converter = AudioConverter(
@@ -53,6 +133,7 @@ class BatchOrganizer:
         print(f"Batch Organizer initialized:")
         print(f"  - Files per batch: {self.files_per_batch}")
         print(f"  - Max batch duration: {self.batch_size_minutes} minutes")
+        print(f"  - Batching strategy: {self.strategy}")
         print(f"  - Auto-convert MP3 to WAV: Enabled")
     
     def get_audio_duration(self, audio_path: str) -> float:
@@ -65,19 +146,19 @@ class BatchOrganizer:
         Returns:
             Duration in seconds
         """
-        try:
-            duration = librosa.get_duration(path=audio_path)
-            return duration
-        except Exception as e:
-            print(f"Error getting duration for {audio_path}: {e}")
+        info = probe_audio(audio_path)
+        if info is None:
+            print(f"Error getting duration for {audio_path}")
             return 0.0
+        return info['duration']
     
-    def scan_audio_files(self, input_dir: str) -> List[Dict]:
+    def scan_audio_files(self, input_dir: str, index=None) -> List[Dict]:
         """
         Scan directory for audio files and get their durations
         
         Args:
             input_dir: Directory containing audio files
+            index: Optional ScanIndex; only new or changed files are probed
             
         Returns:
             List of file info dictionaries sorted by duration
@@ -87,21 +168,52 @@ class BatchOrganizer:
         # Supported audio formats
         audio_extensions = {'.wav', '.mp3', '.flac', '.m4a', '.ogg', '.aac'}
         
-        # Collect file info
-        file_info = []
+        # Collect paths, then read durations from headers in parallel
+        paths = []
         for root, _, files in os.walk(input_dir):
             for filename in files:
                 if Path(filename).suffix.lower() in audio_extensions:
-                    file_path = os.path.join(root, filename)
-                    duration = self.get_audio_duration(file_path)
-                    
-                    if duration > 0:
-                        file_info.append({
-                            'path': file_path,
-                            'filename': filename,
-                            'duration': duration,
-                            'size_mb': os.path.getsize(file_path) / (1024 * 1024)
-                        })
+                    paths.append(os.path.join(root, filename))
+        
+        start_time = time.time()
+        if index is not None:
+            entries, changed = index.refresh(
+                paths, lambda new_paths: probe_files(new_paths, max_workers=self.scan_workers)
+            )
+            probed = [
+                {
+                    'path': entry['path'],
+                    'duration': entry['duration'],
+                    'size_bytes': entry['size'],
+                    'sample_rate': entry['sample_rate'],
+                    'format': entry['format'],
+                    'status': entry['status'],
+                    'batch_path': entry['batch_path']
+                }
+                for entry in entries
+            ]
+            print(f"Scan index: {len(changed)} new/changed, {len(entries) - len(changed)} unchanged")
+        else:
+            probed = probe_files(paths, max_workers=self.scan_workers)
+        elapsed = time.time() - start_time
+        
+        file_info = [
+            {
+                'path': info['path'],
+                'filename': os.path.basename(info['path']),
+                'duration': info['duration'],
+                'size_mb': info['size_bytes'] / (1024 * 1024),
+                'sample_rate': info['sample_rate'],
+                'format': info['format'],
+                'status': info.get('status'),
+                'batch_path': info.get('batch_path')
+            }
+            for info in probed if info['duration'] and info['duration'] > 0
+        ]
+        
+        if paths:
+            rate = len(paths) / elapsed if elapsed > 0 else float('inf')
+            print(f"Scanned {len(paths)} files in {elapsed:.2f}s ({rate:.1f} files/sec)")
         
         # Sort by duration (smallest to largest)
         file_info.sort(key=lambda x: x['duration'])
@@ -186,7 +298,12 @@ class BatchOrganizer:
     
     def create_batches(self, file_info: List[Dict]) -> List[List[Dict]]:
         """
-        Create batches from file info list (Duration-range based)
+        Create batches from file info list
+        
+        With the default 'binpack' strategy files are packed into batches of
+        at most batch_size_minutes of audio, files_per_batch files and
+        max_batch_memory_mb estimated memory, longest batches first. The
+        'duration_ranges' strategy keeps the old fixed duration buckets.
         
         Args:
             file_info: List of file info dictionaries
@@ -194,6 +311,15 @@ class BatchOrganizer:
         Returns:
             List of batches (each batch is a list of file info)
         """
+        if self.strategy == 'binpack':
+            return schedule_batches(
+                file_info,
+                batch_size_minutes=self.batch_size_minutes,
+                files_per_batch=self.files_per_batch,
+                max_batch_memory_mb=self.max_batch_memory_mb,
+                memory_mb_per_second=self.memory_mb_per_second
+            )
+        
         # Use duration range batching
         batches_dict, batch_info, unassigned = self.create_duration_range_batches(file_info)
         
@@ -210,7 +336,9 @@ class BatchOrganizer:
         batches: List[List[Dict]], 
         output_dir: str,
         copy_files: bool = True,
-        duration_ranges: bool = True
+        duration_ranges: bool = True,
+        index=None,
+        link_mode: str = None
     ) -> List[str]:
         """
         Create batch folders and organize files
@@ -219,12 +347,17 @@ class BatchOrganizer:
             batches: List of batches from create_batches()
             output_dir: Base directory for batch folders
             copy_files: If True, copy files; if False, move files
+                (only used when no link_mode is set)
             duration_ranges: If True, use duration-range batch names
+            index: Optional ScanIndex updated with each file's batch location
+            link_mode: copy, move, hardlink, reflink, symlink or manifest;
+                defaults to the organizer's link_mode
             
         Returns:
             List of created batch folder paths
         """
-        print(f"\nOrganizing into batch folders: {output_dir}")
+        link_mode = link_mode or self.link_mode or ('copy' if copy_files else 'move')
+        print(f"\nOrganizing into batch folders: {output_dir} (mode: {link_mode})")
         
         # Create base output directory
         Path(output_dir).mkdir(parents=True, exist_ok=True)
@@ -242,7 +375,13 @@ class BatchOrganizer:
             8: "60-120_min",
         }
         
-        for batch_idx, batch in enumerate(batches):
+        # Bin-packed batches from an incremental run go into new folders
+        # instead of overfilling the ones from earlier runs
+        first_batch = 0
+        if index is not None and not duration_ranges:
+            first_batch = len([d for d in os.listdir(output_dir) if d.startswith('batch_')])
+        
+        for batch_idx, batch in enumerate(batches, first_batch):
             if duration_ranges and batch_idx < 9:
                 # Use duration range naming
                 range_name = duration_range_names.get(batch_idx, f"batch_{batch_idx+1:03d}")
@@ -253,49 +392,64 @@ class BatchOrganizer:
             batch_path = os.path.join(output_dir, batch_name)
             Path(batch_path).mkdir(parents=True, exist_ok=True)
             
-            # Copy/move files to batch folder
+            # Place files in the batch folder (or only list them in the manifest)
             batch_duration = 0.0
             file_count = 0
+            modes_used = {}
             
             for file_info in batch:
                 src_path = file_info['path']
                 dst_path = os.path.join(batch_path, file_info['filename'])
                 
-                if copy_files and src_path != dst_path:
-                    shutil.copy2(src_path, dst_path)
-                elif not copy_files:
-                    shutil.move(src_path, dst_path)
+                used = place_file(src_path, dst_path, link_mode)
+                modes_used[used] = modes_used.get(used, 0) + 1
+                
+                if index is not None:
+                    # Manifest batches are processed from the source_path written below
+                    index.mark_organized(src_path, os.path.abspath(src_path) if link_mode == 'manifest' else dst_path)
                 
                 batch_duration += file_info['duration']
                 file_count += 1
             
             # Save batch metadata
+            batch_files = [
+                {
+                    'filename': f['filename'],
+                    'source_path': os.path.abspath(f['path']),
+                    'duration': f['duration'],
+                    'duration_minutes': f['duration'] / 60,
+                    'size_mb': f['size_mb']
+                }
+                for f in batch
+            ]
+            
+            metadata_path = os.path.join(batch_path, 'batch_metadata.json')
+            if index is not None and os.path.exists(metadata_path):
+                # Incremental run: keep the files organized by earlier runs
+                with open(metadata_path, 'r') as f:
+                    previous = json.load(f).get('files', [])
+                new_names = {f['filename'] for f in batch_files}
+                batch_files = [f for f in previous if f['filename'] not in new_names] + batch_files
+            
+            total_duration = sum(f['duration'] for f in batch_files)
             batch_metadata = {
                 'batch_number': batch_idx + 1,
                 'batch_name': batch_name,
-                'num_files': len(batch),
-                'total_duration_seconds': batch_duration,
-                'total_duration_minutes': batch_duration / 60,
-                'files': [
-                    {
-                        'filename': f['filename'],
-                        'duration': f['duration'],
-                        'duration_minutes': f['duration'] / 60,
-                        'size_mb': f['size_mb']
-                    }
-                    for f in batch
-                ],
+                'num_files': len(batch_files),
+                'total_duration_seconds': total_duration,
+                'total_duration_minutes': total_duration / 60,
+                'link_mode': link_mode,
+                'files': batch_files,
                 'created_timestamp': datetime.now().isoformat()
             }
             
-            metadata_path = os.path.join(batch_path, 'batch_metadata.json')
             with open(metadata_path, 'w') as f:
                 json.dump(batch_metadata, f, indent=2)
             
             batch_folders.append(batch_path)
             
             duration_min = batch_duration / 60
-            print(f"  ✓ {batch_name}: {len(batch)} files, {duration_min:.2f} min total")
+            print(f"  ✓ {batch_name}: {len(batch)} files, {duration_min:.2f} min total {modes_used}")
         
         print(f"\n✅ Created {len(batch_folders)} batches")
         return batch_folders
@@ -304,7 +458,8 @@ class BatchOrganizer:
         self, 
         input_dir: str, 
         output_dir: str,
-        copy_files: bool = True
+        copy_files: bool = True,
+        index=None
     ) -> Dict:
         """
         Complete pipeline: convert, scan, batch, and organize
@@ -313,6 +468,8 @@ class BatchOrganizer:
             input_dir: Directory containing audio files to organize
             output_dir: Base directory for batch folders
             copy_files: If True, copy files; if False, move files
+            index: Optional ScanIndex; files already organized in an earlier
+                run are skipped
             
         Returns:
             Dictionary with organization results
@@ -322,7 +479,7 @@ class BatchOrganizer:
         print(f"{'='*60}")
         print(f"Input directory: {input_dir}")
         print(f"Output directory: {output_dir}")
-        print(f"Mode: {'COPY' if copy_files else 'MOVE'}")
+        print(f"Mode: {(self.link_mode or ('copy' if copy_files else 'move')).upper()}")
         
         # Step 0: Convert MP3 and other formats to WAV
         print(f"\n{'#'*60}")
@@ -336,18 +493,30 @@ class BatchOrganizer:
         )
         
         # Step 1: Scan files (now all should be WAV)
-        file_info = self.scan_audio_files(input_dir)
+        file_info = self.scan_audio_files(input_dir, index=index)
         
         if not file_info:
             print("❌ No audio files found!")
             return {'error': 'No audio files found', 'batches': []}
         
+        if index is not None:
+            # Only new/changed files, or files whose batch copy has disappeared
+            file_info = [
+                f for f in file_info
+                if f['status'] == 'pending' or not f['batch_path'] or not os.path.exists(f['batch_path'])
+            ]
+            print(f"Files to organize: {len(file_info)} (others already organized)")
+        
         # Step 2: Create batches
         batches = self.create_batches(file_info)
         print(f"\nCreated {len(batches)} batches")
         
         # Step 3: Organize into folders
-        batch_folders = self.organize_into_folders(batches, output_dir, copy_files)
+        batch_folders = self.organize_into_folders(
+            batches, output_dir, copy_files,
+            duration_ranges=(self.strategy == 'duration_ranges'),
+            index=index
+        )
         
         # Summary
         total_files = sum(len(batch) for batch in batches)
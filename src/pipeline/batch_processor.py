@@ -9,6 +9,7 @@ Key Features:
 - Speaker separation with gender classification
 - VRAM usage tracking and batch size adjustment
 - Progress tracking and error handling
+- Skips files already processed in earlier runs (optional ScanIndex)
 """
 
 import os
@@ -85,16 +86,18 @@ class IntegratedBatchProcessor:
     Processes batches of audio files with speaker diarization
     """
     
-    def __init__(self, diarizer, config: Dict):
+    def __init__(self, diarizer, config: Dict, index=None):
         """
         Initialize batch processor
         
         Args:
             diarizer: EnhancedSpeakerDiarizer instance
             config: Configuration dictionary
+            index: Optional ScanIndex used to skip and record processed files
         """
         self.diarizer = diarizer
         self.config = config
+        self.index = index
         self.gpu_monitor = GPUMonitor()
         
         # Batch processing config
@@ -141,6 +144,32 @@ class IntegratedBatchProcessor:
             print(f"  ❌ Error processing {audio_path}: {e}")
             return None
     
+    def get_batch_files(self, batch_folder: str) -> List[str]:
+        """
+        List the audio files of a batch
+        
+        Manifest batches (link_mode: manifest) contain no audio; their
+        files are read from the source paths in batch_metadata.json.
+        
+        Args:
+            batch_folder: Path to batch folder
+            
+        Returns:
+            List of audio file paths
+        """
+        metadata_path = os.path.join(batch_folder, 'batch_metadata.json')
+        if os.path.exists(metadata_path):
+            with open(metadata_path, 'r') as f:
+                batch_metadata = json.load(f)
+            if batch_metadata.get('link_mode') == 'manifest':
+                return [entry['source_path'] for entry in batch_metadata.get('files', [])]
+        
+        audio_files = []
+        for filename in os.listdir(batch_folder):
+            if filename.endswith(('.wav', '.mp3', '.flac', '.m4a')):
+                audio_files.append(os.path.join(batch_folder, filename))
+        return audio_files
+    
     def process_batch_folder(
         self, 
         batch_folder: str, 
@@ -162,10 +191,29 @@ class IntegratedBatchProcessor:
         print(f"{'='*60}")
         
         # Get audio files in batch
-        audio_files = []
-        for filename in os.listdir(batch_folder):
-            if filename.endswith(('.wav', '.mp3', '.flac', '.m4a')):
-                audio_files.append(os.path.join(batch_folder, filename))
+        audio_files = self.get_batch_files(batch_folder)
+        
+        # Skip files finished in an earlier run, and batch files the index
+        # no longer points at: the stale copy of an input that changed after
+        # it was organized (its new placement is processed instead)
+        skipped = 0
+        if self.index is not None:
+            pending = []
+            stale = 0
+            for audio_path in audio_files:
+                entry = self.index.get_by_batch_path(audio_path)
+                if entry is None:
+                    stale += 1
+                elif entry['status'] == 'done':
+                    skipped += 1
+                else:
+                    pending.append(audio_path)
+            audio_files = pending
+            if skipped:
+                print(f"Already processed (skipped): {skipped}")
+            if stale:
+                print(f"Not in the scan index (stale or organized without it, skipped): {stale}")
+            skipped += stale
         
         print(f"Files to process: {len(audio_files)}")
         
@@ -199,6 +247,9 @@ class IntegratedBatchProcessor:
                 successful += 1
             else:
                 failed += 1
+            
+            if self.index is not None:
+                self.index.mark_batch_file_status(audio_path, 'done' if result else 'failed')
         
         # Clear GPU cache after batch
         if self.clear_cache_between_batches:
@@ -212,6 +263,7 @@ class IntegratedBatchProcessor:
             'batch_folder': batch_folder,
             'output_dir': batch_output_dir,
             'total_files': len(audio_files),
+            'skipped': skipped,
             'successful': successful,
             'failed': failed,
             'processing_time_seconds': processing_time,
@@ -326,7 +378,8 @@ class IntegratedBatchProcessor:
         print(f"Successful: {total_successful} ({overall_result['success_rate']:.1f}%)")
         print(f"Failed: {total_failed}")
         print(f"Total time: {total_time/60:.2f} minutes")
-        print(f"Average per file: {total_time/total_files:.1f} seconds")
+        if total_files:
+            print(f"Average per file: {total_time/total_files:.1f} seconds")
         print(f"\nSummary saved: {summary_path}")
         
         return overall_result
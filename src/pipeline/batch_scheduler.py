@@ -0,0 +1,112 @@
+"""
+Batch Scheduler Module
+Bin-packs audio files into balanced batches
+
+Files are packed by total audio duration (best-fit decreasing), honoring
+the configured batch duration, files per batch and a per-batch memory
+estimate. Batches are returned longest first, so when batches run in
+parallel the long jobs start early and the makespan stays short.
+
+Key Features:
+- Best-fit decreasing packing on total duration (O(n log n))
+- Limits: batch_size_minutes, files_per_batch, max_batch_memory_mb
+- Files longer than a whole batch get a batch of their own
+- Longest-processing-time-first batch order
+"""
+
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional
+
+# Rough peak memory per second of audio while a file is processed
+# (16 kHz float32 waveform plus diarization/embedding intermediates)
+DEFAULT_MEMORY_MB_PER_SECOND = 0.5
+
+
+def estimate_memory_mb(duration: float,
+                       memory_mb_per_second: float = DEFAULT_MEMORY_MB_PER_SECOND) -> float:
+    """
+    Estimate peak processing memory for a file
+
+    Args:
+        duration: File duration in seconds
+        memory_mb_per_second: Memory per second of audio
+
+    Returns:
+        Estimated memory in MB
+    """
+    return duration * memory_mb_per_second
+
+
+def schedule_batches(
+    file_info: List[Dict],
+    batch_size_minutes: float = 2.0,
+    files_per_batch: int = 10,
+    max_batch_memory_mb: Optional[float] = None,
+    memory_mb_per_second: float = DEFAULT_MEMORY_MB_PER_SECOND
+) -> List[List[Dict]]:
+    """
+    Pack files into batches
+
+    Args:
+        file_info: File info dictionaries with a 'duration' key (seconds)
+        batch_size_minutes: Target maximum total audio per batch
+        files_per_batch: Maximum number of files per batch
+        max_batch_memory_mb: Optional memory budget per batch
+        memory_mb_per_second: Memory estimate per second of audio
+
+    Returns:
+        List of batches (lists of file info), longest total duration first
+    """
+    # Memory is estimated linearly in duration, so the memory budget is
+    # just a tighter duration capacity
+    capacity = batch_size_minutes * 60
+    if max_batch_memory_mb and memory_mb_per_second > 0:
+        capacity = min(capacity, max_batch_memory_mb / memory_mb_per_second)
+    files_per_batch = max(1, int(files_per_batch))
+
+    batches = []
+    totals = []
+    # Open batches as (remaining_seconds, batch_id), sorted by remaining capacity
+    open_batches = []
+
+    for file in sorted(file_info, key=lambda f: f['duration'], reverse=True):
+        duration = file['duration']
+
+        # Best fit: the open batch with the least room that still fits
+        pos = bisect_left(open_batches, (duration, -1))
+        if pos < len(open_batches):
+            remaining, batch_id = open_batches.pop(pos)
+            batches[batch_id].append(file)
+        else:
+            batch_id = len(batches)
+            remaining = capacity
+            batches.append([file])
+            totals.append(0.0)
+
+        remaining -= duration
+        totals[batch_id] += duration
+        if len(batches[batch_id]) < files_per_batch and remaining > 0:
+            insort(open_batches, (remaining, batch_id))
+
+    order = sorted(range(len(batches)), key=lambda i: totals[i], reverse=True)
+    return [batches[i] for i in order]
+
+
+def batch_estimates(batch: List[Dict],
+                    memory_mb_per_second: float = DEFAULT_MEMORY_MB_PER_SECOND) -> Dict:
+    """
+    Summary numbers for one batch
+
+    Args:
+        batch: List of file info dictionaries
+        memory_mb_per_second: Memory estimate per second of audio
+
+    Returns:
+        Dictionary with num_files, total_duration_seconds and estimated_memory_mb
+    """
+    total_duration = sum(f['duration'] for f in batch)
+    return {
+        'num_files': len(batch),
+        'total_duration_seconds': total_duration,
+        'estimated_memory_mb': estimate_memory_mb(total_duration, memory_mb_per_second)
+    }
@@ -26,6 +26,7 @@ from datetime import datetime
 from .batch_organizer import BatchOrganizer
 from ..diarization.enhanced_diarizer import EnhancedSpeakerDiarizer
 from .batch_processor import IntegratedBatchProcessor
+from .scan_index import ScanIndex
 
 
 class VoxentPipeline:
@@ -55,6 +56,7 @@ class VoxentPipeline:
         self.batch_organizer = None
         self.diarizer = None
         self.batch_processor = None
+        self.scan_index = None
         
         print("✅ Pipeline initialized successfully!\n")
     
@@ -118,6 +120,12 @@ class VoxentPipeline:
             Path(dir_path).mkdir(parents=True, exist_ok=True)
             print(f"  ✓ {dir_path}")
         
+        # Persistent scan index: re-runs only touch new or changed inputs
+        if self.config['batch_organization'].get('use_scan_index', True):
+            index_path = os.path.join(self.config['paths']['temp_dir'], 'scan_index.sqlite')
+            self.scan_index = ScanIndex(index_path)
+            print(f"  ✓ Scan index: {index_path} {self.scan_index.counts()}")
+        
         print()
     
     def step1_organize_batches(self):
@@ -129,7 +137,11 @@ class VoxentPipeline:
         # Initialize batch organizer
         batch_config = {
             'files_per_batch': self.config['batch_organization']['files_per_batch'],
-            'batch_size_minutes': self.config['batch_organization']['batch_size_minutes']
+            'batch_size_minutes': self.config['batch_organization']['batch_size_minutes'],
+            'scan_workers': self.config['batch_organization'].get('scan_workers'),
+            'link_mode': self.config['batch_organization'].get('link_mode'),
+            'strategy': self.config['batch_organization'].get('strategy', 'binpack'),
+            'max_batch_memory_mb': self.config['batch_organization'].get('max_batch_memory_mb')
         }
         
         self.batch_organizer = BatchOrganizer(batch_config)
@@ -138,7 +150,8 @@ class VoxentPipeline:
         result = self.batch_organizer.organize_directory(
             input_dir=self.config['paths']['input_calls'],
             output_dir=self.config['paths']['batches'],
-            copy_files=self.config['batch_organization']['copy_files']
+            copy_files=self.config['batch_organization']['copy_files'],
+            index=self.scan_index
         )
         
         print(f"\n✅ Step 1 complete: {result['num_batches']} batches created")
@@ -154,7 +167,10 @@ class VoxentPipeline:
         diarization_config = {
             'min_speakers': self.config['diarization']['min_speakers'],
             'max_speakers': self.config['diarization']['max_speakers'],
-            'hf_token': self.config['huggingface']['token']
+            'hf_token': self.config['huggingface']['token'],
+            'in_memory_segments': self.config['diarization'].get('in_memory_segments', True),
+            'speaker_level_gender': self.config['diarization'].get('speaker_level_gender', True),
+            'speaker_gender_max_seconds': self.config['diarization'].get('speaker_gender_max_seconds', 60.0)
         }
         
         # Initialize diarizer
@@ -182,7 +198,7 @@ class VoxentPipeline:
         }
         
         # Initialize batch processor
-        self.batch_processor = IntegratedBatchProcessor(self.diarizer, processor_config)
+        self.batch_processor = IntegratedBatchProcessor(self.diarizer, processor_config, index=self.scan_index)
         
         # Process all batches
         result = self.batch_processor.process_all_batches(
@@ -0,0 +1,203 @@
+"""
+Scan Index Module
+Persistent SQLite index of input files for incremental pipeline runs
+
+Every pipeline run used to rescan the whole input archive, recompute every
+duration and re-organize every file. The scan index remembers each input
+file (size, mtime, partial content hash) together with its probed duration,
+format, sample rate, batch location and processing status, so a re-run only
+probes, organizes and processes files that are new or changed.
+
+Key Features:
+- Unchanged files (same size + mtime) are not even opened
+- Touched-but-identical files are recognized by content hash
+- Status tracking: pending -> organized -> done / failed
+- Lives under paths.temp_dir, safe to delete (next run rebuilds it)
+"""
+
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Bytes hashed from the start and the end of each file
+HASH_CHUNK_BYTES = 1024 * 1024
+
+STATUS_PENDING = 'pending'
+STATUS_ORGANIZED = 'organized'
+STATUS_DONE = 'done'
+STATUS_FAILED = 'failed'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    content_hash TEXT NOT NULL,
+    duration REAL,
+    format TEXT,
+    sample_rate INTEGER,
+    status TEXT NOT NULL DEFAULT 'pending',
+    batch_path TEXT,
+    updated_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_files_batch_path ON files(batch_path);
+CREATE INDEX IF NOT EXISTS idx_files_status ON files(status);
+"""
+
+
+def partial_content_hash(path: str, size: int) -> str:
+    """
+    Hash of the file size plus its first and last HASH_CHUNK_BYTES
+
+    Reading whole multi-GB recordings would defeat the purpose; size plus
+    head and tail catches re-encodes, truncations and replacements.
+    """
+    digest = hashlib.blake2b(str(size).encode(), digest_size=16)
+    with open(path, 'rb') as f:
+        digest.update(f.read(HASH_CHUNK_BYTES))
+        if size > 2 * HASH_CHUNK_BYTES:
+            f.seek(-HASH_CHUNK_BYTES, os.SEEK_END)
+            digest.update(f.read(HASH_CHUNK_BYTES))
+    return digest.hexdigest()
+
+
+class ScanIndex:
+    """
+    SQLite-backed index of scanned input files
+    """
+
+    def __init__(self, db_path: str):
+        """
+        Open (or create) the index
+
+        Args:
+            db_path: SQLite database file, e.g. <temp_dir>/scan_index.sqlite
+        """
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
+
+    def get(self, path: str) -> Optional[Dict]:
+        """Indexed entry for path, or None"""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM files WHERE path = ?", (path,)).fetchone()
+        return dict(row) if row else None
+
+    def get_by_batch_path(self, batch_path: str) -> Optional[Dict]:
+        """Indexed entry whose organized copy/link lives at batch_path"""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM files WHERE batch_path = ?",
+                                     (os.path.abspath(batch_path),)).fetchone()
+        return dict(row) if row else None
+
+    def refresh(self, paths: List[str],
+                probe: Callable[[List[str]], List[Dict]]) -> Tuple[List[Dict], List[str]]:
+        """
+        Bring the index up to date for paths
+
+        Unchanged files are answered from the index. New or changed files
+        are probed (in one call, so probe can parallelize) and reset to
+        pending.
+
+        Args:
+            paths: Input file paths found by the scan
+            probe: Function taking a list of paths and returning probe
+                dictionaries with path, duration, format and sample_rate
+
+        Returns:
+            Tuple of (entries for all readable paths, paths that were new or changed)
+        """
+        entries = []
+        to_probe = {}
+
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entry = self.get(path)
+            if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+                entries.append(entry)
+                continue
+
+            content_hash = partial_content_hash(path, stat.st_size)
+            if entry and entry['size'] == stat.st_size and entry['content_hash'] == content_hash:
+                # Touched but identical: keep duration and status
+                self._update(path, mtime_ns=stat.st_mtime_ns)
+                entry['mtime_ns'] = stat.st_mtime_ns
+                entries.append(entry)
+                continue
+
+            to_probe[path] = (stat, content_hash)
+
+        now = time.time()
+        changed = []
+        rows = []
+        for info in probe(list(to_probe)):
+            stat, content_hash = to_probe[info['path']]
+            entry = {
+                'path': info['path'],
+                'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns,
+                'content_hash': content_hash,
+                'duration': info['duration'],
+                'format': info.get('format'),
+                'sample_rate': info.get('sample_rate'),
+                'status': STATUS_PENDING,
+                'batch_path': None,
+                'updated_at': now
+            }
+            rows.append(entry)
+            entries.append(entry)
+            changed.append(info['path'])
+
+        if rows:
+            with self._lock, self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO files (path, size, mtime_ns, content_hash, duration, format, "
+                    "sample_rate, status, batch_path, updated_at) VALUES (:path, :size, :mtime_ns, "
+                    ":content_hash, :duration, :format, :sample_rate, :status, :batch_path, :updated_at)",
+                    rows
+                )
+
+        return entries, changed
+
+    def _update(self, path: str, **fields):
+        fields['updated_at'] = time.time()
+        assignments = ", ".join(f"{key} = ?" for key in fields)
+        with self._lock, self._conn:
+            self._conn.execute(f"UPDATE files SET {assignments} WHERE path = ?",
+                               (*fields.values(), path))
+
+    def mark_organized(self, path: str, batch_path: str):
+        """Record where path was placed by batch organization"""
+        # Stored absolute so lookups match however the batch folder was named
+        self._update(path, status=STATUS_ORGANIZED, batch_path=os.path.abspath(batch_path))
+
+    def mark_status(self, path: str, status: str):
+        """Set the processing status of an indexed source path"""
+        self._update(path, status=status)
+
+    def mark_batch_file_status(self, batch_path: str, status: str):
+        """Set the processing status of the entry organized to batch_path"""
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE files SET status = ?, updated_at = ? WHERE batch_path = ?",
+                               (status, time.time(), os.path.abspath(batch_path)))
+
+    def counts(self) -> Dict[str, int]:
+        """Number of indexed files per status"""
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM files GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
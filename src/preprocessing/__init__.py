@@ -4,6 +4,7 @@ Handles audio loading, conversion, and preprocessing
 """
 
 from .audio_converter import AudioConverter
-from .audio_loader import load_audio
+from .audio_loader import load_audio, prefetch_audio
+from .segment_analysis import SegmentAnalysis
 
-__all__ = ['AudioConverter', 'load_audio']
+__all__ = ['AudioConverter', 'load_audio', 'prefetch_audio', 'SegmentAnalysis']
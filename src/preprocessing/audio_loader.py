@@ -1,5 +1,55 @@
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, Optional, Tuple
+
+import numpy as np
 import librosa
 
 def load_audio(path, sr):
     audio, _ = librosa.load(path, sr=sr, mono=True)
     return audio
+
+def prefetch_audio(items: Iterable, sr: int, prefetch: int = 8,
+                   max_workers: Optional[int] = None) -> Iterator[Tuple[int, object, Optional[np.ndarray], Optional[str]]]:
+    """
+    Decode audio files in a thread pool while the caller works on earlier ones.
+
+    Items may be paths or in-memory arrays (passed through as-is, assumed to
+    be mono at sr). At most `prefetch` items are decoded ahead of the
+    consumer, so an arbitrarily long iterable never sits in memory at once.
+
+    Yields:
+        (index, item, audio, error) in input order; audio is None and error
+        holds the message when decoding failed
+    """
+    max_workers = max_workers or min(8, os.cpu_count() or 1)
+    items = enumerate(items)
+    pending = deque()
+
+    def decode(item):
+        if isinstance(item, np.ndarray):
+            return item
+        return load_audio(str(item), sr)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        def fill():
+            while len(pending) < max(1, prefetch):
+                try:
+                    index, item = next(items)
+                except StopIteration:
+                    return
+                pending.append((index, item, executor.submit(decode, item)))
+
+        try:
+            fill()
+            while pending:
+                index, item, future = pending.popleft()
+                fill()
+                try:
+                    yield index, item, future.result(), None
+                except Exception as e:
+                    yield index, item, None, str(e)
+        finally:
+            for _, _, future in pending:
+                future.cancel()
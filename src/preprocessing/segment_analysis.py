@@ -0,0 +1,236 @@
+"""
+Segment Analysis Module
+Shared, lazily computed spectral features for a single audio segment
+
+Several stages look at the same segment: the ML classifier, the advanced
+multi-feature classifier, the pitch estimator and the quality metrics.
+Each used to run its own STFT/piptrack/MFCC pass. A SegmentAnalysis is
+created once per segment and handed to every stage, so each representation
+is computed at most once.
+
+Key Features:
+- STFT, magnitude and power spectrogram computed on first use
+- piptrack / MFCC / RMS / mel / pitch track results memoized per parameter set
+- Results identical to the direct librosa calls they replace
+- SegmentAnalysis.batch: one STFT (and one pass of each framewise
+  feature) for many segments at once
+"""
+
+from functools import cached_property
+from typing import List, Tuple
+
+import numpy as np
+import librosa
+
+from preprocessing.pitch_tracker import PitchTrack, track_pitch
+
+
+class SegmentAnalysis:
+    """
+    Lazy, memoized feature container for one audio segment
+    """
+
+    def __init__(self, audio: np.ndarray, sr: int,
+                 n_fft: int = 2048, hop_length: int = 512):
+        """
+        Initialize segment analysis
+
+        Args:
+            audio: Mono audio time series
+            sr: Sample rate of audio
+            n_fft: FFT size shared by all spectral features
+            hop_length: Hop length shared by all spectral features
+        """
+        self.audio = np.asarray(audio)
+        self.sr = sr
+        self.n_fft = n_fft
+        self.hop_length = hop_length
+        self._cache = {}
+
+    @classmethod
+    def ensure(cls, analysis, audio: np.ndarray, sr: int) -> "SegmentAnalysis":
+        """
+        Return analysis if it matches audio/sr, otherwise build a new one
+
+        Args:
+            analysis: Existing SegmentAnalysis or None
+            audio: Audio the caller is about to analyze
+            sr: Sample rate the caller expects
+
+        Returns:
+            SegmentAnalysis usable for audio at sr
+        """
+        if analysis is not None and analysis.sr == sr and analysis.audio is audio:
+            return analysis
+        return cls(audio, sr)
+
+    @classmethod
+    def batch(cls, audios: List[np.ndarray], sr: int,
+              n_fft: int = 2048, hop_length: int = 512) -> List["SegmentAnalysis"]:
+        """
+        Build analyses for many segments with one vectorized pass
+
+        Segments are laid out in one signal, each starting on a hop boundary
+        and separated by at least n_fft // 2 zeros. With centered,
+        zero-padded frames this makes every frame of the joint STFT equal to
+        the corresponding frame of the segment's own STFT. The STFT and the
+        framewise features (piptrack, mel, centroid, bandwidth) are computed
+        once for the joint signal and sliced per segment; features with
+        whole-segment normalization (MFCC dB scaling, chroma tuning) are
+        still computed per segment from the sliced spectrogram.
+
+        Args:
+            audios: Mono audio segments
+            sr: Sample rate shared by all segments
+            n_fft: FFT size shared by all spectral features
+            hop_length: Hop length shared by all spectral features
+
+        Returns:
+            One SegmentAnalysis per segment, in input order
+        """
+        analyses = [cls(audio, sr, n_fft, hop_length) for audio in audios]
+        if not analyses:
+            return analyses
+
+        # Frame offsets of each segment inside the joint signal
+        gap = n_fft // 2
+        offsets = []
+        position = 0
+        for analysis in analyses:
+            offsets.append(position // hop_length)
+            end = position + len(analysis.audio) + gap
+            position = -(-end // hop_length) * hop_length  # round up to a hop boundary
+
+        joint = np.zeros(position, dtype=np.result_type(*[a.audio.dtype for a in analyses], np.float32))
+        for analysis, frame in zip(analyses, offsets):
+            start = frame * hop_length
+            joint[start:start + len(analysis.audio)] = analysis.audio
+
+        shared = cls(joint, sr, n_fft, hop_length)
+        pitches, magnitudes = shared.piptrack()
+        framewise = {
+            ('mel', 128): shared.melspectrogram(),
+            ('centroid',): shared.spectral_centroid(),
+            ('bandwidth',): shared.spectral_bandwidth(),
+        }
+
+        for analysis, frame in zip(analyses, offsets):
+            frames = slice(frame, frame + 1 + len(analysis.audio) // hop_length)
+            # Pre-fill the cached properties and memoized default-parameter results
+            analysis.__dict__['stft'] = shared.stft[:, frames]
+            analysis.__dict__['magnitude'] = shared.magnitude[:, frames]
+            analysis.__dict__['power'] = shared.power[:, frames]
+            analysis._cache[('piptrack', 150.0, 4000.0, 0.1)] = (pitches[:, frames], magnitudes[:, frames])
+            for key, value in framewise.items():
+                analysis._cache[key] = value[:, frames]
+
+        return analyses
+
+    def _memo(self, key, compute):
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
+
+    @property
+    def duration(self) -> float:
+        """Segment duration in seconds"""
+        return len(self.audio) / self.sr if self.sr else 0.0
+
+    @cached_property
+    def stft(self) -> np.ndarray:
+        """Complex STFT matrix"""
+        return librosa.stft(self.audio, n_fft=self.n_fft, hop_length=self.hop_length)
+
+    @cached_property
+    def magnitude(self) -> np.ndarray:
+        """Magnitude spectrogram |STFT|"""
+        return np.abs(self.stft)
+
+    @cached_property
+    def power(self) -> np.ndarray:
+        """Power spectrogram |STFT|^2"""
+        return self.magnitude ** 2
+
+    def piptrack(self, fmin: float = 150.0, fmax: float = 4000.0,
+                 threshold: float = 0.1) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Pitch tracking on the shared magnitude spectrogram
+
+        Returns:
+            Tuple of (pitches, magnitudes) as returned by librosa.piptrack
+        """
+        return self._memo(
+            ('piptrack', fmin, fmax, threshold),
+            lambda: librosa.piptrack(S=self.magnitude, sr=self.sr, n_fft=self.n_fft,
+                                     hop_length=self.hop_length, fmin=fmin,
+                                     fmax=fmax, threshold=threshold)
+        )
+
+    def pitch_track(self, fmin: float = 50.0, fmax: float = 400.0) -> PitchTrack:
+        """Framewise F0 / voicing / HNR (see preprocessing.pitch_tracker)"""
+        return self._memo(
+            ('pitch_track', fmin, fmax),
+            lambda: track_pitch(self.audio, self.sr, fmin=fmin, fmax=fmax)
+        )
+
+    def melspectrogram(self, n_mels: int = 128) -> np.ndarray:
+        """Mel power spectrogram derived from the shared STFT"""
+        return self._memo(
+            ('mel', n_mels),
+            lambda: librosa.feature.melspectrogram(S=self.power, sr=self.sr,
+                                                   n_fft=self.n_fft, n_mels=n_mels)
+        )
+
+    def mfcc(self, n_mfcc: int = 13) -> np.ndarray:
+        """MFCCs derived from the shared mel spectrogram"""
+        return self._memo(
+            ('mfcc', n_mfcc),
+            lambda: librosa.feature.mfcc(S=librosa.power_to_db(self.melspectrogram()),
+                                         sr=self.sr, n_mfcc=n_mfcc)
+        )
+
+    def rms(self, frame_length: int = 2048, hop_length: int = 512) -> np.ndarray:
+        """Frame RMS energy (time domain)"""
+        return self._memo(
+            ('rms', frame_length, hop_length),
+            lambda: librosa.feature.rms(y=self.audio, frame_length=frame_length,
+                                        hop_length=hop_length)
+        )
+
+    def zero_crossing_rate(self) -> np.ndarray:
+        """Frame zero crossing rate"""
+        return self._memo(
+            ('zcr',),
+            lambda: librosa.feature.zero_crossing_rate(self.audio)
+        )
+
+    def chroma(self) -> np.ndarray:
+        """Chromagram derived from the shared power spectrogram"""
+        return self._memo(
+            ('chroma',),
+            lambda: librosa.feature.chroma_stft(S=self.power, sr=self.sr, n_fft=self.n_fft)
+        )
+
+    def spectral_centroid(self) -> np.ndarray:
+        """Spectral centroid per frame"""
+        return self._memo(
+            ('centroid',),
+            lambda: librosa.feature.spectral_centroid(S=self.magnitude, sr=self.sr,
+                                                      n_fft=self.n_fft)
+        )
+
+    def spectral_bandwidth(self) -> np.ndarray:
+        """Spectral bandwidth per frame"""
+        return self._memo(
+            ('bandwidth',),
+            lambda: librosa.feature.spectral_bandwidth(S=self.magnitude, sr=self.sr,
+                                                       n_fft=self.n_fft)
+        )
+
+    def spectral_rolloff(self) -> np.ndarray:
+        """Spectral rolloff per frame"""
+        return self._memo(
+            ('rolloff',),
+            lambda: librosa.feature.spectral_rolloff(S=self.magnitude, sr=self.sr,
+                                                     n_fft=self.n_fft)
+        )
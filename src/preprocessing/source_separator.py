@@ -2,20 +2,45 @@
 Source separation module using Demucs.
 Separates vocals from accompaniment in audio files.
 This enables gender classification on pure vocal tracks.
+
+Long recordings can be separated with separate_file_streaming, which reads
+the file in overlapping windows, cross-fades the chunk outputs and writes
+vocals/accompaniment to disk as it goes, so peak memory does not grow with
+the file length.
 """
 
 import os
+from math import gcd
 import numpy as np
+import soundfile as sf
 import torch
 import torchaudio
 import logging
+from scipy.signal import resample_poly
 from demucs.pretrained import get_model
 from demucs.apply import apply_model
-from demucs.audio import convert_audio
 
 logger = logging.getLogger(__name__)
 
 
+def resample_audio(audio: np.ndarray, orig_sr: int, target_sr: int) -> np.ndarray:
+    """
+    Polyphase resampling along the last axis.
+
+    Args:
+        audio: Audio array (samples or channels x samples)
+        orig_sr: Sample rate of audio
+        target_sr: Desired sample rate
+
+    Returns:
+        Resampled float32 audio
+    """
+    if orig_sr == target_sr:
+        return audio.astype(np.float32, copy=False)
+    g = gcd(int(orig_sr), int(target_sr))
+    return resample_poly(audio, target_sr // g, orig_sr // g, axis=-1).astype(np.float32)
+
+
 class VocalSeparator:
     """Separates vocals from accompaniment using Demucs."""
     
@@ -55,64 +80,10 @@ class VocalSeparator:
             - 'confidence': separation confidence score
         """
         try:
-            # Convert to torch tensor
-            if audio.ndim == 1:
-                # Mono to stereo
-                audio_tensor = torch.from_numpy(audio).float().unsqueeze(0)
-                audio_tensor = audio_tensor.repeat(2, 1)
-            else:
-                audio_tensor = torch.from_numpy(audio).float()
-            
-            # Ensure correct format for Demucs (channels x samples)
-            if audio_tensor.shape[0] != 2:
-                # If not stereo, convert
-                if audio_tensor.shape[0] > 2:
-                    audio_tensor = audio_tensor[:2]
-                else:
-                    audio_tensor = audio_tensor.repeat(2, 1)
-            
-            # Convert sample rate if needed (Demucs expects 44100 Hz)
-            model_sr = 44100  # Demucs fixed sample rate
-            if sample_rate != model_sr:
-                audio_tensor = convert_audio(audio_tensor, sample_rate, model_sr, channels_first=True)
-                sr = model_sr
-            else:
-                sr = sample_rate
-            
-            # Move to device
-            audio_tensor = audio_tensor.to(self.device)
-            
-            # Apply separation model
-            logger.debug(f"Separating vocals from {audio_tensor.shape} tensor...")
-            with torch.no_grad():
-                sources = apply_model(self.model, audio_tensor, device=self.device, progress=False)
-            
-            # Extract vocals and accompaniment
-            # Demucs returns: [drums, bass, other, vocals]
-            vocals = sources[-1]  # Last source is vocals
-            accompaniment = sources[:-1].sum(dim=0)  # Sum other sources
-            
-            # Convert back to numpy (take first channel for mono)
-            vocals_np = vocals[0].cpu().numpy() if vocals.shape[0] > 1 else vocals.cpu().numpy()
-            accomp_np = accompaniment[0].cpu().numpy() if accompaniment.shape[0] > 1 else accompaniment.cpu().numpy()
-            
-            # Convert back to original sample rate if needed
-            if sr != sample_rate:
-                # Simple resampling using linear interpolation
-                factor = sample_rate / sr
-                original_len = int(len(audio) * factor / len(vocals_np))
-                
-                vocals_np = np.interp(
-                    np.linspace(0, len(vocals_np) - 1, int(len(vocals_np) * factor))[:len(audio)],
-                    np.arange(len(vocals_np)),
-                    vocals_np
-                )[:len(audio)]
-                
-                accomp_np = np.interp(
-                    np.linspace(0, len(accomp_np) - 1, int(len(accomp_np) * factor))[:len(audio)],
-                    np.arange(len(accomp_np)),
-                    accomp_np
-                )[:len(audio)]
+            # Separate at the model rate, then return to the input rate
+            vocals_np, accomp_np = self._separate_chunk(audio, sample_rate)
+            vocals_np = resample_audio(vocals_np, self.sample_rate, sample_rate)
+            accomp_np = resample_audio(accomp_np, self.sample_rate, sample_rate)
             
             # Ensure same length as input
             if len(vocals_np) != len(audio):
@@ -151,6 +122,139 @@ class VocalSeparator:
                 "accompaniment": np.zeros_like(audio),
                 "confidence": 0.0
             }
+    
+    def _separate_chunk(self, audio: np.ndarray, sample_rate: int) -> tuple:
+        """
+        Run Demucs on one block of audio.
+        
+        Args:
+            audio: Audio block (mono samples, or channels x samples)
+            sample_rate: Sample rate of audio
+        
+        Returns:
+            Tuple of (vocals, accompaniment) mono arrays at the model sample rate
+        """
+        # Demucs expects 2 x samples at 44.1 kHz
+        if audio.ndim == 1:
+            audio = np.stack([audio, audio])
+        else:
+            if audio.shape[0] == 1:
+                audio = np.repeat(audio, 2, axis=0)
+            elif audio.shape[0] > 2:
+                audio = audio[:2]
+        audio = resample_audio(audio, sample_rate, self.sample_rate)
+        
+        audio_tensor = torch.from_numpy(np.ascontiguousarray(audio)).to(self.device)
+        logger.debug(f"Separating vocals from {tuple(audio_tensor.shape)} tensor...")
+        with torch.no_grad():
+            sources = apply_model(self.model, audio_tensor[None], device=self.device, progress=False)[0]
+        
+        # Demucs returns: [drums, bass, other, vocals]; keep the first channel
+        vocals = sources[-1, 0].cpu().numpy()
+        accompaniment = sources[:-1, 0].sum(dim=0).cpu().numpy()
+        return vocals, accompaniment
+    
+    def separate_file_streaming(self, file_path: str, vocals_path: str, accompaniment_path: str,
+                                output_sr: int = 16000, chunk_seconds: float = 30.0,
+                                overlap_seconds: float = 2.0) -> dict:
+        """
+        Separate a long file chunk by chunk, writing both stems to disk.
+        
+        The source is read in windows of chunk_seconds + overlap_seconds.
+        Neighbouring chunk outputs are linearly cross-faded over the overlap,
+        and each finished part is appended to the output files, so only one
+        window is held in memory at a time.
+        
+        Stems are written as mono float WAV at output_sr. Unlike
+        separate_vocals, no whole-file peak normalization is applied (float
+        WAV does not clip).
+        
+        Args:
+            file_path: Path to the input audio file (any soundfile format)
+            vocals_path: Output path for the vocal stem
+            accompaniment_path: Output path for the accompaniment stem
+            output_sr: Sample rate of the written stems
+            chunk_seconds: Hop between chunk starts
+            overlap_seconds: Overlap cross-faded between chunks
+        
+        Returns:
+            Dictionary with 'vocals_path', 'accompaniment_path',
+            'confidence', 'duration' and the mean power of each stem
+            ('vocals_power', 'accompaniment_power')
+        """
+        vocal_energy = 0.0
+        accomp_energy = 0.0
+        written = 0
+        
+        with sf.SoundFile(file_path) as src:
+            src_sr = src.samplerate
+            total = src.frames
+            hop = max(1, int(chunk_seconds * src_sr))
+            overlap = int(overlap_seconds * src_sr)
+            ratio = output_sr / src_sr
+            fade_len = int(round(overlap * ratio))
+            fade_in = np.linspace(0.0, 1.0, fade_len, dtype=np.float32)
+            fade_out = 1.0 - fade_in
+            carry = None
+            
+            with sf.SoundFile(vocals_path, "w", samplerate=output_sr, channels=1, subtype="FLOAT") as vocal_out, \
+                 sf.SoundFile(accompaniment_path, "w", samplerate=output_sr, channels=1, subtype="FLOAT") as accomp_out:
+                
+                for start in range(0, total, hop):
+                    src.seek(start)
+                    block = src.read(min(hop + overlap, total - start), dtype="float32", always_2d=True)
+                    # The block reaching the end of the input is the last one, even
+                    # if a remainder shorter than the overlap follows its hop
+                    is_last = start + len(block) >= total
+                    
+                    vocals, accomp = self._separate_chunk(block.T, src_sr)
+                    
+                    # Back to the output rate, aligned to absolute sample positions
+                    out_start = int(round(start * ratio))
+                    out_len = int(round((start + len(block)) * ratio)) - out_start
+                    stems = [self._fit_length(resample_audio(x, self.sample_rate, output_sr), out_len)
+                             for x in (vocals, accomp)]
+                    
+                    # Cross-fade the head with the tail carried over from the previous chunk
+                    if carry is not None:
+                        for stem, tail in zip(stems, carry):
+                            n = min(fade_len, out_len, len(tail))
+                            stem[:n] = tail[:n] * fade_out[:n] + stem[:n] * fade_in[:n]
+                    
+                    # Write up to where the next chunk starts (absolute positions, so
+                    # rounding never leaves a gap); the rest is cross-faded with it
+                    keep = out_len if is_last else min(out_len, int(round((start + hop) * ratio)) - out_start)
+                    carry = [stem[keep:] for stem in stems]
+                    
+                    vocal_out.write(stems[0][:keep])
+                    accomp_out.write(stems[1][:keep])
+                    vocal_energy += float(np.sum(stems[0][:keep] ** 2))
+                    accomp_energy += float(np.sum(stems[1][:keep] ** 2))
+                    written += keep
+                    
+                    logger.debug(f"Separated {min(start + hop, total) / src_sr:.0f}s / {total / src_sr:.0f}s")
+                    if is_last:
+                        break
+        
+        total_energy = vocal_energy + accomp_energy
+        confidence = (vocal_energy / total_energy) if total_energy > 0 else 0.5
+        logger.info(f"Streaming vocal separation complete - vocal confidence: {confidence:.2%}")
+        
+        return {
+            "vocals_path": vocals_path,
+            "accompaniment_path": accompaniment_path,
+            "confidence": confidence,
+            "duration": total / src_sr,
+            "vocals_power": vocal_energy / written if written else 0.0,
+            "accompaniment_power": accomp_energy / written if written else 0.0
+        }
+    
+    @staticmethod
+    def _fit_length(audio: np.ndarray, length: int) -> np.ndarray:
+        """Trim or zero-pad audio to exactly length samples."""
+        if len(audio) >= length:
+            return audio[:length].copy()
+        return np.pad(audio, (0, length - len(audio)))
 
 
 def separate_vocals_from_file(file_path: str, sample_rate: int = 16000, model_name: str = "htdemucs") -> dict:
@@ -0,0 +1,380 @@
+"""
+Streaming Decoder Module
+Decode and resample audio while its bytes are still arriving
+
+Uploads used to be written to disk in full and then decoded (and resampled)
+by librosa.load when processing started. A StreamingDecoder takes the raw
+bytes chunk by chunk, decodes them to mono float32, resamples to the
+pipeline rate on the fly and writes a normalized WAV. Processing then reads
+a WAV that is already at the target rate, so the original upload is decoded
+exactly once and never has to be kept.
+
+Key Features:
+- WAV (PCM 8/16/24/32-bit, float, WAVE_FORMAT_EXTENSIBLE): parsed
+  incrementally in pure Python, resampled with a soxr stream
+- Other formats through an ffmpeg pipe when ffmpeg is installed
+- Fallback: spool the upload, decode once with librosa
+- Optional on_audio(chunk) callback receiving the resampled audio
+"""
+
+import os
+import shutil
+import struct
+import logging
+import tempfile
+import threading
+import subprocess
+from typing import Callable, Dict, Optional
+
+import numpy as np
+import soundfile as sf
+
+try:
+    import soxr
+    SOXR_AVAILABLE = hasattr(soxr, 'ResampleStream')
+except ImportError:
+    SOXR_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+FFMPEG_PATH = shutil.which('ffmpeg')
+
+_WAVE_FORMAT_PCM = 0x0001
+_WAVE_FORMAT_IEEE_FLOAT = 0x0003
+_WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+class StreamDecodeError(Exception):
+    """Raised when an upload cannot be decoded"""
+
+
+class _Resampler:
+    """Mono float32 resampling across chunk boundaries"""
+
+    def __init__(self, in_rate: int, out_rate: int):
+        self.in_rate = in_rate
+        self.out_rate = out_rate
+        self._stream = None
+        self._pending = []
+        if in_rate != out_rate and SOXR_AVAILABLE:
+            self._stream = soxr.ResampleStream(in_rate, out_rate, 1, dtype='float32')
+
+    def process(self, audio: np.ndarray, last: bool = False) -> np.ndarray:
+        if self.in_rate == self.out_rate:
+            return audio
+        if self._stream is not None:
+            return self._stream.resample_chunk(audio, last=last)
+        # Without soxr streaming: collect and resample once at the end
+        self._pending.append(audio)
+        if not last:
+            return np.zeros(0, dtype=np.float32)
+        import librosa
+        joined = np.concatenate(self._pending) if self._pending else np.zeros(0, dtype=np.float32)
+        return librosa.resample(joined, orig_sr=self.in_rate, target_sr=self.out_rate).astype(np.float32)
+
+
+class StreamingDecoder:
+    """
+    Incremental decoder writing a mono WAV at target_sr
+    """
+
+    def __init__(self, output_path: str, target_sr: int = 16000, filename: Optional[str] = None,
+                 on_audio: Optional[Callable[[np.ndarray], None]] = None):
+        """
+        Initialize decoder
+
+        Args:
+            output_path: Path of the normalized WAV to write
+            target_sr: Output sample rate
+            filename: Original upload name (its extension picks the decoder)
+            on_audio: Optional callback receiving each resampled mono chunk
+        """
+        self.output_path = output_path
+        self.target_sr = target_sr
+        self.on_audio = on_audio
+        self.bytes_received = 0
+        self.frames_written = 0
+        self.source_sample_rate = None
+
+        extension = os.path.splitext(filename or output_path)[1].lower()
+        if extension == '.wav':
+            self.method = 'wav'
+        elif FFMPEG_PATH:
+            self.method = 'ffmpeg'
+        else:
+            self.method = 'spool'
+
+        self._writer = None
+        self._closed = False
+
+        # WAV state
+        self._buffer = bytearray()
+        self._header_done = False
+        self._format = None
+        self._remaining = None
+        self._resampler = None
+
+        # ffmpeg state
+        self._process = None
+        self._reader = None
+        self._reader_error = None
+
+        # spool state
+        self._spool = None
+
+        if self.method == 'ffmpeg':
+            self._start_ffmpeg()
+        elif self.method == 'spool':
+            self._start_spool()
+
+    # -- output -----------------------------------------------------------
+
+    def _emit(self, audio: np.ndarray):
+        if not len(audio):
+            return
+        if self._writer is None:
+            self._writer = sf.SoundFile(self.output_path, mode='w', samplerate=self.target_sr,
+                                        channels=1, subtype='PCM_16', format='WAV')
+        self._writer.write(audio)
+        self.frames_written += len(audio)
+        if self.on_audio is not None:
+            self.on_audio(audio)
+
+    # -- public API -------------------------------------------------------
+
+    def write(self, data: bytes):
+        """Feed the next chunk of the upload"""
+        if self._closed:
+            raise StreamDecodeError("Decoder is closed")
+        if not data:
+            return
+        self.bytes_received += len(data)
+
+        if self.method == 'wav':
+            self._write_wav(data)
+        elif self.method == 'ffmpeg':
+            try:
+                self._process.stdin.write(data)
+            except BrokenPipeError:
+                raise StreamDecodeError(self._ffmpeg_error() or "ffmpeg stopped reading")
+        else:
+            self._spool.write(data)
+
+    def close(self) -> Dict:
+        """
+        Finish decoding and close the output file
+
+        Returns:
+            Dictionary with path, duration, sample_rate, source_sample_rate,
+            bytes_received and the decoding method
+        """
+        if self._closed:
+            return self.info()
+        self._closed = True
+        try:
+            if self.method == 'wav':
+                self._finish_wav()
+            elif self.method == 'ffmpeg':
+                self._finish_ffmpeg()
+            else:
+                self._finish_spool()
+        except Exception:
+            self.abort()
+            raise
+        finally:
+            if self._writer is not None:
+                self._writer.close()
+
+        if self.frames_written == 0:
+            self.abort()
+            raise StreamDecodeError("No audio decoded")
+        return self.info()
+
+    def abort(self):
+        """Stop decoding and delete partial output"""
+        self._closed = True
+        if self._process is not None and self._process.poll() is None:
+            self._process.kill()
+        if self._spool is not None:
+            self._spool.close()
+            if os.path.exists(self._spool.name):
+                os.remove(self._spool.name)
+        if self._writer is not None and not self._writer.closed:
+            self._writer.close()
+        if os.path.exists(self.output_path):
+            os.remove(self.output_path)
+
+    def info(self) -> Dict:
+        return {
+            'path': self.output_path,
+            'duration': self.frames_written / self.target_sr,
+            'sample_rate': self.target_sr,
+            'source_sample_rate': self.source_sample_rate,
+            'bytes_received': self.bytes_received,
+            'method': self.method
+        }
+
+    # -- WAV --------------------------------------------------------------
+
+    def _write_wav(self, data: bytes):
+        self._buffer += data
+        if not self._header_done:
+            if not self._parse_wav_header():
+                return
+        self._decode_wav_buffer(last=False)
+
+    def _parse_wav_header(self) -> bool:
+        buffer = self._buffer
+        if len(buffer) < 12:
+            return False
+        if buffer[:4] not in (b'RIFF', b'RF64') or buffer[8:12] != b'WAVE':
+            raise StreamDecodeError("Not a RIFF/WAVE file")
+
+        position = 12
+        while True:
+            if len(buffer) < position + 8:
+                return False
+            chunk_id = bytes(buffer[position:position + 4])
+            chunk_size = struct.unpack('<I', buffer[position + 4:position + 8])[0]
+            body = position + 8
+
+            if chunk_id == b'data':
+                if self._format is None:
+                    raise StreamDecodeError("WAV data chunk before fmt chunk")
+                # Streamed WAVs often carry 0 or 0xFFFFFFFF as size: read to the end
+                self._remaining = None if chunk_size in (0, 0xFFFFFFFF) else chunk_size
+                del buffer[:body]
+                self._header_done = True
+                return True
+
+            if len(buffer) < body + chunk_size:
+                return False
+            if chunk_id == b'fmt ':
+                self._format = self._parse_fmt(bytes(buffer[body:body + chunk_size]))
+            position = body + chunk_size + (chunk_size & 1)
+
+    def _parse_fmt(self, fmt: bytes) -> Dict:
+        tag, channels, rate, _, block_align, bits = struct.unpack('<HHIIHH', fmt[:16])
+        if tag == _WAVE_FORMAT_EXTENSIBLE and len(fmt) >= 26:
+            tag = struct.unpack('<H', fmt[24:26])[0]
+        if tag == _WAVE_FORMAT_PCM and bits in (8, 16, 24, 32):
+            kind = 'pcm'
+        elif tag == _WAVE_FORMAT_IEEE_FLOAT and bits in (32, 64):
+            kind = 'float'
+        else:
+            raise StreamDecodeError(f"Unsupported WAV encoding (format {tag:#x}, {bits} bits)")
+
+        self.source_sample_rate = rate
+        self._resampler = _Resampler(rate, self.target_sr)
+        return {'kind': kind, 'channels': channels, 'bits': bits, 'block_align': block_align}
+
+    def _decode_wav_buffer(self, last: bool):
+        fmt = self._format
+        available = len(self._buffer)
+        if self._remaining is not None:
+            available = min(available, self._remaining)
+        usable = available - available % fmt['block_align']
+
+        if usable:
+            raw = bytes(self._buffer[:usable])
+            del self._buffer[:usable]
+            if self._remaining is not None:
+                self._remaining -= usable
+            audio = self._pcm_to_float(raw)
+        else:
+            audio = np.zeros(0, dtype=np.float32)
+
+        if usable or last:
+            self._emit(self._resampler.process(audio, last=last))
+
+    def _pcm_to_float(self, raw: bytes) -> np.ndarray:
+        fmt = self._format
+        bits, channels = fmt['bits'], fmt['channels']
+        if fmt['kind'] == 'float':
+            samples = np.frombuffer(raw, dtype='<f4' if bits == 32 else '<f8').astype(np.float32)
+        elif bits == 8:
+            samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+        elif bits == 16:
+            samples = np.frombuffer(raw, dtype='<i2').astype(np.float32) / 32768.0
+        elif bits == 24:
+            b = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+            values = b[:, 0] | (b[:, 1] << 8) | (b[:, 2] << 16)
+            values = np.where(values >= 1 << 23, values - (1 << 24), values)
+            samples = values.astype(np.float32) / float(1 << 23)
+        else:
+            samples = np.frombuffer(raw, dtype='<i4').astype(np.float32) / 2147483648.0
+
+        if channels > 1:
+            samples = samples.reshape(-1, channels).mean(axis=1)
+        return np.ascontiguousarray(samples, dtype=np.float32)
+
+    def _finish_wav(self):
+        if not self._header_done:
+            raise StreamDecodeError("Incomplete WAV header")
+        self._decode_wav_buffer(last=True)
+
+    # -- ffmpeg -----------------------------------------------------------
+
+    def _start_ffmpeg(self):
+        self._process = subprocess.Popen(
+            [FFMPEG_PATH, '-hide_banner', '-loglevel', 'error', '-i', 'pipe:0',
+             '-f', 'f32le', '-ac', '1', '-ar', str(self.target_sr), 'pipe:1'],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+        )
+        # Output is drained concurrently, otherwise ffmpeg blocks on a full pipe
+        self._reader = threading.Thread(target=self._read_ffmpeg, daemon=True)
+        self._reader.start()
+
+    def _read_ffmpeg(self):
+        leftover = b''
+        try:
+            while True:
+                data = self._process.stdout.read(64 * 1024)
+                if not data:
+                    break
+                data = leftover + data
+                usable = len(data) - len(data) % 4
+                leftover = data[usable:]
+                self._emit(np.frombuffer(data[:usable], dtype='<f4').copy())
+        except Exception as e:
+            self._reader_error = e
+
+    def _ffmpeg_error(self) -> str:
+        try:
+            return self._process.stderr.read().decode(errors='replace').strip()
+        except Exception:
+            return ''
+
+    def _finish_ffmpeg(self):
+        try:
+            self._process.stdin.close()
+        except BrokenPipeError:
+            pass
+        self._reader.join()
+        return_code = self._process.wait()
+        if self._reader_error is not None:
+            raise StreamDecodeError(str(self._reader_error))
+        if return_code != 0:
+            raise StreamDecodeError(self._ffmpeg_error() or f"ffmpeg exited with {return_code}")
+
+    # -- spool fallback ---------------------------------------------------
+
+    def _start_spool(self):
+        suffix = os.path.splitext(self.output_path)[1] + '.upload'
+        self._spool = tempfile.NamedTemporaryFile(
+            dir=os.path.dirname(self.output_path) or '.', suffix=suffix, delete=False
+        )
+
+    def _finish_spool(self):
+        import librosa
+
+        self._spool.close()
+        try:
+            # The one decode of the upload (librosa/audioread handle the formats
+            # libsndfile does not)
+            audio, _ = librosa.load(self._spool.name, sr=self.target_sr, mono=True)
+        except Exception as e:
+            raise StreamDecodeError(f"Could not decode upload: {e}")
+        finally:
+            os.remove(self._spool.name)
+        self._emit(audio.astype(np.float32))
@@ -29,9 +29,21 @@ try:
 except ImportError:
     TORCH_AVAILABLE = False
 
+from utils.model_registry import get_model, model_lock
+
 logger = logging.getLogger(__name__)
 
 
+def load_silero_model(device: str = 'cpu'):
+    """Load Silero VAD from torch.hub (registry factory; use get_model('silero_vad', ...))"""
+    model, utils = torch.hub.load(
+        repo_or_dir='snakers4/silero-vad',
+        model='silero_vad',
+        force_reload=False
+    )
+    return model.to(device).eval()
+
+
 class SileroVAD:
     """
     Silero VAD for speech detection
@@ -58,13 +70,8 @@ class SileroVAD:
     def _load_model(self):
         """Load Silero VAD model"""
         try:
-            # Load model from HuggingFace
-            model, utils = torch.hub.load(
-                repo_or_dir='snakers4/silero-vad',
-                model='silero_vad',
-                force_reload=False
-            )
-            self.model = model.to(self.device).eval()
+            # Loaded once per process and shared by every SileroVAD instance
+            self.model = get_model('silero_vad', device=str(self.device))
             logger.info(f"✅ Silero VAD loaded on {self.device}")
         except Exception as e:
             logger.warning(f"Could not load Silero VAD from torch.hub: {e}")
@@ -91,8 +98,9 @@ class SileroVAD:
             # Convert to torch tensor
             audio_tensor = torch.from_numpy(audio).float()
             
-            # Get VAD predictions
-            with torch.no_grad():
+            # Get VAD predictions (the model keeps state between calls, so
+            # threads sharing it take turns)
+            with model_lock('silero_vad', device=str(self.device)), torch.no_grad():
                 speech_probs = self.model(audio_tensor.to(self.device), 
                                          torch.tensor([self.sr]).to(self.device))
             
@@ -5,6 +5,9 @@ import librosa
 from typing import Dict, List, Tuple
 import pandas as pd
 
+from preprocessing.segment_analysis import SegmentAnalysis
+from dataset.metadata import read_metadata
+
 class QualityMetrics:
     """Quality assessment metrics for voice dataset."""
 
@@ -54,10 +57,49 @@ class QualityMetrics:
             "high_balance": high_power / total_power
         }
 
-    def calculate_zero_crossing_rate(self, audio: np.ndarray) -> float:
+    def calculate_zero_crossing_rate(self, audio: np.ndarray, analysis=None) -> float:
         """Calculate zero crossing rate (related to noisiness)."""
+        if analysis is not None:
+            return np.mean(analysis.zero_crossing_rate())
         return np.mean(librosa.feature.zero_crossing_rate(audio))
 
+    def assess_audio(self, audio: np.ndarray, sr: int = None, analysis=None) -> Dict[str, float]:
+        """
+        Quality assessment of an in-memory audio array.
+
+        Args:
+            audio: Mono audio time series
+            sr: Sample rate of audio (defaults to self.sample_rate)
+            analysis: Optional SegmentAnalysis of audio shared with the classifiers
+        """
+        sr = sr or self.sample_rate
+
+        # Resample if necessary (a shared analysis no longer matches the audio)
+        if sr != self.sample_rate:
+            audio = librosa.resample(audio, orig_sr=sr, target_sr=self.sample_rate)
+            analysis = None
+        elif analysis is not None and analysis.sr != self.sample_rate:
+            analysis = None
+
+        # Calculate metrics
+        snr = self.calculate_snr(audio)
+        clipping = self.calculate_clipping_ratio(audio)
+        silence = self.calculate_silence_ratio(audio)
+        freq_balance = self.calculate_frequency_balance(audio)
+        zcr = self.calculate_zero_crossing_rate(audio, analysis)
+
+        # Overall quality score (0-100)
+        quality_score = self._calculate_overall_quality(snr, clipping, silence, freq_balance, zcr)
+
+        return {
+            "snr": snr,
+            "clipping_ratio": clipping,
+            "silence_ratio": silence,
+            "zero_crossing_rate": zcr,
+            "quality_score": quality_score,
+            **freq_balance
+        }
+
     def assess_audio_quality(self, audio_path: str) -> Dict[str, float]:
         """Comprehensive audio quality assessment."""
         try:
@@ -68,41 +110,24 @@ class QualityMetrics:
             if len(audio.shape) > 1:
                 audio = audio.mean(axis=1)
 
-            # Resample if necessary
-            if sr != self.sample_rate:
-                audio = librosa.resample(audio, orig_sr=sr, target_sr=self.sample_rate)
-
-            # Calculate metrics
-            snr = self.calculate_snr(audio)
-            clipping = self.calculate_clipping_ratio(audio)
-            silence = self.calculate_silence_ratio(audio)
-            freq_balance = self.calculate_frequency_balance(audio)
-            zcr = self.calculate_zero_crossing_rate(audio)
-
-            # Overall quality score (0-100)
-            quality_score = self._calculate_overall_quality(snr, clipping, silence, freq_balance, zcr)
-
-            return {
-                "snr": snr,
-                "clipping_ratio": clipping,
-                "silence_ratio": silence,
-                "zero_crossing_rate": zcr,
-                "quality_score": quality_score,
-                **freq_balance
-            }
+            return self.assess_audio(audio, sr)
 
         except Exception as e:
             print(f"Error assessing quality for {audio_path}: {e}")
-            return {
-                "snr": 0,
-                "clipping_ratio": 100,
-                "silence_ratio": 100,
-                "zero_crossing_rate": 0,
-                "quality_score": 0,
-                "low_balance": 0,
-                "mid_balance": 0,
-                "high_balance": 0
-            }
+            return self._failed_assessment()
+
+    def _failed_assessment(self) -> Dict[str, float]:
+        """Metrics reported when a file cannot be assessed."""
+        return {
+            "snr": 0,
+            "clipping_ratio": 100,
+            "silence_ratio": 100,
+            "zero_crossing_rate": 0,
+            "quality_score": 0,
+            "low_balance": 0,
+            "mid_balance": 0,
+            "high_balance": 0
+        }
 
     def _calculate_overall_quality(self, snr: float, clipping: float, silence: float,
                                  freq_balance: Dict, zcr: float) -> float:
@@ -143,41 +168,51 @@ class QualityMetrics:
 
         return min(100, score)
 
-def assess_dataset_quality(dataset_dir: str) -> Dict[str, any]:
-    """Assess quality of entire dataset."""
+QUALITY_COLUMNS = ["label", "quality_score", "snr", "clipping_ratio", "silence_ratio"]
+
+def _quality_from_metadata(dataset_dir: str):
+    """Quality columns recorded at save time, or None if the metadata lacks them."""
+    try:
+        df = read_metadata(os.path.join(dataset_dir, "metadata.csv"), columns=QUALITY_COLUMNS)
+    except (FileNotFoundError, ValueError, KeyError):
+        return None
+    return df.rename(columns={"label": "category"})
+
+def _scanner(dataset_dir: str, num_workers: int = None, use_cache: bool = True):
+    from quality.scanner import DatasetQualityScanner
+    return DatasetQualityScanner(dataset_dir, cache_path=None if use_cache else ":memory:",
+                                 num_workers=num_workers)
+
+def assess_dataset_quality(dataset_dir: str, use_metadata: bool = False,
+                           num_workers: int = None, use_cache: bool = True) -> Dict[str, any]:
+    """
+    Assess quality of entire dataset.
+
+    Args:
+        dataset_dir: Dataset root with male/female/uncertain folders
+        use_metadata: Summarize the quality columns stored in the metadata
+            table instead of re-analyzing every file (falls back to the
+            file scan if the metadata has no quality columns)
+        num_workers: Processes for the file scan (default: one per core)
+        use_cache: Reuse per-file results of earlier scans
+            (<dataset_dir>/.quality_cache.sqlite); only new or changed
+            files are analyzed
+    """
     print("Assessing dataset quality...")
 
-    metrics = QualityMetrics()
-    quality_data = []
-
     categories = ['male', 'female', 'uncertain']
-    total_files = 0
-
-    for category in categories:
-        category_dir = os.path.join(dataset_dir, category)
-        if not os.path.exists(category_dir):
-            continue
 
-        files = [f for f in os.listdir(category_dir) if f.endswith('.wav')]
+    df = _quality_from_metadata(dataset_dir) if use_metadata else None
+    if df is not None:
+        if len(df) == 0:
+            return {"error": "No files found in dataset"}
+        return _summarize_quality(df, len(df), categories)
 
-        for file in files:
-            file_path = os.path.join(category_dir, file)
-            quality_metrics = metrics.assess_audio_quality(file_path)
-
-            quality_data.append({
-                "file": file,
-                "category": category,
-                **quality_metrics
-            })
-
-        total_files += len(files)
-
-    if not quality_data:
-        return {"error": "No files found in dataset"}
-
-    # Convert to DataFrame for analysis
-    df = pd.DataFrame(quality_data)
+    with _scanner(dataset_dir, num_workers, use_cache) as scanner:
+        return scanner.summary()
 
+def _summarize_quality(df: pd.DataFrame, total_files: int, categories: List[str]) -> Dict[str, any]:
+    """Summary statistics for a frame of per-file quality metrics."""
     # Calculate summary statistics
     summary = {
         "total_files": total_files,
@@ -203,30 +238,17 @@ def assess_dataset_quality(dataset_dir: str) -> Dict[str, any]:
 
     return summary
 
-def filter_low_quality_files(dataset_dir: str, quality_threshold: float = 30.0) -> List[str]:
-    """Identify and return list of low-quality files for removal."""
-    print(f"Filtering files with quality score below {quality_threshold}...")
-
-    metrics = QualityMetrics()
-    low_quality_files = []
+def filter_low_quality_files(dataset_dir: str, quality_threshold: float = 30.0,
+                             num_workers: int = None, use_cache: bool = True) -> List[str]:
+    """Identify and return list of low-quality files for removal.
 
-    categories = ['male', 'female', 'uncertain']
-
-    for category in categories:
-        category_dir = os.path.join(dataset_dir, category)
-        if not os.path.exists(category_dir):
-            continue
-
-        files = [f for f in os.listdir(category_dir) if f.endswith('.wav')]
-
-        for file in files:
-            file_path = os.path.join(category_dir, file)
-            quality_metrics = metrics.assess_audio_quality(file_path)
-
-            if quality_metrics["quality_score"] < quality_threshold:
-                low_quality_files.append(file_path)
+    Answers from the same per-file results as assess_dataset_quality, so
+    running both analyzes each file once.
+    """
+    print(f"Filtering files with quality score below {quality_threshold}...")
 
-    return low_quality_files
+    with _scanner(dataset_dir, num_workers, use_cache) as scanner:
+        return scanner.low_quality_files(quality_threshold)
 
 if __name__ == "__main__":
     # Example usage
@@ -20,14 +20,29 @@ Features:
   - Duration appropriateness
   - Overlapping speech detection
   - Voice stability
+
+assess_segment computes one SegmentAnalysis per segment: a single STFT
+feeds the noise floor, pitch, speaking rate and clarity metrics, and the
+frame RMS is computed once per frame size. The analyzer methods still work
+on their own (analysis=None) and give the same results.
+
+assess_batch / assess_batch_iter take paths or arrays, decode paths in a
+prefetching thread pool and spread the analysis over a process pool in
+chunks, yielding results as chunks complete.
 """
 
+import os
 import numpy as np
 import librosa
 import logging
-from typing import Dict, Optional, List
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, Iterable, Iterator, Optional, List
 from pathlib import Path
 
+from preprocessing.audio_loader import prefetch_audio
+from preprocessing.segment_analysis import SegmentAnalysis
+
 try:
     from scipy.signal import find_peaks
     from scipy import signal
@@ -43,6 +58,23 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Below this many segments the pool start-up costs more than it saves
+MIN_SEGMENTS_FOR_POOL = 16
+
+# Per-process assessor for process-pool workers (populated by _init_worker)
+_worker_state = {}
+
+
+def _init_worker(sr: int):
+    """Create the assessor once when a worker process starts."""
+    _worker_state["assessor"] = QualityAssessor(sr=sr)
+
+
+def _assess_chunk(chunk: List) -> List[Dict]:
+    """Assess a chunk of (index, name, audio) in a worker."""
+    assessor = _worker_state["assessor"]
+    return [assessor._assess_item(index, name, audio) for index, name, audio in chunk]
+
 
 class AudioAnalyzer:
     """Analyze various audio quality metrics"""
@@ -107,7 +139,8 @@ class AudioAnalyzer:
             logger.warning(f"Clipping detection failed: {e}")
             return 0.0
     
-    def compute_dynamic_range(self, audio: np.ndarray) -> float:
+    def compute_dynamic_range(self, audio: np.ndarray,
+                              analysis: Optional[SegmentAnalysis] = None) -> float:
         """
         Compute dynamic range in dB
         
@@ -119,8 +152,8 @@ class AudioAnalyzer:
             frame_length = int(0.02 * self.sr)  # 20ms
             hop_length = frame_length // 2
             
-            rms = librosa.feature.rms(y=audio, frame_length=frame_length,
-                                      hop_length=hop_length)[0]
+            analysis = SegmentAnalysis.ensure(analysis, audio, self.sr)
+            rms = analysis.rms(frame_length=frame_length, hop_length=hop_length)[0]
             
             if np.max(rms) == 0:
                 return 0.0
@@ -137,7 +170,8 @@ class AudioAnalyzer:
             logger.warning(f"Dynamic range computation failed: {e}")
             return 0.0
     
-    def estimate_background_noise(self, audio: np.ndarray) -> float:
+    def estimate_background_noise(self, audio: np.ndarray,
+                                  analysis: Optional[SegmentAnalysis] = None) -> float:
         """
         Estimate background noise level (0-100, lower is better)
         
@@ -146,9 +180,8 @@ class AudioAnalyzer:
         """
         try:
             # Use spectral subtraction approach
-            # Compute spectrogram
-            D = librosa.stft(audio)
-            magnitude = np.abs(D)
+            # Magnitude spectrogram
+            magnitude = SegmentAnalysis.ensure(analysis, audio, self.sr).magnitude
             
             # Estimate noise as minimum magnitude per frequency
             noise_profile = np.min(magnitude, axis=1)
@@ -168,7 +201,8 @@ class AudioAnalyzer:
             return 50.0  # Default to medium noise
     
     def detect_silence(self, audio: np.ndarray,
-                      silence_threshold: float = 0.02) -> float:
+                      silence_threshold: float = 0.02,
+                      analysis: Optional[SegmentAnalysis] = None) -> float:
         """
         Detect percentage of silence in audio
         
@@ -177,7 +211,7 @@ class AudioAnalyzer:
         """
         try:
             # Compute RMS energy
-            rms = librosa.feature.rms(y=audio)[0]
+            rms = SegmentAnalysis.ensure(analysis, audio, self.sr).rms()[0]
             
             # Threshold
             energy_threshold = silence_threshold * np.max(rms)
@@ -196,10 +230,11 @@ class SpeechQualityAnalyzer:
     def __init__(self, sr: int = 16000):
         self.sr = sr
     
-    def extract_pitch_features(self, audio: np.ndarray) -> Dict[str, float]:
+    def extract_pitch_features(self, audio: np.ndarray,
+                               analysis: Optional[SegmentAnalysis] = None) -> Dict[str, float]:
         """Extract pitch-related features"""
         try:
-            pitches, magnitudes = librosa.piptrack(y=audio, sr=self.sr)
+            pitches, magnitudes = SegmentAnalysis.ensure(analysis, audio, self.sr).piptrack()
             
             # Get pitch values where magnitude is significant
             index = magnitudes > np.median(magnitudes)
@@ -225,7 +260,8 @@ class SpeechQualityAnalyzer:
                 'pitch_variety': 0.0,
             }
     
-    def estimate_speaking_rate(self, audio: np.ndarray) -> float:
+    def estimate_speaking_rate(self, audio: np.ndarray,
+                               analysis: Optional[SegmentAnalysis] = None) -> float:
         """
         Estimate speaking rate in words per minute
         
@@ -233,8 +269,10 @@ class SpeechQualityAnalyzer:
             Estimated WPM
         """
         try:
-            # Compute onset strength (syllable approximation)
-            onset_env = librosa.onset.onset_strength(y=audio, sr=self.sr)
+            # Compute onset strength (syllable approximation) from the
+            # log-mel spectrogram, as onset_strength(y=audio) would
+            mel = SegmentAnalysis.ensure(analysis, audio, self.sr).melspectrogram()
+            onset_env = librosa.onset.onset_strength(S=librosa.power_to_db(mel), sr=self.sr)
             
             # Detect peaks (syllables)
             peaks, _ = signal.find_peaks(onset_env, height=np.median(onset_env))
@@ -255,7 +293,8 @@ class SpeechQualityAnalyzer:
             logger.warning(f"Speaking rate estimation failed: {e}")
             return 0.0
     
-    def compute_formant_clarity(self, audio: np.ndarray) -> float:
+    def compute_formant_clarity(self, audio: np.ndarray,
+                                analysis: Optional[SegmentAnalysis] = None) -> float:
         """
         Compute formant clarity score (0-100)
         
@@ -264,16 +303,13 @@ class SpeechQualityAnalyzer:
         """
         try:
             # Spectral analysis
-            S = np.abs(librosa.stft(audio))
+            analysis = SegmentAnalysis.ensure(analysis, audio, self.sr)
             
             # Spectral centroid (formant indicator)
-            cent = librosa.feature.spectral_centroid(S=S, sr=self.sr)[0]
+            cent = analysis.spectral_centroid()[0]
             
             # Spectral rolloff
-            rolloff = librosa.feature.spectral_rolloff(S=S, sr=self.sr)[0]
-            
-            # MFCC coefficients
-            mfcc = librosa.feature.mfcc(y=audio, sr=self.sr, n_mfcc=13)
+            rolloff = analysis.spectral_rolloff()[0]
             
             # Clarity: variance in spectral features suggests formants
             clarity_score = (np.std(cent) + np.std(rolloff)) / 1000
@@ -295,29 +331,33 @@ class QualityAssessor:
         self.audio_analyzer = AudioAnalyzer(sr=sr)
         self.speech_analyzer = SpeechQualityAnalyzer(sr=sr)
     
-    def assess_segment(self, audio: np.ndarray) -> Dict:
+    def assess_segment(self, audio: np.ndarray, analysis: Optional[SegmentAnalysis] = None) -> Dict:
         """
         Assess quality of audio segment
         
         Args:
             audio: Audio time series
+            analysis: Optional precomputed SegmentAnalysis of audio
             
         Returns:
             Dictionary with quality assessment
         """
         duration = len(audio) / self.sr
+
+        # One STFT and RMS framing shared by every metric below
+        analysis = SegmentAnalysis.ensure(analysis, audio, self.sr)
         
         # Audio quality metrics
         snr = self.audio_analyzer.compute_snr(audio)
         clipping = self.audio_analyzer.detect_clipping(audio)
-        dynamic_range = self.audio_analyzer.compute_dynamic_range(audio)
-        background_noise = self.audio_analyzer.estimate_background_noise(audio)
-        silence = self.audio_analyzer.detect_silence(audio)
+        dynamic_range = self.audio_analyzer.compute_dynamic_range(audio, analysis)
+        background_noise = self.audio_analyzer.estimate_background_noise(audio, analysis)
+        silence = self.audio_analyzer.detect_silence(audio, analysis=analysis)
         
         # Speech quality metrics
-        pitch_features = self.speech_analyzer.extract_pitch_features(audio)
-        speaking_rate = self.speech_analyzer.estimate_speaking_rate(audio)
-        clarity = self.speech_analyzer.compute_formant_clarity(audio)
+        pitch_features = self.speech_analyzer.extract_pitch_features(audio, analysis)
+        speaking_rate = self.speech_analyzer.estimate_speaking_rate(audio, analysis)
+        clarity = self.speech_analyzer.compute_formant_clarity(audio, analysis)
         
         # Composite scores
         audio_quality_score = self._compute_audio_quality_score(
@@ -385,22 +425,117 @@ class QualityAssessor:
                 'rating': 'error'
             }
     
-    def assess_batch(self, audio_files: List[str]) -> List[Dict]:
+    def assess_batch(self, audio_files: Iterable, num_workers: Optional[int] = None,
+                     chunk_size: int = 16, prefetch: int = 64) -> List[Dict]:
         """
-        Assess quality of multiple files
+        Assess quality of multiple files or in-memory segments
         
         Args:
-            audio_files: List of audio file paths
+            audio_files: Audio file paths and/or audio arrays (at self.sr)
+            num_workers: Worker processes (default: one per core; 1 = inline)
+            chunk_size: Segments per pool task
+            prefetch: Segments decoded ahead of the analysis
             
         Returns:
-            List of assessment results
+            List of assessment results, in input order
+        """
+        by_index = {}
+        for result in self.assess_batch_iter(audio_files, num_workers, chunk_size, prefetch):
+            by_index[result.pop('index')] = result
+        return [by_index[index] for index in sorted(by_index)]
+
+    def assess_batch_iter(self, audio_items: Iterable, num_workers: Optional[int] = None,
+                          chunk_size: int = 16, prefetch: int = 64) -> Iterator[Dict]:
         """
-        results = []
-        for audio_file in audio_files:
-            result = self.assess_file(audio_file)
-            results.append(result)
+        Assess segments in parallel, yielding results as they complete
         
-        return results
+        Paths are decoded in a thread pool while earlier chunks are analyzed;
+        the analysis runs in a process pool (inline for small batches or
+        num_workers=1). audio_items may be a lazy iterable.
+        
+        Args:
+            audio_items: Audio file paths and/or audio arrays (at self.sr)
+            num_workers: Worker processes (default: one per core; 1 = inline)
+            chunk_size: Segments per pool task
+            prefetch: Segments decoded ahead of the analysis
+            
+        Yields:
+            Assessment results in completion order; 'index' is the position
+            in audio_items and 'file' the path for path items
+        """
+        num_workers = max(1, int(num_workers or os.cpu_count() or 1))
+        chunk_size = max(1, chunk_size)
+        decoded = prefetch_audio(audio_items, self.sr, prefetch=max(prefetch, chunk_size))
+
+        small = hasattr(audio_items, '__len__') and len(audio_items) < MIN_SEGMENTS_FOR_POOL
+        if num_workers == 1 or small:
+            for index, item, audio, error in decoded:
+                yield self._assess_item(index, self._item_name(item), audio, error)
+            return
+
+        # spawn: the caller may have torch/CUDA state that must not be forked
+        context = multiprocessing.get_context("spawn")
+        executor = ProcessPoolExecutor(max_workers=num_workers, mp_context=context,
+                                       initializer=_init_worker, initargs=(self.sr,))
+        in_flight = {}
+
+        def completed(futures):
+            for future in futures:
+                chunk = in_flight.pop(future)
+                try:
+                    yield from future.result()
+                except Exception as e:
+                    logger.error(f"Quality worker failed on a chunk of {len(chunk)} segments: {e}")
+                    for index, name, _ in chunk:
+                        yield self._assess_item(index, name, None, str(e))
+
+        try:
+            chunk = []
+            for index, item, audio, error in decoded:
+                if error is not None:
+                    yield self._assess_item(index, self._item_name(item), None, error)
+                    continue
+                chunk.append((index, self._item_name(item), audio))
+                if len(chunk) < chunk_size:
+                    continue
+                in_flight[executor.submit(_assess_chunk, chunk)] = chunk
+                chunk = []
+                # Keep every worker busy without queueing the whole input
+                while len(in_flight) >= 2 * num_workers:
+                    done, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+                    yield from completed(done)
+            if chunk:
+                in_flight[executor.submit(_assess_chunk, chunk)] = chunk
+            while in_flight:
+                done, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+                yield from completed(done)
+        finally:
+            decoded.close()
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    @staticmethod
+    def _item_name(item) -> Optional[str]:
+        return None if isinstance(item, np.ndarray) else str(item)
+
+    def _assess_item(self, index: int, name: Optional[str], audio: Optional[np.ndarray],
+                     error: Optional[str] = None) -> Dict:
+        """assess_segment result (or assess_file-style error) for one batch item"""
+        if error is None:
+            try:
+                result = self.assess_segment(audio)
+            except Exception as e:
+                error = str(e)
+        if error is not None:
+            logger.error(f"Failed to assess {name if name is not None else f'segment {index}'}: {error}")
+            result = {
+                'error': error,
+                'overall_quality_score': 0.0,
+                'rating': 'error'
+            }
+        if name is not None:
+            result['file'] = name
+        result['index'] = index
+        return result
     
     def _compute_audio_quality_score(self, snr: float, clipping: float,
                                     dynamic_range: float, noise: float,
@@ -0,0 +1,200 @@
+"""
+Dataset Quality Scanner
+Parallel, cached quality assessment of a whole dataset
+
+assess_dataset_quality and filter_low_quality_files used to walk the label
+folders one file at a time, re-reading and re-analyzing every WAV on every
+call, and running both analyzed the dataset twice. The scanner assesses
+files in a process pool and keeps the results in SQLite keyed by path,
+size and modification time, so a re-run only analyzes new or changed
+files and the summary and the filter are answered from the same results.
+
+Key Features:
+- Process pool fan-out in chunks (inline for small scans)
+- Per-file results cached in <dataset_dir>/.quality_cache.sqlite
+- Cache entries invalidated by size/mtime changes or a METRICS_VERSION bump
+- summary() and low_quality_files() share one scan
+"""
+
+import os
+import json
+import time
+import logging
+import sqlite3
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CACHE_FILENAME = ".quality_cache.sqlite"
+DEFAULT_CATEGORIES = ('male', 'female', 'uncertain')
+
+# Bump when QualityMetrics changes what it computes
+METRICS_VERSION = 1
+
+# Below this many files the pool start-up costs more than it saves
+MIN_FILES_FOR_POOL = 16
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS quality (
+    path TEXT PRIMARY KEY,
+    category TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    version INTEGER NOT NULL,
+    metrics TEXT NOT NULL,
+    assessed_at REAL NOT NULL
+);
+"""
+
+
+def _assess_files(paths: List[str], sample_rate: int) -> List[Dict]:
+    """Assess a chunk of files (runs in a pool worker or inline)"""
+    from utils.model_registry import get_model
+
+    metrics = get_model('quality_metrics', sample_rate=sample_rate)
+    return [metrics.assess_audio_quality(path) for path in paths]
+
+
+class DatasetQualityScanner:
+    """
+    Quality metrics for every file of a dataset, computed once per file version
+    """
+
+    def __init__(self, dataset_dir: str, cache_path: Optional[str] = None,
+                 categories: Iterable[str] = DEFAULT_CATEGORIES, num_workers: Optional[int] = None,
+                 sample_rate: int = 16000, chunk_size: int = 32):
+        """
+        Initialize scanner
+
+        Args:
+            dataset_dir: Dataset root with one folder per category
+            cache_path: SQLite result cache (default: <dataset_dir>/.quality_cache.sqlite)
+            categories: Category folders to scan
+            num_workers: Worker processes (default: one per core; 1 = no pool)
+            sample_rate: Rate the metrics are computed at
+            chunk_size: Files per pool task
+        """
+        self.dataset_dir = dataset_dir
+        self.cache_path = cache_path or os.path.join(dataset_dir, CACHE_FILENAME)
+        self.categories = list(categories)
+        self.num_workers = max(1, int(num_workers or os.cpu_count() or 1))
+        self.sample_rate = sample_rate
+        self.chunk_size = max(1, chunk_size)
+
+        os.makedirs(os.path.dirname(self.cache_path) or '.', exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.cache_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def list_files(self) -> List[Tuple[str, str, int, int]]:
+        """(path, category, size, mtime_ns) of every WAV in the category folders"""
+        files = []
+        for category in self.categories:
+            category_dir = os.path.join(self.dataset_dir, category)
+            if not os.path.isdir(category_dir):
+                continue
+            with os.scandir(category_dir) as entries:
+                for entry in entries:
+                    if entry.is_file() and entry.name.endswith('.wav'):
+                        stat = entry.stat()
+                        files.append((entry.path, category, stat.st_size, stat.st_mtime_ns))
+        files.sort()
+        return files
+
+    def _cached(self) -> Dict[str, sqlite3.Row]:
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM quality WHERE version = ?", (METRICS_VERSION,)).fetchall()
+        return {row['path']: row for row in rows}
+
+    def _compute(self, paths: List[str]) -> List[Dict]:
+        if len(paths) < MIN_FILES_FOR_POOL or self.num_workers == 1:
+            return _assess_files(paths, self.sample_rate)
+
+        chunks = [paths[i:i + self.chunk_size] for i in range(0, len(paths), self.chunk_size)]
+        workers = min(self.num_workers, len(chunks))
+        # spawn: the caller may have torch/CUDA state that must not be forked
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+            results = executor.map(_assess_files, chunks, [self.sample_rate] * len(chunks))
+            return [result for chunk in results for result in chunk]
+
+    def scan(self, prune: bool = True) -> List[Dict]:
+        """
+        Quality metrics of every file, analyzing only new or changed files
+
+        Args:
+            prune: Drop cache entries of files that no longer exist
+
+        Returns:
+            One dictionary per file: file, path, category and the metrics
+        """
+        start_time = time.perf_counter()
+        files = self.list_files()
+        cached = self._cached()
+
+        stale = [(path, category, size, mtime_ns) for path, category, size, mtime_ns in files
+                 if path not in cached
+                 or (cached[path]['size'], cached[path]['mtime_ns']) != (size, mtime_ns)]
+
+        if stale:
+            logger.info(f"Assessing quality of {len(stale)} files ({len(files) - len(stale)} cached)")
+            computed = self._compute([path for path, _, _, _ in stale])
+            now = time.time()
+            with self._lock, self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO quality (path, category, size, mtime_ns, version, metrics, assessed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [(path, category, size, mtime_ns, METRICS_VERSION,
+                      json.dumps({k: float(v) for k, v in metrics.items()}), now)
+                     for (path, category, size, mtime_ns), metrics in zip(stale, computed)]
+                )
+            cached = self._cached()
+
+        if prune:
+            present = {path for path, _, _, _ in files}
+            gone = [(path,) for path in cached if path not in present]
+            if gone:
+                with self._lock, self._conn:
+                    self._conn.executemany("DELETE FROM quality WHERE path = ?", gone)
+
+        results = []
+        for path, category, _, _ in files:
+            results.append({
+                "file": os.path.basename(path),
+                "path": path,
+                "category": category,
+                **json.loads(cached[path]['metrics'])
+            })
+        logger.info(f"Quality scan of {len(files)} files took {time.perf_counter() - start_time:.2f}s")
+        return results
+
+    def summary(self, results: Optional[List[Dict]] = None) -> Dict:
+        """Dataset quality summary (see assess_dataset_quality)"""
+        import pandas as pd
+        from quality.metrics import _summarize_quality
+
+        results = self.scan() if results is None else results
+        if not results:
+            return {"error": "No files found in dataset"}
+        return _summarize_quality(pd.DataFrame(results), len(results), self.categories)
+
+    def low_quality_files(self, quality_threshold: float = 30.0,
+                          results: Optional[List[Dict]] = None) -> List[str]:
+        """Paths of files scoring below quality_threshold"""
+        results = self.scan() if results is None else results
+        return [r["path"] for r in results if r["quality_score"] < quality_threshold]
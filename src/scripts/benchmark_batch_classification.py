@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Batch Classification Benchmark for VOXENT
+
+Compares the per-clip classification loop with the batched path
+(IntegratedGenderClassifier.classify_batch / MLGenderClassifier.predict_batch)
+on synthetic voiced segments, and checks that both give the same labels.
+
+Usage:
+    python scripts/benchmark_batch_classification.py --segments 200
+"""
+
+import os
+import sys
+import time
+import argparse
+import logging
+from pathlib import Path
+
+import numpy as np
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from classification import IntegratedGenderClassifier
+from classification.ml_classifier import MLGenderClassifier
+
+logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+def synthetic_voice(rng, sr: int, f0: float, duration: float) -> np.ndarray:
+    """Harmonic tone with vibrato and noise, roughly voice-like."""
+    t = np.arange(int(sr * duration)) / sr
+    phase = 2 * np.pi * np.cumsum(f0 * (1 + 0.02 * np.sin(2 * np.pi * 5 * t))) / sr
+    audio = sum(np.sin(k * phase) / k for k in range(1, 8))
+    audio += 0.05 * rng.standard_normal(len(t))
+    return (0.3 * audio / np.max(np.abs(audio))).astype(np.float32)
+
+
+def make_segments(rng, n: int, sr: int):
+    labels = rng.integers(0, 2, n)  # 1=male, 0=female
+    segments = [
+        synthetic_voice(rng, sr, rng.normal(115 if label else 215, 15), rng.uniform(1.0, 4.0))
+        for label in labels
+    ]
+    return segments, labels
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batched vs per-clip gender classification")
+    parser.add_argument("--segments", type=int, default=200, help="Number of test segments")
+    parser.add_argument("--train-segments", type=int, default=200, help="Segments used to train the ML model")
+    parser.add_argument("--sample-rate", type=int, default=16000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    sr = args.sample_rate
+
+    # Train a small ML model on synthetic data
+    ml = MLGenderClassifier(sample_rate=sr)
+    train_audio, train_labels = make_segments(rng, args.train_segments, sr)
+    ml.train(ml.extract_features_batch(train_audio), train_labels)
+
+    classifier = IntegratedGenderClassifier(use_ml=False)
+    classifier.ml_classifier = ml
+
+    segments, _ = make_segments(rng, args.segments, sr)
+    total_audio = sum(len(s) for s in segments) / sr
+    print(f"\n{args.segments} segments, {total_audio:.0f}s of audio")
+
+    loop_ml, loop_ml_time = timed(lambda: [ml.predict(s) for s in segments])
+    batch_ml, batch_ml_time = timed(lambda: ml.predict_batch(segments))
+
+    loop_all, loop_all_time = timed(lambda: [classifier.classify(s, sr) for s in segments])
+    batch_all, batch_all_time = timed(lambda: classifier.classify_batch(segments, sr))
+
+    def agreement(a, b):
+        return np.mean([x[0] == y[0] for x, y in zip(a, b)]) * 100
+
+    print(f"\n{'Path':<32}{'Loop (s)':>10}{'Batch (s)':>11}{'Speedup':>9}{'Agree':>8}")
+    print(f"{'MLGenderClassifier.predict':<32}{loop_ml_time:>10.2f}{batch_ml_time:>11.2f}"
+          f"{loop_ml_time / batch_ml_time:>8.1f}x{agreement(loop_ml, batch_ml):>7.1f}%")
+    print(f"{'IntegratedGenderClassifier':<32}{loop_all_time:>10.2f}{batch_all_time:>11.2f}"
+          f"{loop_all_time / batch_all_time:>8.1f}x{agreement(loop_all, batch_all):>7.1f}%")
+
+
+if __name__ == "__main__":
+    main()
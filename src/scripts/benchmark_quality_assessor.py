@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Quality Assessor Benchmark for VOXENT
+
+Compares the per-metric analysis passes QualityAssessor.assess_segment used
+to make (an STFT each for noise, pitch, onsets and clarity, plus an unused
+MFCC, and two RMS framings) with the shared SegmentAnalysis path, reports
+the cost per second of audio, and checks that both give the same scores.
+
+Usage:
+    python scripts/benchmark_quality_assessor.py --segments 50
+"""
+
+import sys
+import time
+import argparse
+import logging
+from pathlib import Path
+
+import librosa
+import numpy as np
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from quality.quality_assessor import QualityAssessor
+
+logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+def synthetic_voice(rng, sr: int, f0: float, duration: float) -> np.ndarray:
+    """Harmonic tone with vibrato, syllable-rate envelope and noise."""
+    t = np.arange(int(sr * duration)) / sr
+    phase = 2 * np.pi * np.cumsum(f0 * (1 + 0.02 * np.sin(2 * np.pi * 5 * t))) / sr
+    audio = sum(np.sin(k * phase) / k for k in range(1, 8))
+    audio *= 0.5 + 0.5 * np.abs(np.sin(2 * np.pi * 2 * t))
+    audio += 0.05 * rng.standard_normal(len(t))
+    return (0.3 * audio / np.max(np.abs(audio))).astype(np.float32)
+
+
+def per_metric_scores(assessor: QualityAssessor, audio: np.ndarray) -> dict:
+    """The previous assess_segment: every metric runs its own analysis."""
+    audio_analyzer, speech_analyzer = assessor.audio_analyzer, assessor.speech_analyzer
+    # Computed (and discarded) by the previous compute_formant_clarity
+    librosa.feature.mfcc(y=audio, sr=assessor.sr, n_mfcc=13)
+    return {
+        'snr': audio_analyzer.compute_snr(audio),
+        'clipping': audio_analyzer.detect_clipping(audio),
+        'dynamic_range': audio_analyzer.compute_dynamic_range(audio),
+        'background_noise': audio_analyzer.estimate_background_noise(audio),
+        'silence': audio_analyzer.detect_silence(audio),
+        'pitch_variety': speech_analyzer.extract_pitch_features(audio)['pitch_variety'],
+        'speaking_rate': speech_analyzer.estimate_speaking_rate(audio),
+        'clarity': speech_analyzer.compute_formant_clarity(audio),
+    }
+
+
+def shared_scores(assessor: QualityAssessor, audio: np.ndarray) -> dict:
+    result = assessor.assess_segment(audio)
+    return {
+        'snr': result['audio_quality']['snr_db'],
+        'clipping': result['audio_quality']['clipping_percent'],
+        'dynamic_range': result['audio_quality']['dynamic_range_db'],
+        'background_noise': result['audio_quality']['background_noise_score'],
+        'silence': result['audio_quality']['silence_percent'],
+        'pitch_variety': result['speech_quality']['pitch_variety'],
+        'speaking_rate': result['speech_quality']['speaking_rate_wpm'],
+        'clarity': result['speech_quality']['clarity'],
+    }
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark shared vs per-metric quality analysis")
+    parser.add_argument("--segments", type=int, default=50, help="Number of test segments")
+    parser.add_argument("--min-duration", type=float, default=1.0, help="Shortest segment (s)")
+    parser.add_argument("--max-duration", type=float, default=10.0, help="Longest segment (s)")
+    parser.add_argument("--sample-rate", type=int, default=16000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    sr = args.sample_rate
+    assessor = QualityAssessor(sr=sr)
+
+    segments = [
+        synthetic_voice(rng, sr, rng.uniform(90, 250), rng.uniform(args.min_duration, args.max_duration))
+        for _ in range(args.segments)
+    ]
+    total_audio = sum(len(s) for s in segments) / sr
+    print(f"\n{args.segments} segments, {total_audio:.0f}s of audio")
+
+    # Warm up librosa's filter/window caches so neither path pays for them
+    shared_scores(assessor, segments[0])
+    per_metric_scores(assessor, segments[0])
+
+    before, before_time = timed(lambda: [per_metric_scores(assessor, s) for s in segments])
+    after, after_time = timed(lambda: [shared_scores(assessor, s) for s in segments])
+
+    max_diff = max(abs(a[key] - b[key]) for a, b in zip(before, after) for key in a)
+
+    print(f"\n{'Path':<24}{'Total (s)':>10}{'ms / s audio':>14}")
+    print(f"{'Per-metric passes':<24}{before_time:>10.2f}{1000 * before_time / total_audio:>14.2f}")
+    print(f"{'Shared analysis':<24}{after_time:>10.2f}{1000 * after_time / total_audio:>14.2f}")
+    print(f"\nSpeedup: {before_time / after_time:.1f}x, max metric difference: {max_diff:.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -37,17 +37,23 @@ logger = logging.getLogger(__name__)
 class AIModelTrainer:
     """Train and manage AI models for VOXENT"""
     
-    def __init__(self, config_path: str = None, model_dir: str = "models"):
+    def __init__(self, config_path: str = None, model_dir: str = "models",
+                 feature_cache: bool = True, num_workers: int = None):
         """
         Initialize trainer
         
         Args:
             config_path: Path to config.yaml
             model_dir: Directory to store models
+            feature_cache: Cache extracted features in <model_dir>/feature_cache
+                so retraining only extracts new files
+            num_workers: Feature extraction processes (default: one per core)
         """
         self.config = None
         self.model_dir = Path(model_dir)
         self.model_dir.mkdir(parents=True, exist_ok=True)
+        self.feature_cache_dir = self.model_dir / "feature_cache" if feature_cache else None
+        self.num_workers = num_workers
         
         if config_path:
             self.load_config(config_path)
@@ -148,7 +154,9 @@ class AIModelTrainer:
         classifier = MLGenderClassifier(model_type=model_type, sr=16000)
         
         # Train
-        result = classifier.train(list(paths), list(labels), test_split=test_split)
+        result = classifier.train(list(paths), list(labels), test_split=test_split,
+                                  cache_dir=str(self.feature_cache_dir) if self.feature_cache_dir else None,
+                                  num_workers=self.num_workers)
         
         if result['status'] == 'success':
             # Save model
@@ -325,6 +333,10 @@ Examples:
                        help='Bootstrap train from existing voice dataset')
     parser.add_argument('--model-type', choices=['randomforest', 'xgboost'],
                        default='randomforest', help='Classifier type')
+    parser.add_argument('--workers', type=int, default=None,
+                       help='Feature extraction processes (default: one per core)')
+    parser.add_argument('--no-feature-cache', action='store_true',
+                       help='Re-extract all features instead of reusing <model-dir>/feature_cache')
     
     # Assessment
     parser.add_argument('--assess', type=str, metavar='DIR',
@@ -348,7 +360,8 @@ Examples:
     )
     
     # Create trainer
-    trainer = AIModelTrainer(config_path=args.config, model_dir=args.model_dir)
+    trainer = AIModelTrainer(config_path=args.config, model_dir=args.model_dir,
+                             feature_cache=not args.no_feature_cache, num_workers=args.workers)
     
     # Bootstrap training
     if args.bootstrap:
@@ -4,6 +4,9 @@ ML Classifier Training Script for VOXENT
 
 This script trains a machine learning classifier for gender classification
 using the processed voice dataset with quality filtering.
+
+With --incremental, only samples added since the live model version are
+learned (online update) and published as the next model version.
 """
 
 import os
@@ -17,7 +20,7 @@ from pathlib import Path
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
-from classification.ml_classifier import train_ml_classifier
+from classification.ml_classifier import train_ml_classifier, update_ml_classifier
 
 # Set up logging
 logging.basicConfig(
@@ -68,6 +71,17 @@ def main():
         action="store_true",
         help="Force retraining even if model exists"
     )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Update the live model with samples added since its version instead of retraining"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Feature extraction processes (default: one per core)"
+    )
 
     args = parser.parse_args()
 
@@ -99,7 +113,7 @@ def main():
                 min_confidence = class_config.get('min_confidence', min_confidence)
 
         # Check if model already exists
-        if os.path.exists(model_path) and not args.force:
+        if os.path.exists(model_path) and not args.force and not args.incremental:
             logger.info(f"Model already exists at {model_path}. Use --force to retrain.")
             return
 
@@ -116,12 +130,28 @@ def main():
         logger.info(f"Model path: {model_path}")
         logger.info(f"Minimum confidence: {min_confidence}")
 
+        if args.incremental:
+            results = update_ml_classifier(
+                metadata_file=metadata_file,
+                dataset_dir=dataset_dir,
+                model_path=model_path,
+                min_confidence=min_confidence,
+                num_workers=args.workers
+            )
+            if results['status'] == 'up_to_date':
+                logger.info(f"Model version {results['version']} is up to date, nothing to learn")
+            else:
+                logger.info(f"Model version {results['version']} ({results['mode']}): "
+                            f"{results['new_samples']} new samples, accuracy on them {results['accuracy']:.3f}")
+            return
+
         # Train the classifier
         results = train_ml_classifier(
             metadata_file=metadata_file,
             dataset_dir=dataset_dir,
             model_path=model_path,
-            min_confidence=min_confidence
+            min_confidence=min_confidence,
+            num_workers=args.workers
         )
 
         # Print results
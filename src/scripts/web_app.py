@@ -1,20 +1,50 @@
 import os
+import json
 import uuid
-from flask import Flask, request, jsonify, send_from_directory, render_template, redirect, url_for
+import shutil
+from flask import Flask, Response, request, jsonify, send_file, send_from_directory, render_template, redirect, url_for
 from werkzeug.utils import secure_filename
+from werkzeug.security import safe_join
+from werkzeug.sansio.multipart import MultipartDecoder, File, Data, NeedData, Epilogue
 import threading
 import time
-from engine.batch_runner import run
+from dataset.metadata import read_metadata
+from dataset.index import RANGE_FILTERS, index_path_for, get_dataset_index as get_shared_dataset_index
+from dataset.previews import PREVIEW_FORMATS, create_preview_cache
+from engine.job_queue import JobQueue, BatchRunnerProcessor, JOB_COMPLETED, JOB_ERROR, JOB_CANCELLED
+from engine.progress import ProgressBus
+from preprocessing.stream_decoder import StreamingDecoder, StreamDecodeError
 import yaml
 
 # Configuration
 UPLOAD_FOLDER = os.path.join(os.getcwd(), 'data', 'input')
 ALLOWED_EXTENSIONS = {'wav', 'mp3', 'm4a', 'flac', 'ogg'}
-MAX_CONTENT_LENGTH = 50 * 1024 * 1024  # 50 MB limit
-
-# Global job tracker
+# Uploads are decoded while they stream in, so size is only capped if configured
+MAX_UPLOAD_MB = os.environ.get("VOXENT_MAX_UPLOAD_MB")
+MAX_CONTENT_LENGTH = int(MAX_UPLOAD_MB) * 1024 * 1024 if MAX_UPLOAD_MB else None
+UPLOAD_CHUNK_SIZE = 256 * 1024
+INGEST_SAMPLE_RATE = 16000  # pipeline rate: uploads are stored as 16 kHz mono WAV
+CONFIG_PATH = "config/config.yaml"
+JOB_DB_PATH = os.path.join(os.getcwd(), 'data', 'jobs.sqlite')
+JOB_WORKERS = int(os.environ.get("VOXENT_JOB_WORKERS", 1))
+SSE_KEEPALIVE_SECONDS = 15
+DATASET_DIR = "data/voice_dataset"
+DATASET_PAGE_SIZE = 100
+DATASET_MAX_PAGE_SIZE = 1000
+DATASET_INDEX_SYNCED = False
+AUDIO_MAX_AGE = 3600
+PREVIEW_CACHE = None
+
+# Tracker for training jobs (processing jobs live in the persistent queue)
 JOB_STATUS = {}
 
+# Processing jobs: fixed worker pool, state persisted in SQLite. Workers
+# start on first use, so only the process serving requests runs them (not
+# the debug reloader's parent).
+PROGRESS_BUS = ProgressBus()
+JOB_QUEUE = JobQueue(JOB_DB_PATH, BatchRunnerProcessor(CONFIG_PATH),
+                     num_workers=JOB_WORKERS, autostart=False, bus=PROGRESS_BUS)
+
 app = Flask(__name__)
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = MAX_CONTENT_LENGTH
@@ -27,127 +57,355 @@ def allowed_file(filename):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-def process_files_async(job_id, config_path):
-    """Process uploaded files asynchronously."""
-    try:
-        JOB_STATUS[job_id] = {"status": "processing", "progress": 0, "message": "Starting processing..."}
-
-        # Run the batch processing
-        result = run(config_path)
-
-        JOB_STATUS[job_id] = {
-            "status": "completed",
-            "result": result,
-            "message": f"Processing completed: {result.get('successful', 0)} successful, {result.get('failed', 0)} failed"
-        }
-
-    except Exception as e:
-        JOB_STATUS[job_id] = {"status": "error", "error": str(e)}
+def get_job_queue():
+    """Processing queue with its workers running."""
+    JOB_QUEUE.start()
+    return JOB_QUEUE
 
 @app.route('/')
 def index():
     """Main page with file upload form."""
     return render_template('index.html')
 
+def _ingest_path(job_dir, filename, taken):
+    """Output path of a normalized upload: <stem>.wav, unique within the job."""
+    stem = os.path.splitext(secure_filename(filename))[0] or 'upload'
+    name = f"{stem}.wav"
+    counter = 1
+    while name in taken:
+        name = f"{stem}_{counter}.wav"
+        counter += 1
+    taken.add(name)
+    return os.path.join(job_dir, name)
+
+def _stream_multipart(job_dir):
+    """
+    Decode the 'files' parts of a multipart request while it is being received.
+
+    Each part goes through a StreamingDecoder chunk by chunk, so only a
+    16 kHz mono WAV lands on disk and nothing is buffered in full.
+
+    Returns:
+        List of (original filename, decoder info) tuples
+    """
+    boundary = request.mimetype_params.get('boundary')
+    if request.mimetype != 'multipart/form-data' or not boundary:
+        raise StreamDecodeError("Expected a multipart/form-data upload")
+
+    parser = MultipartDecoder(boundary.encode('latin-1'))
+    decoded, taken = [], set()
+    current = None
+    try:
+        while True:
+            chunk = request.stream.read(UPLOAD_CHUNK_SIZE)
+            parser.receive_data(chunk or None)
+            event = parser.next_event()
+            while not isinstance(event, (NeedData, Epilogue)):
+                if isinstance(event, File) and event.name == 'files' and event.filename:
+                    if not allowed_file(event.filename):
+                        raise StreamDecodeError(f"Invalid file type: {event.filename}")
+                    current = (event.filename, StreamingDecoder(
+                        _ingest_path(job_dir, event.filename, taken),
+                        target_sr=INGEST_SAMPLE_RATE, filename=event.filename))
+                elif isinstance(event, Data) and current is not None:
+                    current[1].write(event.data)
+                    if not event.more_data:
+                        decoded.append((current[0], current[1].close()))
+                        current = None
+                event = parser.next_event()
+            if not chunk or isinstance(event, Epilogue):
+                break
+    except Exception:
+        if current is not None:
+            current[1].abort()
+        raise
+    return decoded
+
+def _upload_failed(job_dir, error):
+    """Remove everything a failed upload left behind and answer malformed bodies with 400."""
+    shutil.rmtree(job_dir, ignore_errors=True)
+    if isinstance(error, StreamDecodeError):
+        return jsonify({"error": str(error)}), 400
+    if isinstance(error, ValueError):
+        # werkzeug's multipart parser on a truncated or garbled body
+        return jsonify({"error": f"Malformed upload: {error}"}), 400
+    # Client disconnects and oversized bodies keep their HTTP status, anything else is a 500
+    raise error
+
+def _submit_decoded(job_id, job_dir, decoded):
+    """Queue a job for freshly decoded uploads."""
+    uploaded_files = [os.path.basename(info['path']) for _, info in decoded]
+    get_job_queue().submit(job_dir, uploaded_files, job_id=job_id)
+    return jsonify({
+        "message": f"Uploaded {len(uploaded_files)} files successfully",
+        "job_id": job_id,
+        "files": uploaded_files,
+        "uploads": [{"name": name, "file": os.path.basename(info['path']),
+                     "duration": info['duration'], "method": info['method']}
+                    for name, info in decoded]
+    })
+
 @app.route('/upload', methods=['POST'])
 def upload_files():
-    """Handle file uploads and start processing."""
-    if 'files' not in request.files:
-        return jsonify({"error": "No files provided"}), 400
+    """Handle file uploads (decoded while they arrive) and start processing."""
+    # Each job gets its own input directory, so it only processes its own uploads
+    job_id = str(uuid.uuid4())
+    job_dir = os.path.join(app.config['UPLOAD_FOLDER'], job_id)
+    os.makedirs(job_dir, exist_ok=True)
+
+    try:
+        decoded = _stream_multipart(job_dir)
+    except Exception as e:
+        return _upload_failed(job_dir, e)
 
-    files = request.files.getlist('files')
-    if not files or files[0].filename == '':
+    if not decoded:
+        shutil.rmtree(job_dir, ignore_errors=True)
         return jsonify({"error": "No files selected"}), 400
 
-    # Save uploaded files
-    uploaded_files = []
-    for file in files:
-        if file and allowed_file(file.filename):
-            filename = secure_filename(file.filename)
-            file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-            file.save(file_path)
-            uploaded_files.append(filename)
-        else:
-            return jsonify({"error": f"Invalid file type: {file.filename}"}), 400
-
-    # Start processing in background
+    # Queue processing (a fixed worker pool picks it up)
+    return _submit_decoded(job_id, job_dir, decoded)
+
+@app.route('/upload/<filename>', methods=['PUT', 'POST'])
+def upload_raw(filename):
+    """Upload one recording as the raw request body (e.g. curl -T call.mp3)."""
+    if not allowed_file(filename):
+        return jsonify({"error": f"Invalid file type: {filename}"}), 400
+
     job_id = str(uuid.uuid4())
-    config_path = "config/config.yaml"
+    job_dir = os.path.join(app.config['UPLOAD_FOLDER'], job_id)
+    os.makedirs(job_dir, exist_ok=True)
 
-    thread = threading.Thread(target=process_files_async, args=(job_id, config_path))
-    thread.daemon = True
-    thread.start()
+    decoder = StreamingDecoder(_ingest_path(job_dir, filename, set()),
+                               target_sr=INGEST_SAMPLE_RATE, filename=filename)
+    try:
+        while True:
+            chunk = request.stream.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            decoder.write(chunk)
+        info = decoder.close()
+    except Exception as e:
+        decoder.abort()
+        return _upload_failed(job_dir, e)
 
-    return jsonify({
-        "message": f"Uploaded {len(uploaded_files)} files successfully",
-        "job_id": job_id,
-        "files": uploaded_files
-    })
+    return _submit_decoded(job_id, job_dir, [(filename, info)])
 
 @app.route('/status/<job_id>')
 def get_status(job_id):
-    """Get processing status for a job."""
+    """Get processing status for a job (per-file progress for processing jobs)."""
+    job = get_job_queue().get(job_id)
+    if job is not None:
+        return jsonify(job)
+
     if job_id not in JOB_STATUS:
         return jsonify({"error": "Job not found"}), 404
 
     return jsonify(JOB_STATUS[job_id])
 
+def _sse(event_type, data, event_id=None):
+    """Format one Server-Sent Event."""
+    lines = [f"event: {event_type}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {json.dumps(data, default=str)}")
+    return "\n".join(lines) + "\n\n"
+
+@app.route('/events/<job_id>')
+def job_events(job_id):
+    """Push job, file and stage progress as Server-Sent Events until the job ends."""
+    job_queue = get_job_queue()
+    if job_queue.get(job_id) is None:
+        return jsonify({"error": "Job not found"}), 404
+
+    def stream():
+        # Subscribe before taking the snapshot, so no event falls in between
+        with job_queue.bus.subscribe(job_id, replay=False) as subscription:
+            snapshot = job_queue.get(job_id)
+            yield _sse("snapshot", snapshot)
+            if snapshot["status"] in (JOB_COMPLETED, JOB_ERROR, JOB_CANCELLED):
+                return
+
+            while True:
+                event = subscription.get(timeout=SSE_KEEPALIVE_SECONDS)
+                if event is None:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield _sse(event["type"], event, event["seq"])
+                if event["type"] == "job" and event.get("status") in (JOB_COMPLETED, JOB_ERROR, JOB_CANCELLED):
+                    return
+
+    return Response(stream(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/cancel/<job_id>', methods=['POST'])
+def cancel_job(job_id):
+    """Cancel a queued or running processing job."""
+    job = get_job_queue().cancel(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job)
+
+@app.route('/jobs')
+def list_jobs():
+    """Recent processing jobs."""
+    return jsonify({"jobs": get_job_queue().list_jobs()})
+
+def get_dataset_index():
+    """Dataset index, synced with the dataset directory once per process.
+
+    Samples written afterwards are indexed by the dataset sink as they are saved.
+    """
+    global DATASET_INDEX_SYNCED
+    index = get_shared_dataset_index(index_path_for(DATASET_DIR))
+    if not DATASET_INDEX_SYNCED:
+        index.sync(DATASET_DIR)
+        DATASET_INDEX_SYNCED = True
+    return index
+
+def _browse_dataset(label):
+    """One page of dataset samples for the request's query parameters."""
+    args = request.args
+    limit = min(args.get('limit', DATASET_PAGE_SIZE, type=int), DATASET_MAX_PAGE_SIZE)
+    filters = {name: args.get(name, type=float) for name in RANGE_FILTERS}
+    try:
+        page = get_dataset_index().query(
+            label=label,
+            sort=args.get('sort', 'confidence'),
+            order=args.get('order', 'desc'),
+            limit=limit,
+            cursor=args.get('cursor'),
+            **filters
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    files = [{
+        "name": item["file"],
+        "label": item["label"],
+        "size": item["size"],
+        "url": f"/audio/{item['label']}/{item['file']}",
+        "confidence": item["confidence"],
+        "quality_score": item["quality_score"],
+        "duration": item["duration"],
+        "source": item["source"]
+    } for item in page["items"]]
+    return jsonify({"files": files, "next_cursor": page["next_cursor"]})
+
+@app.route('/dataset')
+def get_dataset():
+    """Browse samples of all labels (or ?label=...), filtered, sorted and paginated."""
+    return _browse_dataset(request.args.get('label'))
+
 @app.route('/dataset/<label>')
 def get_dataset_files(label):
-    """Get files in a dataset category."""
+    """Browse samples of one label, filtered, sorted and paginated.
+
+    Query parameters: sort (confidence, quality_score, duration, snr, pitch,
+    file), order (asc/desc), limit, cursor (next_cursor of the previous
+    page), min_/max_confidence, min_/max_quality, min_/max_duration.
+    """
+    if not os.path.isdir(os.path.join(DATASET_DIR, label)):
+        return jsonify({"error": "Dataset category not found"}), 404
+    return _browse_dataset(label)
+
+@app.route('/dataset-summary')
+def get_dataset_summary():
+    """Per-label counts and averages from the metadata table."""
     try:
-        dataset_dir = f"data/voice_dataset/{label}"
-        if not os.path.exists(dataset_dir):
-            return jsonify({"error": "Dataset category not found"}), 404
-
-        files = []
-        for file in os.listdir(dataset_dir):
-            if file.endswith('.wav'):
-                file_path = os.path.join(dataset_dir, file)
-                size = os.path.getsize(file_path)
-
-                # Parse metadata from filename
-                parts = file.replace('.wav', '').split('_')
-                confidence = 0
-                for part in parts:
-                    if part.startswith('conf'):
-                        confidence = int(part[4:])
-
-                files.append({
-                    "name": file,
-                    "size": size,
-                    "url": f"/audio/{label}/{file}",
-                    "confidence": confidence
-                })
-
-        # Sort by confidence descending
-        files.sort(key=lambda x: x['confidence'], reverse=True)
-        return jsonify({"files": files})
+        df = read_metadata("data/voice_dataset/metadata.csv",
+                           columns=["label", "confidence", "duration", "quality_score"])
+    except FileNotFoundError:
+        return jsonify({"labels": {}, "total": 0})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+    grouped = df.groupby("label").agg(
+        count=("label", "size"),
+        avg_confidence=("confidence", "mean"),
+        total_duration=("duration", "sum"),
+        avg_quality=("quality_score", "mean")
+    )
+    return jsonify({
+        "labels": {label: {k: float(v) for k, v in row.items()} for label, row in grouped.iterrows()},
+        "total": int(len(df))
+    })
+
 @app.route('/audio/<label>/<filename>')
 def get_audio_file(label, filename):
-    """Serve audio files for preview."""
+    """Serve a sample; Range requests are answered with 206, so players can seek."""
     try:
-        return send_from_directory(f"data/voice_dataset/{label}", filename)
+        # Absolute directory: Flask resolves relative ones against the app
+        # package, not the working directory the dataset lives in
+        return send_from_directory(os.path.abspath(DATASET_DIR), f"{label}/{filename}",
+                                   conditional=True, max_age=AUDIO_MAX_AGE)
     except Exception as e:
         return jsonify({"error": str(e)}), 404
 
+def get_preview_cache():
+    """Preview renditions cache (dataset.previews settings from the config)."""
+    global PREVIEW_CACHE
+    if PREVIEW_CACHE is None:
+        try:
+            with open(CONFIG_PATH) as f:
+                cfg = yaml.safe_load(f) or {}
+        except OSError:
+            cfg = {}
+        PREVIEW_CACHE = create_preview_cache(cfg, os.path.abspath(DATASET_DIR))
+    return PREVIEW_CACHE
+
+def _sample_exists(label, filename):
+    path = safe_join(os.path.abspath(DATASET_DIR), label, filename)
+    return path is not None and os.path.isfile(path)
+
+@app.route('/preview/<label>/<filename>')
+def get_audio_preview(label, filename):
+    """Short compressed preview clip of a sample (?format=opus|mp3), rendered once."""
+    if not _sample_exists(label, filename):
+        return jsonify({"error": "Sample not found"}), 404
+    previews = get_preview_cache()
+    fmt = request.args.get('format', previews.fmt)
+    if fmt not in PREVIEW_FORMATS:
+        return jsonify({"error": f"Unknown preview format: {fmt}"}), 400
+    try:
+        path = previews.get_clip(label, filename, fmt)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    return send_file(path, mimetype=previews.mimetype(fmt), conditional=True, max_age=AUDIO_MAX_AGE)
+
+@app.route('/peaks/<label>/<filename>')
+def get_audio_peaks(label, filename):
+    """Waveform peaks ([[min, max], ...]) of a sample, computed once."""
+    if not _sample_exists(label, filename):
+        return jsonify({"error": "Sample not found"}), 404
+    try:
+        return jsonify(get_preview_cache().get_peaks(label, filename))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 @app.route('/train-ml', methods=['POST'])
 def train_ml_classifier():
-    """Train the ML classifier using current dataset."""
+    """
+    Train the ML classifier using current dataset.
+
+    mode 'full' (default) retrains from scratch; mode 'incremental' only
+    learns from samples added since the live model version. Either way the
+    result is published as a new version that running classifiers swap in.
+    """
     try:
         from train_ml_classifier import train_ml_classifier as train_func
+        from classification.ml_classifier import update_ml_classifier
 
         # Get parameters from request
         data = request.get_json() or {}
         min_confidence = data.get('min_confidence', 70.0)
         force_retrain = data.get('force', False)
+        mode = data.get('mode', 'full')
+        if mode not in ('full', 'incremental'):
+            return jsonify({"error": "mode must be 'full' or 'incremental'"}), 400
 
         # Check if model exists and force is not set
         model_path = "models/ml_gender_classifier.pkl"
-        if os.path.exists(model_path) and not force_retrain:
+        if mode == 'full' and os.path.exists(model_path) and not force_retrain:
             return jsonify({
                 "error": "Model already exists. Use force=true to retrain."
             }), 400
@@ -164,14 +422,20 @@ def train_ml_classifier():
                 }
 
                 # Train the classifier
-                results = train_func(
-                    min_confidence=min_confidence
-                )
-
+                if mode == 'incremental':
+                    results = update_ml_classifier(model_path=model_path, min_confidence=min_confidence)
+                else:
+                    results = train_func(min_confidence=min_confidence)
+
+                if results.get('status') == 'up_to_date':
+                    message = f"Model version {results['version']} is up to date"
+                else:
+                    message = (f"Training completed with {results['accuracy']:.1%} accuracy "
+                               f"(model version {results['version']})")
                 JOB_STATUS[job_id] = {
                     "status": "completed",
                     "results": results,
-                    "message": f"Training completed with {results['accuracy']:.1%} accuracy"
+                    "message": message
                 }
 
             except Exception as e:
@@ -185,7 +449,7 @@ def train_ml_classifier():
         thread.start()
 
         return jsonify({
-            "message": "ML classifier training started",
+            "message": f"ML classifier training started ({mode})",
             "job_id": job_id
         })
 
@@ -0,0 +1,42 @@
+import unittest
+import os
+import tempfile
+import shutil
+import numpy as np
+import soundfile as sf
+
+from preprocessing.audio_probe import probe_audio, probe_files
+
+
+class TestAudioProbe(unittest.TestCase):
+    """Header-only duration probing."""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.paths = []
+        for i, fmt in enumerate(['wav', 'flac', 'ogg']):
+            path = os.path.join(self.test_dir, f'test_{i}.{fmt}')
+            sf.write(path, np.zeros(16000 * (i + 1), dtype=np.float32), 16000)
+            self.paths.append(path)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_probe_reads_header(self):
+        info = probe_audio(self.paths[1])
+        self.assertEqual(info['method'], 'soundfile')
+        self.assertAlmostEqual(info['duration'], 2.0, places=2)
+        self.assertEqual(info['sample_rate'], 16000)
+        self.assertEqual(info['format'], 'flac')
+
+    def test_probe_files_keeps_order_and_skips_unreadable(self):
+        broken = os.path.join(self.test_dir, 'broken.wav')
+        with open(broken, 'wb') as f:
+            f.write(b'not audio')
+        results = probe_files(self.paths + [broken], max_workers=4)
+        self.assertEqual([r['path'] for r in results], self.paths)
+        self.assertEqual([round(r['duration']) for r in results], [1, 2, 3])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+import unittest
+import os
+import json
+import tempfile
+import shutil
+import numpy as np
+import soundfile as sf
+
+from pipeline.batch_organizer import BatchOrganizer, place_file
+from pipeline.batch_processor import IntegratedBatchProcessor
+from pipeline.scan_index import ScanIndex
+
+
+class RecordingDiarizer:
+    """Stands in for EnhancedSpeakerDiarizer, recording processed files"""
+
+    def __init__(self):
+        self.processed = []
+
+    def process_audio_file(self, audio_path, output_base_dir, organize_by_gender=True):
+        self.processed.append(audio_path)
+        return {'audio_path': audio_path}
+
+
+class TestBatchLinkModes(unittest.TestCase):
+    """Batch organization without copying audio."""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.input_dir = os.path.join(self.test_dir, 'input')
+        os.makedirs(self.input_dir)
+        for i in range(3):
+            sf.write(os.path.join(self.input_dir, f'call_{i}.wav'),
+                     np.zeros(16000 * (i + 1), dtype=np.float32), 16000)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_hardlink_shares_inode(self):
+        src = os.path.join(self.input_dir, 'call_0.wav')
+        dst = os.path.join(self.test_dir, 'linked.wav')
+        used = place_file(src, dst, 'hardlink')
+        if used == 'hardlink':
+            self.assertTrue(os.path.samefile(src, dst))
+        else:
+            self.assertEqual(used, 'copy')
+            self.assertTrue(os.path.exists(dst))
+
+    def test_manifest_batches_read_source_paths(self):
+        organizer = BatchOrganizer({'link_mode': 'manifest'})
+        result = organizer.organize_directory(self.input_dir, os.path.join(self.test_dir, 'batches'))
+        batch_folder = result['batch_folders'][0]
+
+        self.assertEqual(os.listdir(batch_folder), ['batch_metadata.json'])
+        with open(os.path.join(batch_folder, 'batch_metadata.json')) as f:
+            self.assertEqual(json.load(f)['link_mode'], 'manifest')
+
+        processor = IntegratedBatchProcessor.__new__(IntegratedBatchProcessor)
+        files = processor.get_batch_files(batch_folder)
+        self.assertEqual(sorted(os.path.basename(f) for f in files), ['call_0.wav', 'call_1.wav', 'call_2.wav'])
+        self.assertTrue(all(os.path.exists(f) for f in files))
+
+    def test_manifest_rerun_skips_processed_files(self):
+        # A relative input dir, as given on the command line
+        input_dir = os.path.relpath(self.input_dir)
+        batches_dir = os.path.join(self.test_dir, 'batches')
+        index = ScanIndex(os.path.join(self.test_dir, 'scan_index.sqlite'))
+        try:
+            organizer = BatchOrganizer({'link_mode': 'manifest'})
+            batch_folder = organizer.organize_directory(input_dir, batches_dir, index=index)['batch_folders'][0]
+
+            diarizer = RecordingDiarizer()
+            processor = IntegratedBatchProcessor(diarizer, {}, index=index)
+            first = processor.process_batch_folder(batch_folder, os.path.join(self.test_dir, 'output'))
+            self.assertEqual((first['successful'], first['skipped']), (3, 0))
+
+            second = processor.process_batch_folder(batch_folder, os.path.join(self.test_dir, 'output'))
+            self.assertEqual((second['total_files'], second['skipped']), (0, 3))
+            self.assertEqual(len(diarizer.processed), 3)
+            self.assertEqual(index.counts(), {'done': 3})
+        finally:
+            index.close()
+
+    def test_stale_copy_of_changed_input_is_not_reprocessed(self):
+        batches_dir = os.path.join(self.test_dir, 'batches')
+        output_dir = os.path.join(self.test_dir, 'output')
+        index = ScanIndex(os.path.join(self.test_dir, 'scan_index.sqlite'))
+        diarizer = RecordingDiarizer()
+        processor = IntegratedBatchProcessor(diarizer, {}, index=index)
+        organizer = BatchOrganizer({'link_mode': 'copy'})
+
+        def run():
+            folders = organizer.organize_directory(self.input_dir, batches_dir, index=index).get('batch_folders', [])
+            for folder in sorted(os.path.join(batches_dir, d) for d in os.listdir(batches_dir) if d.startswith('batch_')):
+                processor.process_batch_folder(folder, output_dir)
+            return folders
+
+        try:
+            first_batch = run()[0]
+            self.assertEqual(len(diarizer.processed), 3)
+
+            # Rewrite one input: it is organized into a new batch folder
+            sf.write(os.path.join(self.input_dir, 'call_1.wav'), np.ones(8000, dtype=np.float32) * 0.1, 16000)
+            new_batch = run()[0]
+            self.assertNotEqual(new_batch, first_batch)
+            self.assertEqual(diarizer.processed[3:], [os.path.join(new_batch, 'call_1.wav')])
+
+            # The old copy is left in the first batch but never processed again
+            self.assertTrue(os.path.exists(os.path.join(first_batch, 'call_1.wav')))
+            run()
+            self.assertEqual(len(diarizer.processed), 4)
+        finally:
+            index.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+import random
+
+from pipeline.batch_scheduler import schedule_batches
+
+
+class TestBatchScheduler(unittest.TestCase):
+    """Bin-packing honors the configured limits and keeps every file."""
+
+    def setUp(self):
+        rng = random.Random(0)
+        self.files = [{'path': f'call_{i}.wav', 'duration': rng.uniform(5, 300)} for i in range(500)]
+
+    def test_limits_and_coverage(self):
+        batches = schedule_batches(self.files, batch_size_minutes=10, files_per_batch=8)
+
+        scheduled = [f['path'] for batch in batches for f in batch]
+        self.assertEqual(sorted(scheduled), sorted(f['path'] for f in self.files))
+        for batch in batches:
+            self.assertLessEqual(len(batch), 8)
+            self.assertLessEqual(sum(f['duration'] for f in batch), 600 + 1e-6)
+
+        totals = [sum(f['duration'] for f in batch) for batch in batches]
+        self.assertEqual(totals, sorted(totals, reverse=True))
+
+    def test_memory_budget_and_oversized_files(self):
+        files = self.files + [{'path': 'long.wav', 'duration': 7200}]
+        batches = schedule_batches(files, batch_size_minutes=10, files_per_batch=50,
+                                   max_batch_memory_mb=100, memory_mb_per_second=0.5)
+        self.assertEqual([f['path'] for f in batches[0]], ['long.wav'])
+        for batch in batches:
+            # Only a single file may exceed the budget (it gets a batch of its own)
+            if len(batch) > 1:
+                self.assertLessEqual(sum(f['duration'] for f in batch) * 0.5, 100 + 1e-6)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+import unittest
+import os
+import tempfile
+import shutil
+import numpy as np
+import pandas as pd
+import soundfile as sf
+
+from dataset.index import DatasetIndex, _sort_key
+from dataset.sinks import DatasetSink
+from dataset import organizer
+
+
+def page_through(index, **kwargs):
+    items, cursor = [], None
+    while True:
+        page = index.query(cursor=cursor, **kwargs)
+        items.extend(page['items'])
+        cursor = page['next_cursor']
+        if cursor is None:
+            return items
+
+
+class TestDatasetIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.index = DatasetIndex(os.path.join(self.test_dir, 'index.sqlite'))
+        rng = np.random.default_rng(0)
+        rows = []
+        for i in range(57):
+            # Repeated confidences and some missing values exercise the tie-break
+            confidence = None if i % 10 == 0 else float(rng.integers(50, 60))
+            rows.append(('male' if i % 3 else 'female', f'voice_sample_{i:04d}.wav',
+                         {'confidence': confidence, 'quality_score': float(i), 'duration': 1.0 + i % 5,
+                          'source': 'call.wav'}, 1000 + i))
+        self.index.add_many(rows)
+
+    def tearDown(self):
+        self.index.close()
+        shutil.rmtree(self.test_dir)
+
+    def test_cursor_pages_cover_everything_in_order(self):
+        for sort in ('confidence', 'duration', 'file', 'id'):
+            for order in ('asc', 'desc'):
+                items = page_through(self.index, label='male', sort=sort, order=order, limit=7)
+                self.assertEqual(len(items), self.index.count('male'))
+                self.assertEqual(len({item['id'] for item in items}), len(items))
+
+                key = (lambda item: (item[sort] if item[sort] is not None else -1e308, item['id']))
+                self.assertEqual(items, sorted(items, key=key, reverse=order == 'desc'))
+
+    def test_filters(self):
+        items = page_through(self.index, min_confidence=55, max_duration=2.0, limit=5)
+        self.assertTrue(items)
+        for item in items:
+            self.assertGreaterEqual(item['confidence'], 55)
+            self.assertLessEqual(item['duration'], 2.0)
+        self.assertEqual(len(items), self.index.count(min_confidence=55, max_duration=2.0))
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            self.index.query(sort='size; DROP TABLE samples')
+        with self.assertRaises(ValueError):
+            self.index.query(cursor='garbage')
+        with self.assertRaises(ValueError):
+            self.index.query(min_size=3)
+
+    def test_sorted_pages_use_an_index(self):
+        for label, sort in (('male', 'confidence'), (None, 'quality_score'), ('female', 'file')):
+            where = "WHERE label = 'male'" if label else ""
+            key = _sort_key(sort)
+            plan = self.index._conn.execute(
+                f"EXPLAIN QUERY PLAN SELECT * FROM samples {where} ORDER BY {key} DESC, id DESC LIMIT 10"
+            ).fetchall()
+            plan = ' '.join(row[-1] for row in plan)
+            self.assertNotIn('TEMP B-TREE', plan, (label, sort, plan))
+
+
+class TestIndexSync(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.dataset_dir = os.path.join(self.test_dir, 'voice_dataset')
+        self.audio = np.zeros(1600, dtype=np.float32)
+        self.saved_counter = organizer.COUNTER_FILE
+        organizer.COUNTER_FILE = os.path.join(self.dataset_dir, '.counter.json')
+
+    def tearDown(self):
+        organizer.COUNTER_FILE = self.saved_counter
+        shutil.rmtree(self.test_dir)
+
+    def test_sink_records_saved_filename(self):
+        sink = DatasetSink(self.dataset_dir, index_path=os.path.join(self.test_dir, 'index.sqlite'))
+        saved, _ = sink.add(self.audio, 16000, 'female', 'call_vocals_genderF_conf91.wav',
+                            {'file': 'call_vocals_genderF_conf91.wav', 'label': 'female', 'confidence': 91.0})
+        sink.flush()
+
+        self.assertTrue(saved.startswith('voice_sample_'))
+        self.assertEqual(pd.read_csv(sink.metadata_path).iloc[0]['file'], saved)
+        item = sink.index.query(label='female')['items'][0]
+        self.assertEqual((item['file'], item['confidence']), (saved, 91.0))
+        self.assertEqual(item['size'], os.path.getsize(os.path.join(self.dataset_dir, 'female', saved)))
+
+    def test_sync_builds_from_metadata_and_files(self):
+        os.makedirs(os.path.join(self.dataset_dir, 'male'))
+        for name in ('voice_sample_0001.wav', 'voice_sample_0002.wav'):
+            sf.write(os.path.join(self.dataset_dir, 'male', name), self.audio, 16000)
+        pd.DataFrame([
+            {'file': 'voice_sample_0001.wav', 'label': 'male', 'confidence': 77.0, 'quality_score': 60.0},
+            {'file': 'voice_sample_0009.wav', 'label': 'male', 'confidence': 99.0, 'quality_score': 90.0},
+        ]).to_csv(os.path.join(self.dataset_dir, 'metadata.csv'), index=False)
+
+        index = DatasetIndex(os.path.join(self.test_dir, 'index.sqlite'))
+        self.assertEqual(index.sync(self.dataset_dir), 2)
+        items = {item['file']: item for item in index.query(label='male')['items']}
+        self.assertEqual(items['voice_sample_0001.wav']['confidence'], 77.0)
+        self.assertIsNone(items['voice_sample_0002.wav']['confidence'])
+
+        # Unchanged dataset: nothing to do; deleted file: dropped from the index
+        self.assertEqual(index.sync(self.dataset_dir), -1)
+        os.remove(os.path.join(self.dataset_dir, 'male', 'voice_sample_0002.wav'))
+        self.assertEqual(index.sync(self.dataset_dir, force=True), 1)
+        index.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+import unittest
+import os
+import json
+import tempfile
+import shutil
+import numpy as np
+import soundfile as sf
+from types import SimpleNamespace
+
+from diarization.enhanced_diarizer import EnhancedSpeakerDiarizer
+
+
+class FakeAnnotation:
+    """Minimal pyannote Annotation stand-in."""
+
+    def __init__(self, turns):
+        self.turns = turns
+
+    def itertracks(self, yield_label=False):
+        for start, end, speaker in self.turns:
+            yield SimpleNamespace(start=start, end=end), None, speaker
+
+
+class FakePipeline:
+    def __init__(self, turns):
+        self.turns = turns
+        self.inputs = []
+
+    def __call__(self, audio, **kwargs):
+        self.inputs.append(audio)
+        return FakeAnnotation(self.turns)
+
+
+class TestInMemorySegments(unittest.TestCase):
+    """In-memory mode writes each segment once, straight to its gender folder."""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        sr = 16000
+        t = np.arange(sr * 2) / sr
+        low = 0.5 * np.sin(2 * np.pi * 110 * t)
+        high = 0.5 * np.sin(2 * np.pi * 220 * t)
+        self.audio = np.concatenate([low, high, low]).astype(np.float32)
+        self.sr = sr
+        self.input_path = os.path.join(self.test_dir, "call.wav")
+        sf.write(self.input_path, self.audio, sr, subtype='FLOAT')
+
+        self.turns = [(0.0, 2.0, 'SPEAKER_00'), (2.0, 4.0, 'SPEAKER_01'), (4.0, 6.0, 'SPEAKER_00')]
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def make_diarizer(self, in_memory, speaker_level=True):
+        diarizer = EnhancedSpeakerDiarizer({'in_memory_segments': in_memory,
+                                            'speaker_level_gender': speaker_level})
+        diarizer.pipeline = FakePipeline(self.turns)
+        return diarizer
+
+    def test_slices_are_views(self):
+        diarizer = self.make_diarizer(True)
+        result = {'segments': [{'speaker': s, 'start': a, 'end': b, 'duration': b - a}
+                               for a, b, s in self.turns]}
+        segments = diarizer.slice_speaker_segments(self.audio, self.sr, result, 'call')
+        self.assertEqual(len(segments), 3)
+        for segment in segments:
+            self.assertTrue(np.shares_memory(segment['audio'], self.audio))
+            self.assertIsNone(segment['segment_path'])
+
+    def test_process_writes_once_to_gender_folders(self):
+        diarizer = self.make_diarizer(True)
+        output_dir = os.path.join(self.test_dir, 'out')
+        metadata = diarizer.process_audio_file(self.input_path, output_dir)
+
+        # Waveform was handed to the pipeline, not the path
+        self.assertIsInstance(diarizer.pipeline.inputs[0], dict)
+        self.assertFalse(os.path.exists(os.path.join(output_dir, 'segments')))
+
+        genders = [segment['gender'] for segment in metadata['segments']]
+        self.assertEqual(genders, ['male', 'female', 'male'])
+        for segment in metadata['segments']:
+            self.assertNotIn('audio', segment)
+            self.assertTrue(os.path.isfile(segment['segment_path']))
+            self.assertEqual(os.path.basename(os.path.dirname(segment['segment_path'])), segment['gender'])
+
+        # Output audio matches the original slices
+        written, sr = sf.read(metadata['segments'][1]['segment_path'], dtype='float32')
+        self.assertEqual(sr, self.sr)
+        np.testing.assert_allclose(written, self.audio[2 * self.sr:4 * self.sr])
+
+        with open(os.path.join(output_dir, 'metadata.json')) as f:
+            self.assertEqual(len(json.load(f)['segments']), 3)
+
+    def test_matches_file_mode(self):
+        in_memory = self.make_diarizer(True, speaker_level=False).process_audio_file(
+            self.input_path, os.path.join(self.test_dir, 'mem'))
+        on_disk = self.make_diarizer(False, speaker_level=False).process_audio_file(
+            self.input_path, os.path.join(self.test_dir, 'disk'))
+
+        for a, b in zip(in_memory['segments'], on_disk['segments']):
+            self.assertEqual(a['gender'], b['gender'])
+            self.assertAlmostEqual(a['gender_confidence'], b['gender_confidence'], places=5)
+
+
+class TestSpeakerLevelGender(unittest.TestCase):
+    """All turns of a speaker share one pooled gender decision."""
+
+    def setUp(self):
+        self.sr = 16000
+        self.diarizer = EnhancedSpeakerDiarizer({'speaker_gender_max_seconds': 5.0})
+
+    def tone(self, f0, duration):
+        t = np.arange(int(self.sr * duration)) / self.sr
+        return (0.5 * np.sin(2 * np.pi * f0 * t)).astype(np.float32)
+
+    def segment(self, speaker, audio):
+        return {'speaker': speaker, 'audio': audio, 'sample_rate': self.sr,
+                'duration': len(audio) / self.sr}
+
+    def test_one_decision_per_speaker(self):
+        # SPEAKER_00 has one short ambiguous turn among clearly low ones
+        segments = [
+            self.segment('SPEAKER_00', self.tone(110, 2.0)),
+            self.segment('SPEAKER_00', self.tone(175, 0.5)),
+            self.segment('SPEAKER_00', self.tone(115, 1.5)),
+            self.segment('SPEAKER_01', self.tone(230, 1.0)),
+        ]
+        decisions = self.diarizer.classify_speakers(segments)
+        self.assertEqual(set(decisions), {'SPEAKER_00', 'SPEAKER_01'})
+        self.assertEqual(decisions['SPEAKER_00']['gender'], 'male')
+        self.assertEqual(decisions['SPEAKER_01']['gender'], 'female')
+        self.assertEqual(self.diarizer.classify_speaker_gender(segments[1]['audio'], self.sr)[0], 'female')
+
+    def test_pooled_audio_is_capped(self):
+        segments = [self.segment('SPEAKER_00', self.tone(120, 3.0)) for _ in range(4)]
+        decision = self.diarizer.classify_speakers(segments)['SPEAKER_00']
+        self.assertAlmostEqual(decision['pooled_seconds'], 5.0)
+
+    def test_unvoiced_speaker_is_ambiguous(self):
+        segments = [self.segment('SPEAKER_00', np.zeros(self.sr, dtype=np.float32))]
+        decision = self.diarizer.classify_speakers(segments)['SPEAKER_00']
+        self.assertEqual(decision['voiced_frames'], 0)
+        self.assertEqual(decision['confidence'], 0.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
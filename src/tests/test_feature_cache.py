@@ -0,0 +1,151 @@
+import unittest
+import os
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+import soundfile as sf
+
+from classification import feature_cache as cache_module
+from classification.feature_cache import FeatureCache, build_feature_matrix
+from classification import ml_gender_classifier_v3
+
+
+class CountingExtractor:
+    """Feature rows from the first samples of each file, counting calls"""
+
+    def __init__(self):
+        self.extracted = []
+
+    def __call__(self, paths, sample_rate):
+        rows = []
+        for path in paths:
+            self.extracted.append(path)
+            try:
+                audio, _ = sf.read(path, frames=4)
+                rows.append(np.asarray(audio, dtype=np.float64))
+            except Exception:
+                rows.append(None)
+        return ['a', 'b', 'c', 'd'], rows
+
+
+class TestFeatureCache(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.test_dir, 'cache')
+        self.sr = 16000
+        self.paths = [self.write(f'sample_{i}.wav', 0.1 * (i + 1)) for i in range(5)]
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def write(self, name, value):
+        path = os.path.join(self.test_dir, name)
+        sf.write(path, np.full(self.sr, value, dtype=np.float32), self.sr, subtype='FLOAT')
+        return path
+
+    def matrix(self, paths, version=1):
+        extract = CountingExtractor()
+        with FeatureCache(self.cache_dir, 'test', version, self.sr) as cache:
+            X, valid, columns = cache.matrix(paths, extract, num_workers=1)
+        return X, valid, columns, extract.extracted
+
+    def test_retrain_only_extracts_new_files(self):
+        X, valid, columns, extracted = self.matrix(self.paths)
+        self.assertEqual(extracted, self.paths)
+        self.assertEqual(columns, ['a', 'b', 'c', 'd'])
+        np.testing.assert_allclose(X[:, 0], [0.1, 0.2, 0.3, 0.4, 0.5], rtol=1e-6)
+
+        new = self.write('sample_new.wav', 0.9)
+        copy = os.path.join(self.test_dir, 'copy_of_0.wav')
+        shutil.copy(self.paths[0], copy)
+        missing = os.path.join(self.test_dir, 'missing.wav')
+
+        X2, valid2, _, extracted = self.matrix(self.paths + [new, copy, missing])
+        # The copy has the same content hash as sample_0: nothing to extract
+        self.assertEqual(extracted, [new])
+        self.assertEqual(list(valid2), [0, 1, 2, 3, 4, 5, 6])
+        np.testing.assert_array_equal(X2[:5], X)
+        np.testing.assert_array_equal(X2[6], X[0])
+
+    def test_changed_file_and_version_bump(self):
+        self.matrix(self.paths)
+        self.write('sample_2.wav', 0.7)
+        X, _, _, extracted = self.matrix(self.paths)
+        self.assertEqual(extracted, [self.paths[2]])
+        self.assertAlmostEqual(X[2, 0], 0.7, places=6)
+
+        _, _, _, extracted = self.matrix(self.paths, version=2)
+        self.assertEqual(extracted, self.paths)
+
+    def test_pool_matches_inline_and_cache(self):
+        t = np.arange(self.sr) / self.sr
+        paths = []
+        for i in range(4):
+            path = os.path.join(self.test_dir, f'voice_{i}.wav')
+            sf.write(path, 0.3 * np.sin(2 * np.pi * (110 + 40 * i) * t), self.sr)
+            paths.append(path)
+
+        extract = ml_gender_classifier_v3.extract_feature_rows
+        inline, _, columns = build_feature_matrix(paths, extract, 'gender_v3', 1, self.sr, num_workers=1)
+
+        saved = cache_module.MIN_FILES_FOR_POOL
+        cache_module.MIN_FILES_FOR_POOL = 2
+        try:
+            pooled, valid, pooled_columns = build_feature_matrix(paths, extract, 'gender_v3', 1, self.sr,
+                                                                 cache_dir=self.cache_dir, num_workers=2,
+                                                                 chunk_size=2)
+        finally:
+            cache_module.MIN_FILES_FOR_POOL = saved
+        np.testing.assert_array_equal(pooled, inline)
+        self.assertEqual(pooled_columns, columns)
+        self.assertEqual(list(valid), [0, 1, 2, 3])
+
+        cached, _, _ = build_feature_matrix(paths, extract, 'gender_v3', 1, self.sr, cache_dir=self.cache_dir)
+        np.testing.assert_array_equal(cached, inline)
+
+
+class TestTrainingDataCache(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.sr = 16000
+        t = np.arange(self.sr) / self.sr
+        rows = []
+        for i in range(6):
+            label = 'male' if i % 2 else 'female'
+            os.makedirs(os.path.join(self.test_dir, label), exist_ok=True)
+            name = f'voice_sample_{i:04d}.wav'
+            f0 = 110 if label == 'male' else 210
+            sf.write(os.path.join(self.test_dir, label, name),
+                     0.3 * np.sin(2 * np.pi * (f0 + 5 * i) * t), self.sr)
+            rows.append({'file': name, 'label': label, 'confidence': 90.0})
+        rows.append({'file': 'voice_sample_0099.wav', 'label': 'male', 'confidence': 90.0})
+        self.metadata = os.path.join(self.test_dir, 'metadata.csv')
+        pd.DataFrame(rows).to_csv(self.metadata, index=False)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_load_training_data_uses_cache(self):
+        from classification.ml_classifier import MLGenderClassifier
+
+        classifier = MLGenderClassifier(self.sr)
+        cache_dir = os.path.join(self.test_dir, 'feature_cache')
+        X, y = classifier.load_training_data(self.metadata, self.test_dir, cache_dir=cache_dir, num_workers=1)
+        self.assertEqual(X.shape, (6, len(classifier.feature_names)))
+        self.assertEqual(list(y), [0, 1, 0, 1, 0, 1])
+
+        audio, _ = sf.read(os.path.join(self.test_dir, 'male', 'voice_sample_0003.wav'))
+        np.testing.assert_allclose(X[3], classifier.extract_features(audio))
+
+        with FeatureCache(cache_dir, 'ml_classifier', 1, self.sr) as cache:
+            self.assertEqual(cache.columns(), classifier.feature_names)
+        X2, y2 = classifier.load_training_data(self.metadata, self.test_dir, cache_dir=cache_dir, num_workers=1)
+        np.testing.assert_array_equal(X2, X)
+        np.testing.assert_array_equal(y2, y)
+
+
+if __name__ == '__main__':
+    unittest.main()
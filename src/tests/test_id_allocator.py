@@ -0,0 +1,55 @@
+import unittest
+import os
+import json
+import tempfile
+import shutil
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from dataset.id_allocator import BlockIdAllocator
+
+
+def allocate_ids(counter_file, count):
+    """Allocate count IDs from a fresh allocator (runs in a worker process)."""
+    allocator = BlockIdAllocator(counter_file, block_size=7)
+    return [allocator.next_id() for _ in range(count)]
+
+
+class TestBlockIdAllocator(unittest.TestCase):
+    """IDs must never repeat across threads or processes."""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.counter_file = os.path.join(self.test_dir, '.counter.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_sequential_and_persisted(self):
+        allocator = BlockIdAllocator(self.counter_file, block_size=10)
+        self.assertEqual([allocator.next_id() for _ in range(3)], [1, 2, 3])
+        # A whole block is reserved on disk, the unused tail is handed back on release
+        self.assertEqual(allocator.current(), 10)
+        allocator.release()
+        self.assertEqual(json.load(open(self.counter_file))['counter'], 3)
+        self.assertEqual(BlockIdAllocator(self.counter_file).next_id(), 4)
+
+    def test_unique_across_threads_and_processes(self):
+        allocator = BlockIdAllocator(self.counter_file, block_size=7)
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            thread_ids = list(executor.map(lambda _: allocator.next_id(), range(300)))
+        with ProcessPoolExecutor(max_workers=3) as executor:
+            process_ids = sum(executor.map(allocate_ids, [self.counter_file] * 4, [25] * 4), [])
+
+        all_ids = thread_ids + process_ids
+        self.assertEqual(len(set(all_ids)), len(all_ids))
+
+    def test_reset(self):
+        allocator = BlockIdAllocator(self.counter_file)
+        allocator.next_id()
+        allocator.reset()
+        self.assertEqual(allocator.current(), 0)
+        self.assertEqual(allocator.next_id(), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
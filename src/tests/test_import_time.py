@@ -0,0 +1,65 @@
+import unittest
+import os
+import sys
+import json
+import subprocess
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPO_DIR = os.path.dirname(SRC_DIR)
+
+# Modules that must stay importable without loading model backends
+LIGHT_MODULES = [
+    'src',
+    'src.pipeline',
+    'diarization',
+    'classification',
+    'engine.batch_runner',
+    'dataset.metadata',
+    'utils.model_registry',
+]
+
+HEAVY_BACKENDS = ['torch', 'torchaudio', 'demucs', 'pyannote', 'sklearn', 'pandas']
+
+# Wall-clock budget for importing all LIGHT_MODULES in a fresh interpreter
+IMPORT_BUDGET_SECONDS = 1.0
+
+PROBE = """
+import sys, time, json
+start = time.perf_counter()
+for name in {modules!r}:
+    __import__(name)
+elapsed = time.perf_counter() - start
+print(json.dumps({{"elapsed": elapsed,
+                  "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+class TestImportBudget(unittest.TestCase):
+    """Importing the package must not pull in torch, demucs, pyannote or sklearn."""
+
+    def run_probe(self, modules):
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join([SRC_DIR, REPO_DIR]))
+        output = subprocess.run(
+            [sys.executable, '-c', PROBE.format(modules=modules, heavy=HEAVY_BACKENDS)],
+            cwd=REPO_DIR, env=env, capture_output=True, text=True, check=True
+        ).stdout
+        return json.loads(output.strip().splitlines()[-1])
+
+    def test_no_heavy_backends_at_import(self):
+        result = self.run_probe(LIGHT_MODULES)
+        self.assertEqual(result['loaded'], [])
+
+    def test_import_time_budget(self):
+        # Best of three, to keep a cold disk cache from failing the run
+        elapsed = min(self.run_probe(LIGHT_MODULES)['elapsed'] for _ in range(3))
+        self.assertLess(elapsed, IMPORT_BUDGET_SECONDS)
+
+    def test_lazy_attributes_resolve(self):
+        import pipeline
+        import diarization
+        self.assertEqual(pipeline.BatchOrganizer.__name__, 'BatchOrganizer')
+        self.assertTrue(callable(diarization.get_pipeline))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+import unittest
+import os
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+import soundfile as sf
+
+from classification import IntegratedGenderClassifier
+from classification.ml_classifier import (
+    MLGenderClassifier, list_model_versions, train_ml_classifier, update_ml_classifier
+)
+
+
+class TestIncrementalTraining(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.dataset_dir = os.path.join(self.test_dir, 'voice_dataset')
+        self.metadata = os.path.join(self.dataset_dir, 'metadata.csv')
+        self.model_path = os.path.join(self.test_dir, 'models', 'ml_gender_classifier.pkl')
+        self.sr = 16000
+        self.rng = np.random.default_rng(0)
+        self.rows = []
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def add_samples(self, n, confidence=90.0, prepend=False):
+        t = np.arange(self.sr // 2) / self.sr
+        for _ in range(n):
+            i = len(self.rows)
+            label = 'male' if i % 2 else 'female'
+            f0 = self.rng.normal(115 if label == 'male' else 215, 10)
+            audio = sum(np.sin(2 * np.pi * k * f0 * t) / k for k in range(1, 6))
+            audio = 0.3 * audio / np.max(np.abs(audio)) + 0.01 * self.rng.standard_normal(len(t))
+            name = f'voice_sample_{i:04d}.wav'
+            os.makedirs(os.path.join(self.dataset_dir, label), exist_ok=True)
+            sf.write(os.path.join(self.dataset_dir, label, name), audio, self.sr)
+            row = {'file': name, 'label': label, 'confidence': confidence}
+            if prepend:
+                # e.g. a Parquet part of a concurrent writer sorting before earlier rows
+                self.rows.insert(0, row)
+            else:
+                self.rows.append(row)
+        pd.DataFrame(self.rows).to_csv(self.metadata, index=False)
+
+    def update(self):
+        return update_ml_classifier(self.metadata, self.dataset_dir, self.model_path, num_workers=1)
+
+    def test_updates_consume_only_new_rows(self):
+        self.add_samples(12)
+        first = self.update()
+        self.assertEqual((first['status'], first['mode'], first['version']), ('success', 'bootstrap', 1))
+        self.assertEqual(first['new_samples'], 12)
+
+        self.assertEqual(self.update()['status'], 'up_to_date')
+
+        self.add_samples(6)
+        second = self.update()
+        self.assertEqual((second['mode'], second['version'], second['new_samples']), ('incremental', 2, 6))
+        self.assertEqual(list_model_versions(self.model_path), [1, 2])
+
+        live = MLGenderClassifier(self.sr)
+        live.load_model(self.model_path)
+        self.assertEqual((live.version, live.watermark), (2, 18))
+        self.assertTrue(live.is_incremental)
+
+        # Rows below the confidence threshold leave nothing to learn
+        self.add_samples(2, confidence=10.0)
+        self.assertEqual(self.update()['status'], 'up_to_date')
+
+    def test_rows_read_out_of_order_are_not_skipped(self):
+        self.add_samples(12)
+        self.update()
+        self.add_samples(4, prepend=True)
+        update = self.update()
+        self.assertEqual((update['mode'], update['new_samples'], update['version']), ('incremental', 4, 2))
+        self.assertEqual(self.update()['status'], 'up_to_date')
+
+    def test_full_model_is_replaced_by_incremental_model(self):
+        self.add_samples(12)
+        results = train_ml_classifier(self.metadata, self.dataset_dir, self.model_path, num_workers=1)
+        self.assertEqual(results['version'], 1)
+
+        self.add_samples(4)
+        update = self.update()
+        # A RandomForest cannot be updated: the first update refits on every row
+        self.assertEqual((update['mode'], update['new_samples'], update['version']), ('bootstrap', 16, 2))
+
+    def test_running_classifier_swaps_in_new_version(self):
+        self.add_samples(12)
+        self.update()
+        classifier = IntegratedGenderClassifier(ml_model_path=self.model_path, use_advanced=False,
+                                                ml_reload_interval=0)
+        self.assertEqual(classifier.ml_classifier.version, 1)
+        old_model = classifier.ml_classifier
+
+        self.add_samples(6)
+        self.update()
+        # Same size, new contents: make sure the mtime differs on coarse filesystems
+        stat = os.stat(self.model_path)
+        os.utime(self.model_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        classifier.classify(np.zeros(self.sr, dtype=np.float32), self.sr)
+        self.assertIsNot(classifier.ml_classifier, old_model)
+        self.assertEqual(classifier.ml_classifier.version, 2)
+        self.assertEqual(classifier.get_classifier_info()['ml_model_version'], 2)
+        self.assertFalse(classifier.refresh_ml_classifier())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -13,6 +13,7 @@ from preprocessing.vad import remove_silence
 from classification import get_classifier
 from dataset.organizer import save_sample
 from dataset.metadata import append_metadata
+from dataset.sinks import DatasetSink, StagingSink
 from data_augmentation.augment import AudioAugmenter, balance_dataset
 from quality.metrics import QualityMetrics, assess_dataset_quality
 from engine.batch_runner import validate_config, process_file
@@ -127,6 +128,22 @@ class TestIntegration(unittest.TestCase):
         self.assertEqual(len(df), 1)
         self.assertEqual(df.iloc[0]['file'], test_filename)
 
+    def test_staged_samples_commit(self):
+        """Test that samples staged by a worker are committed by the parent."""
+        staging = StagingSink(self.output_dir)
+        staging.add(self.test_audio, self.sample_rate, 'female', 'test.wav', {'source': 'test.wav', 'label': 'female'})
+        staged = staging.drain()
+        self.assertEqual(len(staged), 1)
+        self.assertEqual(staging.drain(), [])
+
+        sink = DatasetSink(self.output_dir)
+        committed = sink.commit_staged(staged)
+        sink.flush()
+        self.assertEqual(len(committed), 1)
+        self.assertTrue(os.path.exists(os.path.join(self.output_dir, 'female', committed[0][0])))
+        self.assertFalse(os.path.exists(staged[0]['staged_path']))
+        self.assertEqual(len(pd.read_csv(sink.metadata_path)), 1)
+
     def test_data_augmentation(self):
         """Test data augmentation functionality."""
         augmenter = AudioAugmenter(self.sample_rate)
@@ -0,0 +1,110 @@
+import unittest
+import os
+import time
+import tempfile
+import shutil
+import threading
+
+from engine.job_queue import JobQueue
+
+
+def wait_for(condition, timeout=10.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+class TestJobQueue(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.test_dir, 'jobs.sqlite')
+        self.processed = []
+        self.gate = threading.Event()
+        self.gate.set()
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def process(self, path):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        self.gate.wait()
+        time.sleep(0.01)
+        with self.lock:
+            self.active -= 1
+            self.processed.append(os.path.basename(path))
+        if path.endswith('bad.wav'):
+            return {"file": path, "error": "decode failed"}
+        return {"file": path, "segments_processed": 1}
+
+    def test_job_processes_only_its_files(self):
+        jobs = JobQueue(self.db_path, self.process, num_workers=2)
+        try:
+            first = jobs.submit('/in/a', ['1.wav', 'bad.wav'])
+            second = jobs.submit('/in/b', ['3.wav'])
+            self.assertTrue(wait_for(lambda: jobs.get(first)['status'] == 'completed'
+                                     and jobs.get(second)['status'] == 'completed'))
+
+            job = jobs.get(first)
+            self.assertEqual([f['file'] for f in job['files']], ['1.wav', 'bad.wav'])
+            self.assertEqual([f['status'] for f in job['files']], ['done', 'failed'])
+            self.assertEqual(job['progress'], 100.0)
+            self.assertIn('1 successful, 1 failed', job['message'])
+            self.assertEqual(jobs.get(second)['total'], 1)
+        finally:
+            jobs.close()
+
+    def test_worker_pool_is_bounded(self):
+        jobs = JobQueue(self.db_path, self.process, num_workers=2)
+        try:
+            ids = [jobs.submit('/in', [f'{i}.wav']) for i in range(6)]
+            self.assertTrue(wait_for(lambda: all(jobs.get(i)['status'] == 'completed' for i in ids)))
+            self.assertLessEqual(self.max_active, 2)
+        finally:
+            jobs.close()
+
+    def test_cancel_queued_and_running(self):
+        self.gate.clear()
+        jobs = JobQueue(self.db_path, self.process, num_workers=1)
+        try:
+            running = jobs.submit('/in', ['1.wav', '2.wav', '3.wav'])
+            queued = jobs.submit('/in', ['4.wav'])
+            self.assertTrue(wait_for(lambda: jobs.get(running)['status'] == 'processing'))
+
+            self.assertEqual(jobs.cancel(queued)['status'], 'cancelled')
+            jobs.cancel(running)
+            self.gate.set()
+
+            self.assertTrue(wait_for(lambda: jobs.get(running)['status'] == 'cancelled'))
+            statuses = [f['status'] for f in jobs.get(running)['files']]
+            self.assertEqual(statuses, ['done', 'skipped', 'skipped'])
+            time.sleep(0.1)
+            self.assertNotIn('4.wav', self.processed)
+        finally:
+            jobs.close()
+
+    def test_state_survives_restart(self):
+        # Queue a job without workers, as if the server stopped before running it
+        jobs = JobQueue(self.db_path, self.process, autostart=False)
+        job_id = jobs.submit('/in', ['1.wav', '2.wav'])
+        jobs.close()
+
+        jobs = JobQueue(self.db_path, self.process)
+        try:
+            self.assertTrue(wait_for(lambda: jobs.get(job_id)['status'] == 'completed'))
+            self.assertEqual(sorted(self.processed), ['1.wav', '2.wav'])
+            self.assertIsNone(jobs.get('missing'))
+        finally:
+            jobs.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import unittest
+import os
+import tempfile
+import shutil
+import threading
+import numpy as np
+import pandas as pd
+
+from dataset.metadata import MetadataWriter, read_metadata, PYARROW_AVAILABLE
+
+
+class TestMetadataWriter(unittest.TestCase):
+    """Buffered metadata writes from many threads."""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.csv_path = os.path.join(self.test_dir, 'metadata.csv')
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def write_rows(self, fmt):
+        writer = MetadataWriter(self.csv_path, fmt, flush_rows=7)
+
+        def produce(thread_id):
+            for i in range(50):
+                writer.write({'file': f'{thread_id}_{i}.wav', 'label': 'male', 'confidence': float(i)})
+
+        threads = [threading.Thread(target=produce, args=(k,)) for k in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        writer.close()
+
+    def test_csv_single_header_fixed_columns(self):
+        self.write_rows('csv')
+        with open(self.csv_path) as f:
+            self.assertEqual(f.read().count('file,label,confidence'), 1)
+        df = pd.read_csv(self.csv_path)
+        self.assertEqual(len(df), 200)
+        self.assertEqual(list(df.columns), ['file', 'label', 'confidence'])
+
+    @unittest.skipUnless(PYARROW_AVAILABLE, "pyarrow not installed")
+    def test_parquet_parts(self):
+        self.write_rows('parquet')
+        self.assertFalse(os.path.exists(self.csv_path))
+        df = read_metadata(self.csv_path, columns=['file', 'confidence'])
+        self.assertEqual(len(df), 200)
+        self.assertEqual(list(df.columns), ['file', 'confidence'])
+
+    @unittest.skipUnless(PYARROW_AVAILABLE, "pyarrow not installed")
+    def test_parts_with_different_value_types_merge(self):
+        batches = [
+            [{'file': 'a.wav', 'pitch': 181.5, 'label': 'female'}],
+            [{'file': 'b.wav', 'pitch': 0, 'label': 'male'}],
+            [{'file': 'c.wav', 'pitch': np.float32(120.25), 'label': None}],
+            [{'file': 'd.wav', 'pitch': None, 'label': 'male'}],
+        ]
+        for batch in batches:
+            # A new writer per batch, like separate runs of the pipeline
+            writer = MetadataWriter(self.csv_path, 'parquet')
+            for row in batch:
+                writer.write(row)
+            writer.close()
+
+        df = read_metadata(self.csv_path)
+        self.assertEqual(list(df['file']), ['a.wav', 'b.wav', 'c.wav', 'd.wav'])
+        self.assertEqual(df['pitch'].dtype, np.float64)
+        np.testing.assert_array_equal(df['pitch'].to_numpy()[:3], [181.5, 0.0, 120.25])
+        self.assertTrue(np.isnan(df['pitch'][3]))
+
+    @unittest.skipUnless(PYARROW_AVAILABLE, "pyarrow not installed")
+    def test_switch_back_to_csv_keeps_parquet_rows(self):
+        self.write_rows('parquet')
+        writer = MetadataWriter(self.csv_path, 'csv')
+        writer.write({'file': 'new.wav', 'label': 'female', 'confidence': 1.0})
+        writer.close()
+
+        df = read_metadata(self.csv_path, columns=['file', 'confidence'])
+        self.assertEqual(len(df), 201)
+        self.assertEqual(list(df.columns), ['file', 'confidence'])
+        self.assertEqual(df['file'].iloc[-1], 'new.wav')
+
+    @unittest.skipUnless(PYARROW_AVAILABLE, "pyarrow not installed")
+    def test_switch_to_parquet_migrates_csv(self):
+        self.write_rows('csv')
+        writer = MetadataWriter(self.csv_path, 'parquet')
+        writer.write({'file': 'new.wav', 'label': 'female', 'confidence': 1.0})
+        writer.close()
+
+        df = read_metadata(self.csv_path)
+        self.assertEqual(len(df), 201)
+        # The CSV history now lives in the Parquet parts as well
+        os.remove(self.csv_path)
+        self.assertEqual(len(read_metadata(self.csv_path)), 201)
+
+    @unittest.skipUnless(PYARROW_AVAILABLE, "pyarrow not installed")
+    def test_both_formats_read_each_row_once(self):
+        self.write_rows('both')
+        df = read_metadata(self.csv_path, columns=['confidence'])
+        self.assertEqual(len(df), 200)
+        self.assertEqual(list(df.columns), ['confidence'])
+
+if __name__ == '__main__':
+    unittest.main()
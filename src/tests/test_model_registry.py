@@ -0,0 +1,82 @@
+import unittest
+import threading
+import time
+
+from utils.model_registry import ModelRegistry
+
+
+class Model:
+    def __init__(self, size=1):
+        self.size = size
+
+
+class TestModelRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.loads = []
+
+        def factory(size=1):
+            self.loads.append(size)
+            time.sleep(0.05)
+            return Model(size)
+
+        self.registry = ModelRegistry({'model': factory})
+
+    def test_loads_once_across_threads(self):
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(self.registry.get('model')))
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.loads, [1])
+        self.assertTrue(all(model is results[0] for model in results))
+
+    def test_arguments_are_part_of_the_key(self):
+        small = self.registry.get('model', size=1)
+        large = self.registry.get('model', size=2)
+        self.assertIsNot(small, large)
+        self.assertIs(self.registry.get('model', size=2), large)
+        self.assertEqual(sorted(self.loads), [1, 2])
+
+    def test_failed_load_is_retried(self):
+        attempts = []
+
+        def flaky():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise RuntimeError("download failed")
+            return Model()
+
+        self.registry.register('flaky', flaky)
+        with self.assertRaises(RuntimeError):
+            self.registry.get('flaky')
+        self.assertIsInstance(self.registry.get('flaky'), Model)
+        self.assertEqual(len(attempts), 2)
+
+    def test_preload_and_stats(self):
+        self.registry.register('broken', lambda: 1 / 0)
+        loaded = self.registry.preload(['model', {'name': 'model', 'size': 3}, 'broken'])
+
+        self.assertEqual([stats['kwargs'] for stats in loaded], [{}, {'size': 3}])
+        self.assertTrue(self.registry.is_loaded('model', size=3))
+        self.assertFalse(self.registry.is_loaded('broken'))
+        for stats in self.registry.stats():
+            self.assertGreaterEqual(stats['load_seconds'], 0.05)
+            self.assertIn('rss_mb', stats)
+
+    def test_string_factory_and_unknown_name(self):
+        registry = ModelRegistry({'pitch': 'classification.pitch_gender:PitchGenderClassifier'})
+        self.assertEqual(type(registry.get('pitch')).__name__, 'PitchGenderClassifier')
+        with self.assertRaises(KeyError):
+            registry.get('missing')
+
+    def test_use_lock_is_shared(self):
+        self.assertIs(self.registry.lock('model'), self.registry.lock('model'))
+        self.assertIsNot(self.registry.lock('model'), self.registry.lock('model', size=2))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+import numpy as np
+
+from preprocessing.pitch_tracker import track_pitch
+from preprocessing.segment_analysis import SegmentAnalysis
+
+
+def harmonic_tone(f0, sr=16000, duration=2.0, noise=0.05, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(sr * duration)) / sr
+    audio = sum(np.sin(2 * np.pi * k * f0 * t) / k for k in range(1, 8))
+    return audio + noise * rng.standard_normal(len(t))
+
+
+class TestPitchTracker(unittest.TestCase):
+
+    def test_f0_accuracy(self):
+        for f0 in (70, 110, 165, 220, 350):
+            track = track_pitch(harmonic_tone(f0), 16000)
+            self.assertGreater(track.voiced_fraction, 0.9)
+            self.assertAlmostEqual(track.median_f0(), f0, delta=f0 * 0.01)
+
+    def test_no_octave_error_on_rich_harmonics(self):
+        # Strong second harmonic: the period lag, not half of it, must win,
+        # and neither may the double-period lag
+        sr = 16000
+        t = np.arange(sr * 2) / sr
+        audio = 0.6 * np.sin(2 * np.pi * 120 * t) + np.sin(2 * np.pi * 240 * t)
+        self.assertAlmostEqual(track_pitch(audio, sr).median_f0(), 120, delta=2)
+
+    def test_noise_and_silence_are_unvoiced(self):
+        rng = np.random.default_rng(1)
+        noise = rng.standard_normal(16000 * 2)
+        self.assertIsNone(track_pitch(noise, 16000).median_f0())
+
+        audio = np.concatenate([harmonic_tone(200, duration=1.0), np.zeros(16000)])
+        track = track_pitch(audio, 16000)
+        self.assertFalse(track.voiced[track.times > 1.1].any())
+        self.assertTrue(track.voiced[track.times < 0.9].all())
+
+    def test_hnr_tracks_noise_level(self):
+        clean = track_pitch(harmonic_tone(150, noise=0.01), 16000).hnr()
+        noisy = track_pitch(harmonic_tone(150, noise=0.3), 16000).hnr()
+        self.assertGreater(clean, noisy)
+        self.assertGreater(noisy, 0)
+
+    def test_short_input(self):
+        track = track_pitch(np.ones(100), 16000)
+        self.assertEqual(len(track.f0), 0)
+        self.assertEqual(track.median_f0(default=150.0), 150.0)
+        self.assertEqual(track.hnr(), 0.0)
+
+    def test_block_size_does_not_change_result(self):
+        audio = harmonic_tone(180, duration=3.0)
+        whole = track_pitch(audio, 16000)
+        blocked = track_pitch(audio, 16000, block_frames=7)
+        np.testing.assert_allclose(whole.f0, blocked.f0)
+        np.testing.assert_array_equal(whole.voiced, blocked.voiced)
+
+    def test_segment_analysis_memoizes_track(self):
+        analysis = SegmentAnalysis(harmonic_tone(200), 16000)
+        self.assertIs(analysis.pitch_track(), analysis.pitch_track())
+
+
+if __name__ == '__main__':
+    unittest.main()
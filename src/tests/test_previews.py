@@ -0,0 +1,107 @@
+import unittest
+import os
+import time
+import tempfile
+import shutil
+import numpy as np
+import soundfile as sf
+
+from dataset.previews import PreviewCache
+
+
+class TestPreviewCache(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.sr = 16000
+        t = np.arange(self.sr * 40) / self.sr
+        self.audio = (0.5 * np.sin(2 * np.pi * 180 * t) * np.linspace(0, 1, len(t))).astype(np.float32)
+        os.makedirs(os.path.join(self.test_dir, 'female'))
+        self.source = os.path.join(self.test_dir, 'female', 'voice_sample_0001.wav')
+        sf.write(self.source, self.audio, self.sr)
+        self.cache = PreviewCache(self.test_dir, max_seconds=10, peak_bins=100)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_clip_is_short_and_compressed(self):
+        for fmt in ('opus', 'mp3'):
+            path = self.cache.get_clip('female', 'voice_sample_0001.wav', fmt)
+            self.assertTrue(path.startswith(os.path.join(self.test_dir, '.previews', 'female')))
+            self.assertLess(os.path.getsize(path), os.path.getsize(self.source) / 10)
+            self.assertAlmostEqual(sf.info(path).duration, 10.0, delta=0.2)
+
+    def test_clip_rendered_once_and_refreshed_when_stale(self):
+        path = self.cache.get_clip('female', 'voice_sample_0001.wav')
+        mtime = os.path.getmtime(path)
+        self.assertEqual(self.cache.get_clip('female', 'voice_sample_0001.wav'), path)
+        self.assertEqual(os.path.getmtime(path), mtime)
+
+        time.sleep(0.01)
+        sf.write(self.source, self.audio[:self.sr * 2], self.sr)
+        self.cache.get_clip('female', 'voice_sample_0001.wav')
+        self.assertAlmostEqual(sf.info(path).duration, 2.0, delta=0.2)
+
+    def test_peaks_cover_whole_sample(self):
+        peaks = self.cache.get_peaks('female', 'voice_sample_0001.wav')
+        self.assertEqual(peaks['bins'], 100)
+        self.assertAlmostEqual(peaks['duration'], 40.0)
+
+        expected = self.audio.reshape(100, -1)
+        np.testing.assert_allclose([p[1] for p in peaks['peaks']], expected.max(axis=1), atol=1e-3)
+        np.testing.assert_allclose([p[0] for p in peaks['peaks']], expected.min(axis=1), atol=1e-3)
+        # Second call reads the cached JSON
+        self.assertEqual(self.cache.get_peaks('female', 'voice_sample_0001.wav'), peaks)
+
+    def test_render_from_memory_matches_file(self):
+        from_file = self.cache.get_peaks('female', 'voice_sample_0001.wav')
+        shutil.rmtree(self.cache.cache_dir)
+        self.cache.render('female', 'voice_sample_0001.wav', self.audio, self.sr)
+        self.assertTrue(os.path.isfile(self.cache.clip_path('female', 'voice_sample_0001.wav')))
+        # The file is 16-bit PCM, the in-memory audio is not quantized
+        np.testing.assert_allclose(self.cache.get_peaks('female', 'voice_sample_0001.wav')['peaks'],
+                                   from_file['peaks'], atol=1e-3)
+
+    def test_missing_sample(self):
+        with self.assertRaises(FileNotFoundError):
+            self.cache.get_clip('female', 'nope.wav')
+
+
+class TestAudioEndpoints(unittest.TestCase):
+
+    def setUp(self):
+        from scripts import web_app
+
+        self.test_dir = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.test_dir, 'male'))
+        sf.write(os.path.join(self.test_dir, 'male', 'voice_sample_0001.wav'),
+                 np.zeros(16000 * 3, dtype=np.float32), 16000)
+        self.web_app = web_app
+        self.saved = (web_app.DATASET_DIR, web_app.PREVIEW_CACHE)
+        web_app.DATASET_DIR, web_app.PREVIEW_CACHE = self.test_dir, None
+        self.client = web_app.app.test_client()
+
+    def tearDown(self):
+        self.web_app.DATASET_DIR, self.web_app.PREVIEW_CACHE = self.saved
+        shutil.rmtree(self.test_dir)
+
+    def test_range_request(self):
+        response = self.client.get('/audio/male/voice_sample_0001.wav', headers={'Range': 'bytes=100-199'})
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(len(response.data), 100)
+        self.assertEqual(response.headers['Accept-Ranges'], 'bytes')
+        self.assertEqual(self.client.get('/audio/../voice_sample_0001.wav').status_code, 404)
+
+    def test_preview_and_peaks(self):
+        response = self.client.get('/preview/male/voice_sample_0001.wav?format=mp3')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'audio/mpeg')
+        self.assertEqual(self.client.get('/preview/male/voice_sample_0001.wav?format=wav').status_code, 400)
+        self.assertEqual(self.client.get('/preview/male/missing.wav').status_code, 404)
+
+        peaks = self.client.get('/peaks/male/voice_sample_0001.wav').get_json()
+        self.assertAlmostEqual(peaks['duration'], 3.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,154 @@
+import unittest
+import os
+import json
+import tempfile
+import shutil
+
+from engine.progress import ProgressBus, report_to, stage
+from engine.job_queue import JobQueue
+
+
+def process(path):
+    with stage('decode'):
+        pass
+    with stage('classify', track='vocals'):
+        pass
+    if path.endswith('bad.wav'):
+        with stage('write'):
+            raise IOError('disk full')
+    return {'file': os.path.basename(path)}
+
+
+class TestProgressBus(unittest.TestCase):
+
+    def test_publish_and_replay(self):
+        bus = ProgressBus(history=2)
+        with bus.subscribe('job') as live:
+            bus.publish('job', {'type': 'job', 'status': 'queued'})
+            bus.publish('other', {'type': 'job'})
+            self.assertEqual(live.get(timeout=1)['status'], 'queued')
+            self.assertIsNone(live.get(timeout=0.01))
+
+        for i in range(3):
+            bus.publish('job', {'type': 'file', 'position': i})
+        late = bus.subscribe('job')
+        self.assertEqual([late.get(timeout=1)['position'] for _ in range(2)], [1, 2])
+        late.close()
+        self.assertEqual(bus._subscribers, {})
+
+    def test_finished_and_idle_histories_are_dropped(self):
+        bus = ProgressBus(max_jobs=2, retain_seconds=0)
+        bus.publish('done', {'type': 'job', 'status': 'completed'})
+        reader = bus.subscribe('done')
+        bus.retire('done')
+        # Kept while a subscriber is still reading
+        self.assertEqual(len(bus.recent('done')), 1)
+        reader.close()
+        self.assertEqual(bus.recent('done'), [])
+        self.assertEqual(bus._retired, {})
+
+        for job_id in ('a', 'b', 'c'):
+            bus.publish(job_id, {'type': 'job'})
+        self.assertEqual(list(bus._history), ['b', 'c'])
+
+    def test_stage_is_silent_without_reporter(self):
+        with stage('decode'):
+            value = 1
+        self.assertEqual(value, 1)
+
+    def test_stage_reports_timing_and_errors(self):
+        events = []
+        with report_to(events.append):
+            with stage('separate', streaming=True):
+                pass
+            with self.assertRaises(ValueError):
+                with stage('quality'):
+                    raise ValueError('bad audio')
+        with stage('write'):
+            pass
+
+        self.assertEqual([(e['stage'], e['status']) for e in events],
+                         [('separate', 'start'), ('separate', 'end'), ('quality', 'start'), ('quality', 'error')])
+        self.assertTrue(events[0]['streaming'])
+        self.assertGreaterEqual(events[1]['seconds'], 0)
+        self.assertEqual(events[3]['error'], 'bad audio')
+
+
+class TestJobEvents(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.bus = ProgressBus()
+        self.jobs = JobQueue(os.path.join(self.test_dir, 'jobs.sqlite'), process, bus=self.bus, autostart=False)
+
+    def tearDown(self):
+        self.jobs.close()
+        shutil.rmtree(self.test_dir)
+
+    def drain(self, subscription):
+        events = []
+        while True:
+            event = subscription.get(timeout=10)
+            events.append(event)
+            if event['type'] == 'job' and event.get('status') == 'completed':
+                return events
+
+    def test_queue_emits_file_and_stage_events(self):
+        job_id = self.jobs.submit('/in', ['a.wav', 'bad.wav'])
+        subscription = self.bus.subscribe(job_id)
+        self.jobs.start()
+        events = self.drain(subscription)
+        subscription.close()
+
+        self.assertEqual(events[0]['status'], 'queued')
+        stages = [(e['file'], e['stage'], e['status']) for e in events if e['type'] == 'stage']
+        self.assertIn(('a.wav', 'decode', 'end'), stages)
+        self.assertIn(('bad.wav', 'write', 'error'), stages)
+
+        files = [(e['file'], e['status']) for e in events if e['type'] == 'file']
+        self.assertEqual(files, [('a.wav', 'processing'), ('a.wav', 'done'),
+                                 ('bad.wav', 'processing'), ('bad.wav', 'failed')])
+        self.assertEqual(len({e['seq'] for e in events}), len(events))
+
+    def test_finished_job_history_is_released(self):
+        self.bus.retain_seconds = 0
+        job_id = self.jobs.submit('/in', ['a.wav'])
+        subscription = self.bus.subscribe(job_id)
+        self.jobs.start()
+        self.drain(subscription)
+        self.assertTrue(self.bus.recent(job_id))
+        subscription.close()
+        self.assertEqual(self.bus.recent(job_id), [])
+
+        idle = JobQueue(os.path.join(self.test_dir, 'idle.sqlite'), process, bus=self.bus, autostart=False)
+        cancelled = idle.submit('/in', ['b.wav'])
+        idle.cancel(cancelled)
+        idle.close()
+        self.assertEqual(self.bus.recent(cancelled), [])
+
+    def test_sse_endpoint_streams_until_job_ends(self):
+        from scripts import web_app
+
+        saved = web_app.JOB_QUEUE
+        web_app.JOB_QUEUE = self.jobs
+        try:
+            job_id = self.jobs.submit('/in', ['a.wav'])
+            client = web_app.app.test_client()
+            self.assertEqual(client.get('/events/missing').status_code, 404)
+
+            response = client.get(f'/events/{job_id}')
+            self.assertEqual(response.mimetype, 'text/event-stream')
+            body = response.get_data(as_text=True)
+        finally:
+            web_app.JOB_QUEUE = saved
+
+        messages = [dict(line.split(': ', 1) for line in block.splitlines() if not line.startswith(':'))
+                    for block in body.strip().split('\n\n')]
+        messages = [m for m in messages if m]
+        self.assertEqual(messages[0]['event'], 'snapshot')
+        self.assertIn('stage', [m['event'] for m in messages])
+        self.assertEqual(json.loads(messages[-1]['data'])['status'], 'completed')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+import unittest
+from unittest import mock
+import os
+import shutil
+import tempfile
+import numpy as np
+import librosa
+import soundfile as sf
+
+from quality.quality_assessor import QualityAssessor
+from preprocessing.segment_analysis import SegmentAnalysis
+
+
+class TestSharedAnalysis(unittest.TestCase):
+
+    def setUp(self):
+        self.sr = 16000
+        rng = np.random.default_rng(0)
+        t = np.arange(self.sr * 3) / self.sr
+        envelope = 0.5 + 0.5 * np.abs(np.sin(2 * np.pi * 2 * t))
+        self.audio = (0.4 * np.sin(2 * np.pi * 150 * t) * envelope
+                      + 0.02 * rng.standard_normal(len(t))).astype(np.float32)
+        self.audio[:4000] = 0.0
+        self.assessor = QualityAssessor(sr=self.sr)
+
+    def test_matches_standalone_metrics(self):
+        result = self.assessor.assess_segment(self.audio)
+        audio_analyzer = self.assessor.audio_analyzer
+        speech_analyzer = self.assessor.speech_analyzer
+
+        self.assertEqual(result['audio_quality']['dynamic_range_db'],
+                         audio_analyzer.compute_dynamic_range(self.audio))
+        self.assertEqual(result['audio_quality']['background_noise_score'],
+                         audio_analyzer.estimate_background_noise(self.audio))
+        self.assertEqual(result['audio_quality']['silence_percent'],
+                         audio_analyzer.detect_silence(self.audio))
+        self.assertEqual(result['speech_quality']['pitch_variety'],
+                         speech_analyzer.extract_pitch_features(self.audio)['pitch_variety'])
+        self.assertEqual(result['speech_quality']['clarity'],
+                         speech_analyzer.compute_formant_clarity(self.audio))
+
+        # Standalone speaking rate is the same as onset_strength on the raw audio
+        onset_env = librosa.onset.onset_strength(y=self.audio, sr=self.sr)
+        np.testing.assert_allclose(
+            librosa.onset.onset_strength(S=librosa.power_to_db(SegmentAnalysis(self.audio, self.sr).melspectrogram()),
+                                         sr=self.sr),
+            onset_env)
+        self.assertEqual(result['speech_quality']['speaking_rate_wpm'],
+                         speech_analyzer.estimate_speaking_rate(self.audio))
+
+    def test_single_stft_per_segment(self):
+        with mock.patch('librosa.stft', wraps=librosa.stft) as stft:
+            self.assessor.assess_segment(self.audio)
+        self.assertEqual(stft.call_count, 1)
+
+    def test_reuses_given_analysis(self):
+        analysis = SegmentAnalysis(self.audio, self.sr)
+        analysis.magnitude
+        with mock.patch('librosa.stft', wraps=librosa.stft) as stft:
+            self.assessor.assess_segment(self.audio, analysis=analysis)
+        self.assertEqual(stft.call_count, 0)
+
+
+class TestAssessBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.sr = 16000
+        rng = np.random.default_rng(0)
+        t = np.arange(self.sr) / self.sr
+        self.items = []
+        for i in range(6):
+            audio = (0.3 * np.sin(2 * np.pi * (110 + 30 * i) * t)
+                     + 0.01 * rng.standard_normal(len(t))).astype(np.float32)
+            if i % 2:
+                self.items.append(audio)
+            else:
+                path = os.path.join(self.test_dir, f'segment_{i}.wav')
+                sf.write(path, audio, self.sr, subtype='FLOAT')
+                self.items.append(path)
+        self.items.append(os.path.join(self.test_dir, 'missing.wav'))
+        self.assessor = QualityAssessor(sr=self.sr)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def expected(self, item):
+        if isinstance(item, str):
+            return self.assessor.assess_file(item)
+        return self.assessor.assess_segment(item)
+
+    def test_inline_batch_matches_single_items(self):
+        results = self.assessor.assess_batch(self.items, num_workers=1, chunk_size=2, prefetch=2)
+        self.assertEqual(len(results), len(self.items))
+        for item, result in zip(self.items, results):
+            self.assertEqual(result, self.expected(item))
+        self.assertEqual(results[-1]['rating'], 'error')
+
+    def test_pooled_iter_streams_every_item(self):
+        # A generator has no length: the pool is used and items are pulled lazily
+        results = list(self.assessor.assess_batch_iter((item for item in self.items),
+                                                       num_workers=2, chunk_size=2))
+
+        self.assertEqual(sorted(r['index'] for r in results), list(range(len(self.items))))
+        for result in results:
+            expected = self.expected(self.items[result.pop('index')])
+            self.assertEqual(result['rating'], expected['rating'])
+            self.assertAlmostEqual(result['overall_quality_score'], expected['overall_quality_score'], places=6)
+            self.assertEqual(result.get('file'), expected.get('file'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import unittest
+import os
+import tempfile
+import shutil
+import numpy as np
+import soundfile as sf
+
+from quality import scanner as scanner_module
+from quality.scanner import DatasetQualityScanner
+from quality.metrics import QualityMetrics, assess_dataset_quality, filter_low_quality_files
+
+
+class TestDatasetQualityScanner(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.sr = 16000
+        rng = np.random.default_rng(0)
+        t = np.arange(self.sr) / self.sr
+        for category in ('male', 'female'):
+            os.makedirs(os.path.join(self.test_dir, category))
+            for i in range(4):
+                # Mix of clean tones and near-silent files
+                audio = 0.5 * np.sin(2 * np.pi * (120 + 40 * i) * t) if i % 2 == 0 \
+                    else 0.001 * rng.standard_normal(len(t))
+                sf.write(self.path(category, i), audio, self.sr)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def path(self, category, i):
+        return os.path.join(self.test_dir, category, f'voice_sample_{i:04d}.wav')
+
+    def counting_scanner(self, **kwargs):
+        scanner = DatasetQualityScanner(self.test_dir, num_workers=1, **kwargs)
+        scanner.computed = []
+        compute = scanner._compute
+
+        def counted(paths):
+            scanner.computed.extend(paths)
+            return compute(paths)
+        scanner._compute = counted
+        return scanner
+
+    def test_results_match_direct_assessment(self):
+        with self.counting_scanner() as scanner:
+            results = {r['path']: r for r in scanner.scan()}
+        self.assertEqual(len(results), 8)
+        metrics = QualityMetrics()
+        expected = metrics.assess_audio_quality(self.path('female', 2))
+        for key, value in expected.items():
+            self.assertAlmostEqual(results[self.path('female', 2)][key], value, places=5)
+
+    def test_rescan_only_assesses_new_and_changed_files(self):
+        with self.counting_scanner() as scanner:
+            scanner.scan()
+            self.assertEqual(len(scanner.computed), 8)
+
+        sf.write(self.path('male', 9), np.zeros(self.sr), self.sr)
+        sf.write(self.path('male', 1), 0.5 * np.ones(self.sr * 2), self.sr)
+        os.remove(self.path('female', 3))
+
+        with self.counting_scanner() as scanner:
+            results = scanner.scan()
+            self.assertEqual(sorted(scanner.computed), [self.path('male', 1), self.path('male', 9)])
+            self.assertEqual(len(results), 8)
+            self.assertNotIn(self.path('female', 3), scanner._cached())
+
+            scanner.computed.clear()
+            scanner.scan()
+            self.assertEqual(scanner.computed, [])
+
+    def test_metrics_version_invalidates_cache(self):
+        with self.counting_scanner() as scanner:
+            scanner.scan()
+        saved = scanner_module.METRICS_VERSION
+        scanner_module.METRICS_VERSION = saved + 1
+        try:
+            with self.counting_scanner() as scanner:
+                scanner.scan()
+                self.assertEqual(len(scanner.computed), 8)
+        finally:
+            scanner_module.METRICS_VERSION = saved
+
+    def test_process_pool_matches_inline(self):
+        saved = scanner_module.MIN_FILES_FOR_POOL
+        scanner_module.MIN_FILES_FOR_POOL = 2
+        try:
+            with DatasetQualityScanner(self.test_dir, cache_path=':memory:', num_workers=2, chunk_size=3) as pooled:
+                pooled_results = pooled.scan()
+        finally:
+            scanner_module.MIN_FILES_FOR_POOL = saved
+        with DatasetQualityScanner(self.test_dir, cache_path=':memory:', num_workers=1) as inline:
+            inline_results = inline.scan()
+        self.assertEqual(pooled_results, inline_results)
+
+    def test_summary_and_filter_share_results(self):
+        summary = assess_dataset_quality(self.test_dir, num_workers=1)
+        self.assertEqual(summary['total_files'], 8)
+        self.assertEqual(summary['category_breakdown']['male']['count'], 4)
+
+        with self.counting_scanner() as scanner:
+            low = filter_low_quality_files(self.test_dir, quality_threshold=30.0, num_workers=1)
+            self.assertEqual(scanner.low_quality_files(30.0), low)
+            self.assertEqual(scanner.computed, [])
+        self.assertEqual(len(low), summary['low_quality_files'])
+
+
+if __name__ == '__main__':
+    unittest.main()
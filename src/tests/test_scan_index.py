@@ -0,0 +1,64 @@
+import unittest
+import os
+import tempfile
+import shutil
+import numpy as np
+import soundfile as sf
+
+from pipeline.scan_index import ScanIndex
+from preprocessing.audio_probe import probe_files
+
+
+class TestScanIndex(unittest.TestCase):
+    """Re-scans only probe new or changed files."""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.index = ScanIndex(os.path.join(self.test_dir, 'temp', 'scan_index.sqlite'))
+        self.probed = []
+
+        self.paths = []
+        for i in range(3):
+            path = os.path.join(self.test_dir, f'call_{i}.wav')
+            sf.write(path, np.zeros(16000 * (i + 1), dtype=np.float32), 16000)
+            self.paths.append(path)
+
+    def tearDown(self):
+        self.index.close()
+        shutil.rmtree(self.test_dir)
+
+    def probe(self, paths):
+        self.probed.extend(paths)
+        return probe_files(paths)
+
+    def test_incremental_refresh(self):
+        entries, changed = self.index.refresh(self.paths, self.probe)
+        self.assertEqual(len(entries), 3)
+        self.assertEqual(sorted(changed), sorted(self.paths))
+        self.index.mark_organized(self.paths[0], '/batches/batch_001/call_0.wav')
+        self.index.mark_batch_file_status('/batches/batch_001/call_0.wav', 'done')
+
+        # Unchanged files are answered from the index
+        self.probed = []
+        entries, changed = self.index.refresh(self.paths, self.probe)
+        self.assertEqual(changed, [])
+        self.assertEqual(self.probed, [])
+        self.assertEqual(self.index.get(self.paths[0])['status'], 'done')
+
+        # Touched but identical: not re-probed, status kept
+        os.utime(self.paths[0], ns=(0, 10 ** 9))
+        entries, changed = self.index.refresh(self.paths, self.probe)
+        self.assertEqual(changed, [])
+        self.assertEqual(self.index.get(self.paths[0])['status'], 'done')
+
+        # Rewritten file is probed again and back to pending
+        sf.write(self.paths[1], np.ones(8000, dtype=np.float32) * 0.1, 16000)
+        entries, changed = self.index.refresh(self.paths, self.probe)
+        self.assertEqual(changed, [self.paths[1]])
+        entry = self.index.get(self.paths[1])
+        self.assertEqual(entry['status'], 'pending')
+        self.assertAlmostEqual(entry['duration'], 0.5, places=2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+import numpy as np
+import librosa
+from preprocessing.segment_analysis import SegmentAnalysis
+from classification.pitch_gender import PitchGenderClassifier
+from quality.metrics import QualityMetrics
+
+class TestSegmentAnalysis(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.sample_rate = 16000
+        t = np.linspace(0, 1.0, self.sample_rate, False)
+        self.test_audio = (0.5 * np.sin(2 * np.pi * 140.0 * t)).astype(np.float32)
+
+    def test_matches_direct_librosa(self):
+        """Shared features should equal the direct librosa calls."""
+        analysis = SegmentAnalysis(self.test_audio, self.sample_rate)
+
+        pitches, mags = librosa.piptrack(y=self.test_audio, sr=self.sample_rate)
+        cached_pitches, cached_mags = analysis.piptrack()
+        np.testing.assert_allclose(cached_pitches, pitches, rtol=1e-5)
+        np.testing.assert_allclose(cached_mags, mags, rtol=1e-5)
+
+        mfcc = librosa.feature.mfcc(y=self.test_audio, sr=self.sample_rate, n_mfcc=13)
+        np.testing.assert_allclose(analysis.mfcc(13), mfcc, rtol=1e-4, atol=1e-3)
+
+    def test_features_computed_once(self):
+        """Repeated requests should reuse the memoized result."""
+        analysis = SegmentAnalysis(self.test_audio, self.sample_rate)
+        self.assertIs(analysis.piptrack(), analysis.piptrack())
+        self.assertIs(analysis.mfcc(), analysis.mfcc())
+        self.assertIs(analysis.magnitude, analysis.magnitude)
+
+    def test_consumers_accept_analysis(self):
+        """Pitch estimator and quality metrics should use a shared analysis."""
+        analysis = SegmentAnalysis(self.test_audio, self.sample_rate)
+
+        pitch = PitchGenderClassifier().estimate_pitch(self.test_audio, self.sample_rate, analysis)
+        self.assertAlmostEqual(float(pitch),
+                               float(PitchGenderClassifier().estimate_pitch(self.test_audio, self.sample_rate)),
+                               places=3)
+
+        quality = QualityMetrics(self.sample_rate).assess_audio(self.test_audio, analysis=analysis)
+        self.assertIn('quality_score', quality)
+
+    def test_batch_matches_individual(self):
+        """Joint-STFT batch analysis should equal per-segment analysis."""
+        rng = np.random.default_rng(0)
+        segments = [0.1 * rng.standard_normal(n).astype(np.float32) for n in (16000, 23456, 5000)]
+
+        for audio, batched in zip(segments, SegmentAnalysis.batch(segments, self.sample_rate)):
+            single = SegmentAnalysis(audio, self.sample_rate)
+            np.testing.assert_allclose(batched.stft, single.stft, atol=1e-6)
+            np.testing.assert_allclose(batched.piptrack()[0], single.piptrack()[0], atol=1e-4)
+            np.testing.assert_allclose(batched.mfcc(), single.mfcc(), atol=1e-3)
+            np.testing.assert_allclose(batched.spectral_centroid(), single.spectral_centroid(), rtol=1e-5)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+import unittest
+import os
+import tempfile
+import shutil
+import numpy as np
+import soundfile as sf
+import torch
+from unittest.mock import patch
+
+from preprocessing.source_separator import VocalSeparator, resample_audio
+
+
+def fake_apply_model(model, mix, device=None, progress=False):
+    """Stand-in for Demucs: four sources that are fixed fractions of the mix."""
+    return torch.stack([mix * 0.1, mix * 0.2, mix * 0.3, mix * 0.4], dim=1)
+
+
+class TestStreamingSeparation(unittest.TestCase):
+    """Chunked separation must match whole-file separation away from the edges."""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.separator = VocalSeparator.__new__(VocalSeparator)
+        self.separator.device = "cpu"
+        self.separator.sample_rate = 44100
+        self.separator.model = None
+
+        sr = 22050
+        t = np.arange(sr * 25) / sr
+        self.audio = (0.5 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+        self.input_path = os.path.join(self.test_dir, "input.wav")
+        sf.write(self.input_path, self.audio, sr)
+        self.input_sr = sr
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    @patch("preprocessing.source_separator.apply_model", side_effect=fake_apply_model)
+    def test_streaming_matches_reference(self, _):
+        result = self.separator.separate_file_streaming(
+            self.input_path,
+            os.path.join(self.test_dir, "vocals.wav"),
+            os.path.join(self.test_dir, "accompaniment.wav"),
+            output_sr=16000, chunk_seconds=4, overlap_seconds=1
+        )
+        vocals, sr = sf.read(result["vocals_path"])
+        accompaniment, _ = sf.read(result["accompaniment_path"])
+        reference = resample_audio(self.audio, self.input_sr, 16000)
+
+        self.assertEqual(sr, 16000)
+        self.assertEqual(len(vocals), len(reference))
+        inner = slice(2000, -2000)
+        self.assertLess(np.abs(vocals - 0.4 * reference)[inner].max(), 1e-3)
+        self.assertLess(np.abs(accompaniment - 0.6 * reference)[inner].max(), 1e-3)
+        self.assertAlmostEqual(result["confidence"], 0.4 ** 2 / (0.4 ** 2 + 0.6 ** 2), places=2)
+
+    @patch("preprocessing.source_separator.apply_model", side_effect=fake_apply_model)
+    def test_output_covers_whole_input(self, _):
+        # Hop 4 s, overlap 1 s: remainders shorter than, equal to and longer than the overlap
+        for seconds in (4.5, 8.5, 9.0, 10.0, 3.0):
+            audio = self.audio[:int(seconds * self.input_sr)]
+            path = os.path.join(self.test_dir, f"input_{seconds}.wav")
+            sf.write(path, audio, self.input_sr)
+            result = self.separator.separate_file_streaming(
+                path,
+                os.path.join(self.test_dir, "vocals.wav"),
+                os.path.join(self.test_dir, "accompaniment.wav"),
+                output_sr=16000, chunk_seconds=4, overlap_seconds=1
+            )
+            vocals, _ = sf.read(result["vocals_path"])
+            reference = resample_audio(audio, self.input_sr, 16000)
+            self.assertEqual(len(vocals), len(reference), seconds)
+            self.assertLess(np.abs(vocals - 0.4 * reference)[2000:-2000].max(), 1e-3, seconds)
+
+
+class RecordingClassifier:
+    """Stands in for the gender classifier, recording how much audio it sees"""
+
+    def __init__(self):
+        self.lengths = []
+
+    def classify(self, audio, sr, analysis=None):
+        self.lengths.append(len(audio))
+        return 'female', 80.0
+
+
+class TestStreamingPipeline(unittest.TestCase):
+    """Long files are analysed on an excerpt and saved from the stem files."""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.separator = VocalSeparator.__new__(VocalSeparator)
+        self.separator.device = "cpu"
+        self.separator.sample_rate = 44100
+        self.separator.model = None
+
+        t = np.arange(16000 * 9) / 16000
+        self.input_path = os.path.join(self.test_dir, "long_call.wav")
+        sf.write(self.input_path, (0.5 * np.sin(2 * np.pi * 180 * t)).astype(np.float32), 16000)
+        self.temp_dir = os.path.join(self.test_dir, "temp")
+        self.cfg = {
+            "sample_rate": 16000,
+            "min_segment_duration": 1.0,
+            "paths": {"temp_dir": self.temp_dir},
+            "separation": {"streaming_min_duration": 5, "chunk_seconds": 2, "overlap_seconds": 0.5,
+                           "analysis_seconds": 2}
+        }
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    @patch("preprocessing.source_separator.apply_model", side_effect=fake_apply_model)
+    def test_long_file_is_analysed_on_excerpt(self, _):
+        from engine.batch_runner import process_file
+        from dataset.sinks import StagingSink
+
+        classifier = RecordingClassifier()
+        sink = StagingSink(os.path.join(self.test_dir, "dataset"))
+        result = process_file(self.input_path, self.cfg, self.separator, classifier, sink)
+
+        self.assertNotIn("error", result)
+        self.assertEqual(result["segments_processed"], 2)
+        self.assertEqual(classifier.lengths, [2 * 16000, 2 * 16000])
+
+        staged = sink.drain()
+        self.assertEqual([entry["metadata"]["separation_type"] for entry in staged], ["vocals", "accompaniment"])
+        for entry in staged:
+            self.assertEqual(sf.info(entry["staged_path"]).frames, 9 * 16000)
+            self.assertAlmostEqual(entry["metadata"]["duration"], 9.0)
+        # The stems' temporary directory is gone
+        self.assertEqual(os.listdir(self.temp_dir), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
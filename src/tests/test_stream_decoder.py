@@ -0,0 +1,167 @@
+import unittest
+import io
+import os
+import struct
+import tempfile
+import shutil
+import numpy as np
+import soundfile as sf
+import librosa
+
+from preprocessing.stream_decoder import StreamingDecoder, StreamDecodeError
+
+
+def speech_like(sr, duration=2.0, channels=1, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(sr * duration)) / sr
+    audio = 0.4 * np.sin(2 * np.pi * 140 * t) + 0.2 * np.sin(2 * np.pi * 1100 * t)
+    audio = audio + 0.01 * rng.standard_normal(len(t))
+    if channels > 1:
+        audio = np.stack([audio, 0.5 * audio], axis=1)
+    return audio.astype(np.float32)
+
+
+def wav_bytes(audio, sr, subtype):
+    buffer = io.BytesIO()
+    sf.write(buffer, audio, sr, format='WAV', subtype=subtype)
+    return buffer.getvalue()
+
+
+def feed(decoder, data, chunk_size):
+    for start in range(0, len(data), chunk_size):
+        decoder.write(data[start:start + chunk_size])
+    return decoder.close()
+
+
+class TestStreamingDecoder(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.output = os.path.join(self.test_dir, 'out.wav')
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_chunked_wav_matches_full_decode(self):
+        for sr, subtype, channels in ((44100, 'PCM_16', 2), (48000, 'PCM_24', 1),
+                                      (22050, 'FLOAT', 1), (16000, 'PCM_32', 2)):
+            data = wav_bytes(speech_like(sr, channels=channels), sr, subtype)
+            source = os.path.join(self.test_dir, 'source.wav')
+            with open(source, 'wb') as f:
+                f.write(data)
+
+            chunks = []
+            info = feed(StreamingDecoder(self.output, 16000, on_audio=chunks.append), data, 4093)
+            self.assertEqual(info['method'], 'wav')
+            self.assertEqual(info['source_sample_rate'], sr)
+
+            written, out_sr = sf.read(self.output, dtype='float32')
+            self.assertEqual(out_sr, 16000)
+            self.assertEqual(written.ndim, 1)
+            self.assertEqual(len(written), sum(len(c) for c in chunks))
+
+            reference, _ = librosa.load(source, sr=16000, mono=True)
+            self.assertLessEqual(abs(len(written) - len(reference)), 2)
+            n = min(len(written), len(reference))
+            # Trim resampler edges; the body must agree with a one-shot decode
+            error = np.abs(written[200:n - 200] - reference[200:n - 200]).max()
+            self.assertLess(error, 0.01, (sr, subtype))
+
+    def test_chunk_size_does_not_change_output(self):
+        data = wav_bytes(speech_like(44100), 44100, 'PCM_16')
+        feed(StreamingDecoder(self.output, 16000), data, len(data))
+        whole, _ = sf.read(self.output, dtype='float32')
+
+        other = os.path.join(self.test_dir, 'other.wav')
+        feed(StreamingDecoder(other, 16000), data, 37)
+        np.testing.assert_allclose(sf.read(other, dtype='float32')[0], whole, atol=1e-4)
+
+    def test_unknown_data_size_reads_to_end(self):
+        audio = speech_like(16000, duration=1.0)
+        data = bytearray(wav_bytes(audio, 16000, 'PCM_16'))
+        position = data.index(b'data')
+        data[position + 4:position + 8] = struct.pack('<I', 0xFFFFFFFF)
+        info = feed(StreamingDecoder(self.output, 16000), bytes(data), 1000)
+        self.assertAlmostEqual(info['duration'], 1.0, places=3)
+
+    def test_other_formats_are_decoded_once(self):
+        audio = speech_like(44100, duration=1.0)
+        buffer = io.BytesIO()
+        sf.write(buffer, audio, 44100, format='FLAC')
+        info = feed(StreamingDecoder(self.output, 16000, filename='clip.flac'), buffer.getvalue(), 8192)
+        self.assertIn(info['method'], ('ffmpeg', 'spool'))
+        self.assertAlmostEqual(info['duration'], 1.0, places=2)
+        self.assertEqual(os.listdir(self.test_dir), ['out.wav'])
+
+    def test_invalid_input_leaves_nothing(self):
+        decoder = StreamingDecoder(self.output, 16000)
+        with self.assertRaises(StreamDecodeError):
+            feed(decoder, b'not a wav file at all', 5)
+        self.assertFalse(os.path.exists(self.output))
+
+
+class TestStreamingUpload(unittest.TestCase):
+    """The web app stores uploads as 16 kHz mono WAV without a size cap."""
+
+    def setUp(self):
+        from scripts import web_app
+        from engine.job_queue import JobQueue
+
+        self.test_dir = tempfile.mkdtemp()
+        self.web_app = web_app
+        self.processed = []
+        self.saved = (web_app.app.config['UPLOAD_FOLDER'], web_app.JOB_QUEUE)
+        web_app.app.config['UPLOAD_FOLDER'] = self.test_dir
+        web_app.JOB_QUEUE = JobQueue(os.path.join(self.test_dir, 'jobs.sqlite'),
+                                     lambda path: self.processed.append(path) or {}, autostart=False)
+        self.client = web_app.app.test_client()
+
+    def tearDown(self):
+        self.web_app.JOB_QUEUE.close()
+        self.web_app.app.config['UPLOAD_FOLDER'], self.web_app.JOB_QUEUE = self.saved
+        shutil.rmtree(self.test_dir)
+
+    def test_multipart_upload_is_normalized(self):
+        data = wav_bytes(speech_like(44100, channels=2), 44100, 'PCM_16')
+        response = self.client.post('/upload', content_type='multipart/form-data', data={
+            'files': [(io.BytesIO(data), 'call one.wav'), (io.BytesIO(data), 'call_two.wav')]
+        })
+        self.assertEqual(response.status_code, 200, response.get_json())
+        body = response.get_json()
+        self.assertEqual(body['files'], ['call_one.wav', 'call_two.wav'])
+
+        job = self.web_app.JOB_QUEUE.get(body['job_id'])
+        for name in body['files']:
+            info = sf.info(os.path.join(job['input_dir'], name))
+            self.assertEqual((info.samplerate, info.channels), (16000, 1))
+            self.assertAlmostEqual(info.duration, 2.0, places=2)
+
+    def test_invalid_type_is_rejected(self):
+        response = self.client.post('/upload', content_type='multipart/form-data', data={
+            'files': [(io.BytesIO(b'hello'), 'notes.txt')]
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(self.job_dirs())
+
+    def job_dirs(self):
+        return [d for d in os.listdir(self.test_dir) if os.path.isdir(os.path.join(self.test_dir, d))]
+
+    def test_truncated_body_is_rejected(self):
+        data = wav_bytes(speech_like(16000), 16000, 'PCM_16')
+        body = (b'--XyZ\r\nContent-Disposition: form-data; name="files"; filename="one.wav"\r\n'
+                b'Content-Type: audio/wav\r\n\r\n' + data + b'\r\n--XyZ\r\n'
+                b'Content-Disposition: form-data; name="files"; filename="two.wav"\r\n'
+                b'Content-Type: audio/wav\r\n\r\n' + data[:len(data) // 2])
+        response = self.client.post('/upload', data=body, content_type='multipart/form-data; boundary=XyZ')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(self.job_dirs())
+
+    def test_raw_body_upload(self):
+        data = wav_bytes(speech_like(48000, duration=1.0), 48000, 'PCM_16')
+        response = self.client.put('/upload/call.wav', data=data)
+        self.assertEqual(response.status_code, 200, response.get_json())
+        self.assertEqual(response.get_json()['uploads'][0]['duration'], 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
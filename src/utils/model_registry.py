@@ -0,0 +1,214 @@
+"""
+Model Registry Module
+Process-wide warm pool of loaded models
+
+Demucs, pyannote, Silero VAD and the classifiers used to be constructed
+wherever they were needed: per file, per sample or per object. The registry
+loads each model once per process (on first use or at worker startup),
+hands the same instance to every caller and records how long each load took
+and how much memory it added.
+
+Key Features:
+- Lazy, load-once access: get_model('demucs', model_name='htdemucs', device='cpu')
+- Thread safe: concurrent callers of the same model wait for one load
+- Per-model lock for models with internal state (e.g. Silero VAD)
+- preload_models() for worker initializers and service startup
+- Load time and RSS / CUDA memory deltas per model (model_stats())
+"""
+
+import sys
+import time
+import logging
+import importlib
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Union
+
+import psutil
+
+logger = logging.getLogger(__name__)
+
+# Known models: name -> "module:callable" building the model from keyword arguments.
+# Modules are imported on first use, so importing the registry stays cheap.
+MODEL_FACTORIES = {
+    'demucs': 'preprocessing.source_separator:VocalSeparator',
+    'pyannote': 'diarization.diarizer:load_pyannote_pipeline',
+    'silero_vad': 'preprocessing.vad_enhanced:load_silero_model',
+    'quality_metrics': 'quality.metrics:QualityMetrics',
+    'pitch_classifier': 'classification.pitch_gender:PitchGenderClassifier',
+}
+
+
+def _resolve(factory: Union[str, Callable]) -> Callable:
+    if callable(factory):
+        return factory
+    module_name, attr = factory.split(':')
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def _cuda_allocated() -> int:
+    # Only look at CUDA if torch is already imported; never import it here
+    torch = sys.modules.get('torch')
+    if torch is None or not torch.cuda.is_available():
+        return 0
+    return torch.cuda.memory_allocated()
+
+
+class _Entry:
+    def __init__(self):
+        self.load_lock = threading.Lock()
+        self.use_lock = threading.RLock()
+        self.model = None
+        self.loaded = False
+        self.stats = {}
+
+
+class ModelRegistry:
+    """
+    Load-once cache of models keyed by name and constructor arguments
+    """
+
+    def __init__(self, factories: Optional[Dict[str, Union[str, Callable]]] = None):
+        """
+        Initialize registry
+
+        Args:
+            factories: Mapping of model name to a callable or "module:callable"
+                string (default: MODEL_FACTORIES)
+        """
+        self._factories = dict(MODEL_FACTORIES if factories is None else factories)
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, factory: Union[str, Callable]):
+        """Add or replace the factory for a model name"""
+        with self._lock:
+            self._factories[name] = factory
+
+    def _entry(self, name: str, kwargs: Dict) -> _Entry:
+        if name not in self._factories:
+            raise KeyError(f"Unknown model '{name}', registered: {sorted(self._factories)}")
+        key = (name, tuple(sorted(kwargs.items())))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _Entry()
+            return entry
+
+    def get(self, name: str, **kwargs):
+        """
+        Return the shared instance of a model, loading it on first use
+
+        Args:
+            name: Registered model name
+            **kwargs: Constructor arguments (part of the cache key; must be hashable)
+
+        Returns:
+            The loaded model
+        """
+        entry = self._entry(name, kwargs)
+        if entry.loaded:
+            return entry.model
+
+        with entry.load_lock:
+            if entry.loaded:
+                return entry.model
+
+            rss_before = psutil.Process().memory_info().rss
+            cuda_before = _cuda_allocated()
+            start_time = time.perf_counter()
+
+            # A failed load is not cached; the next caller retries
+            model = _resolve(self._factories[name])(**kwargs)
+
+            entry.stats = {
+                'name': name,
+                'kwargs': dict(kwargs),
+                'load_seconds': time.perf_counter() - start_time,
+                'rss_mb': (psutil.Process().memory_info().rss - rss_before) / 1024 ** 2,
+                'cuda_mb': (_cuda_allocated() - cuda_before) / 1024 ** 2,
+                'loaded_at': time.time()
+            }
+            entry.model = model
+            entry.loaded = True
+
+        logger.info(f"Loaded model '{name}' {kwargs or ''} in {entry.stats['load_seconds']:.2f}s "
+                    f"(+{entry.stats['rss_mb']:.0f} MB RSS, +{entry.stats['cuda_mb']:.0f} MB CUDA)")
+        return entry.model
+
+    def lock(self, name: str, **kwargs) -> threading.RLock:
+        """
+        Lock serializing use of a model that is not safe to call concurrently
+
+        Usage:
+            with registry.lock('silero_vad', device='cpu'):
+                probs = model(chunk, sr)
+        """
+        return self._entry(name, kwargs).use_lock
+
+    def is_loaded(self, name: str, **kwargs) -> bool:
+        """Whether the model is already in the pool"""
+        key = (name, tuple(sorted(kwargs.items())))
+        with self._lock:
+            entry = self._entries.get(key)
+        return entry is not None and entry.loaded
+
+    def preload(self, specs: Iterable[Union[str, Dict]]) -> List[Dict]:
+        """
+        Load models ahead of the first request
+
+        Failures are logged and skipped, so a missing optional model does not
+        stop a worker from starting.
+
+        Args:
+            specs: Model names, or dictionaries {'name': ..., **kwargs}
+
+        Returns:
+            Load statistics of the models that are now available
+        """
+        loaded = []
+        for spec in specs:
+            if isinstance(spec, str):
+                spec = {'name': spec}
+            spec = dict(spec)
+            name = spec.pop('name')
+            try:
+                self.get(name, **spec)
+                loaded.append(self._entry(name, spec).stats)
+            except Exception as e:
+                logger.warning(f"Could not preload model '{name}': {e}")
+        return loaded
+
+    def stats(self) -> List[Dict]:
+        """Load statistics of every model loaded in this process"""
+        with self._lock:
+            entries = list(self._entries.values())
+        return [dict(entry.stats) for entry in entries if entry.loaded]
+
+    def clear(self):
+        """Drop all loaded models (they are freed once no caller holds them)"""
+        with self._lock:
+            self._entries.clear()
+
+
+# Process-wide registry
+registry = ModelRegistry()
+
+
+def get_model(name: str, **kwargs):
+    """Shared instance of a model from the process-wide registry"""
+    return registry.get(name, **kwargs)
+
+
+def model_lock(name: str, **kwargs) -> threading.RLock:
+    """Use lock of a model in the process-wide registry"""
+    return registry.lock(name, **kwargs)
+
+
+def preload_models(specs: Iterable[Union[str, Dict]]) -> List[Dict]:
+    """Preload models into the process-wide registry"""
+    return registry.preload(specs)
+
+
+def model_stats() -> List[Dict]:
+    """Load statistics of the process-wide registry"""
+    return registry.stats()